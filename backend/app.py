@@ -8,21 +8,108 @@ from routes.category_routes import category_bp
 from routes.export_routes import export_bp
 from routes.notification_routes import notification_bp
 from routes.currency_routes import currency_bp
+from routes.analytics_routes import analytics_bp
+from routes.dashboard_routes import dashboard_bp
+from routes.sync_routes import sync_bp
+from utils.security_utils import configure_password_hashing
+from utils.search_utils import install_search_index
+from utils.metrics_utils import init_metrics
+from utils.ratelimit_utils import init_rate_limiting
+from utils.response_utils import init_json_provider, init_compression
+from utils.diagnostics_utils import init_query_diagnostics
+from utils.logging_utils import configure_logging, init_request_logging
+from utils.migration_utils import migrate_schema
+from utils.backup_utils import set_journal_mode, start_backup_scheduler
+from utils.shard_utils import init_sharding, shard_bind_key, shard_engines, shard_metadata
+from commands import register_commands
+import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def create_app():
+logger = logging.getLogger(__name__)
+
+def create_app(config=None):
     app = Flask(__name__)
     
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///db.sqlite3')
+    # postgres:// (format lama Heroku dkk.) tidak lagi diterima SQLAlchemy
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///db.sqlite3').replace('postgres://', 'postgresql://', 1)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'fallback-secret-key-change-in-production')
+    app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', '0'))
+    app.config['SERVER_TIMING_ENABLED'] = os.getenv('SERVER_TIMING_ENABLED', 'true').lower() == 'true'
+    app.config['QUERY_DIAGNOSTICS'] = os.getenv('QUERY_DIAGNOSTICS', 'false').lower() == 'true'
+    app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', '100'))
+    app.config['N_PLUS_ONE_THRESHOLD'] = int(os.getenv('N_PLUS_ONE_THRESHOLD', '5'))
+    app.config['QUERY_BUDGET'] = int(os.getenv('QUERY_BUDGET', '0'))
+    app.config['QUERY_BUDGET_RAISE'] = os.getenv('QUERY_BUDGET_RAISE', 'false').lower() == 'true'
+    app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', 'INFO').upper()
+    app.config['LOG_SAMPLE_RATE'] = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+    app.config['LOG_QUEUE_SIZE'] = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+    app.config['SSE_HEARTBEAT_SECONDS'] = float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+    app.config['SSE_QUEUE_SIZE'] = int(os.getenv('SSE_QUEUE_SIZE', '32'))
+    app.config['SSE_MAX_CONNECTIONS'] = int(os.getenv('SSE_MAX_CONNECTIONS', '1000'))
+    app.config['SSE_RETRY_MS'] = int(os.getenv('SSE_RETRY_MS', '5000'))
+    app.config['ANALYTICS_CACHE_TTL_SECONDS'] = float(os.getenv('ANALYTICS_CACHE_TTL_SECONDS', '300'))
+    app.config['SHARD_COUNT'] = int(os.getenv('SHARD_COUNT', '0'))
+    app.config['SHARD_URL_TEMPLATE'] = os.getenv('SHARD_URL_TEMPLATE', 'sqlite:///shard_{index}.sqlite3')
+    app.config['ARCHIVE_AFTER_MONTHS'] = int(os.getenv('ARCHIVE_AFTER_MONTHS', '24'))
+    app.config['JSON_PROVIDER'] = os.getenv('JSON_PROVIDER', 'auto')
+    app.config['COMPRESS_ENABLED'] = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    app.config['COMPRESS_LEVEL'] = int(os.getenv('COMPRESS_LEVEL', '6'))
+    app.config['COMPRESS_BROTLI_QUALITY'] = int(os.getenv('COMPRESS_BROTLI_QUALITY', '4'))
+    app.config['IDEMPOTENCY_TTL_HOURS'] = float(os.getenv('IDEMPOTENCY_TTL_HOURS', '24'))
+    app.config['IDEMPOTENCY_WAIT_SECONDS'] = float(os.getenv('IDEMPOTENCY_WAIT_SECONDS', '5'))
+    app.config['IDEMPOTENCY_LOCK_SECONDS'] = float(os.getenv('IDEMPOTENCY_LOCK_SECONDS', '60'))
+    app.config['SYNC_TOMBSTONE_DAYS'] = int(os.getenv('SYNC_TOMBSTONE_DAYS', '90'))
+    app.config['RATE_LIMIT_ENABLED'] = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    app.config['RATE_LIMIT_AUTH'] = os.getenv('RATE_LIMIT_AUTH', '10/minute')
+    app.config['RATE_LIMIT_EXPORT'] = os.getenv('RATE_LIMIT_EXPORT', '6/minute')
+    app.config['HEAVY_CONCURRENCY'] = int(os.getenv('HEAVY_CONCURRENCY', str(os.cpu_count() or 2)))
+    app.config['HEAVY_QUEUE_SIZE'] = int(os.getenv('HEAVY_QUEUE_SIZE', '16'))
+    app.config['HEAVY_QUEUE_TIMEOUT'] = float(os.getenv('HEAVY_QUEUE_TIMEOUT', '2'))
+    app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'wal')
+    app.config['BACKUP_DIR'] = os.getenv('BACKUP_DIR') or os.path.join(app.instance_path, 'backups')
+    app.config['BACKUP_KEEP'] = int(os.getenv('BACKUP_KEEP', '7'))
+    app.config['BACKUP_INTERVAL_HOURS'] = float(os.getenv('BACKUP_INTERVAL_HOURS', '0'))
+    app.config['BACKUP_PAGES'] = int(os.getenv('BACKUP_PAGES', '1024'))
+    app.config['BACKUP_STEP_SLEEP_MS'] = float(os.getenv('BACKUP_STEP_SLEEP_MS', '10'))
+    app.config['BACKUP_COMPRESS_LEVEL'] = int(os.getenv('BACKUP_COMPRESS_LEVEL', '6'))
+    app.config['BACKUP_MAX_RESTARTS'] = int(os.getenv('BACKUP_MAX_RESTARTS', '100'))
+    
+    if config:
+        app.config.update(config)
+    
+    # Satu bind per shard; tabel milik user diarahkan ke sana oleh ShardedSession
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for index in range(app.config['SHARD_COUNT']):
+        binds.setdefault(shard_bind_key(index), app.config['SHARD_URL_TEMPLATE'].format(index=index))
+    app.config['SQLALCHEMY_BINDS'] = binds
+    
+    configure_logging(
+        level=app.config['LOG_LEVEL'],
+        sample_rate=app.config['LOG_SAMPLE_RATE'],
+        queue_size=app.config['LOG_QUEUE_SIZE']
+    )
+    init_request_logging(app)
+    
+    configure_password_hashing(
+        method=app.config['PASSWORD_HASH_METHOD'],
+        workers=app.config['PASSWORD_HASH_WORKERS']
+    )
+    
+    init_json_provider(app)
     
     db.init_app(app)
     jwt = JWTManager(app)
     CORS(app)
+    init_metrics(app)
+    init_compression(app)
+    init_sharding(app)
+    init_rate_limiting(app)
     
     app.register_blueprint(auth_bp, url_prefix='/api')
     app.register_blueprint(transaction_bp, url_prefix='/api')
@@ -30,6 +117,9 @@ def create_app():
     app.register_blueprint(export_bp, url_prefix='/api')
     app.register_blueprint(notification_bp, url_prefix='/api')
     app.register_blueprint(currency_bp, url_prefix='/api')
+    app.register_blueprint(analytics_bp, url_prefix='/api')
+    app.register_blueprint(dashboard_bp, url_prefix='/api')
+    app.register_blueprint(sync_bp, url_prefix='/api')
     
     @app.route('/api/health')
     def health_check():
@@ -44,53 +134,29 @@ def create_app():
         return jsonify({'error': 'Terjadi kesalahan internal server'}), 500
     
     with app.app_context():
+        if app.config['QUERY_DIAGNOSTICS']:
+            init_query_diagnostics(app, [db.engine] + list(shard_engines(db).values()))
+        
+        for engine in [db.engine] + list(shard_engines(db).values()):
+            try:
+                set_journal_mode(engine, app.config['SQLITE_JOURNAL_MODE'])
+            except Exception as e:
+                logger.warning("Gagal mengatur journal_mode SQLite: %s", e)
+        
         try:
-            import sqlite3
-            conn = sqlite3.connect('db.sqlite3')
-            cursor = conn.cursor()
-            
-            cursor.execute("PRAGMA table_info(user)")
-            user_columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'budget_limit' not in user_columns:
-                print("Auto-migration: Menambah kolom budget_limit...")
-                cursor.execute('ALTER TABLE user ADD COLUMN budget_limit FLOAT DEFAULT 0.0')
-            
-            if 'base_currency' not in user_columns:
-                print("Auto-migration: Menambah kolom base_currency...")  
-                cursor.execute('ALTER TABLE user ADD COLUMN base_currency VARCHAR(3) DEFAULT "IDR"')
-            
-            cursor.execute("PRAGMA table_info(transaction)")
-            transaction_columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'currency' not in transaction_columns:
-                print("Auto-migration: Menambah kolom currency...")
-                cursor.execute('ALTER TABLE transaction ADD COLUMN currency VARCHAR(3) DEFAULT "IDR"')
-            
-            if 'exchange_rate' not in transaction_columns:
-                print("Auto-migration: Menambah kolom exchange_rate...")
-                cursor.execute('ALTER TABLE transaction ADD COLUMN exchange_rate FLOAT DEFAULT 1.0')
-            
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS budget_notification (
-                    id VARCHAR(36) PRIMARY KEY,
-                    user_id VARCHAR(36) NOT NULL,
-                    message TEXT NOT NULL,
-                    type VARCHAR(20) NOT NULL,
-                    is_read BOOLEAN DEFAULT FALSE,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES user (id)
-                )
-            """)
-            
-            conn.commit()
-            conn.close()
-            print("✅ Auto-migration completed!")
-            
+            migrate_schema(db.engine)
+            shard_tables = shard_metadata(db.metadata)
+            for engine in shard_engines(db).values():
+                migrate_schema(engine, shard_tables)
         except Exception as e:
-            print(f"⚠️ Auto-migration skipped: {e}")
+            logger.warning("Auto-migration gagal: %s", e)
         
-        db.create_all()
+        install_search_index(db.engine)
+        for engine in shard_engines(db).values():
+            install_search_index(engine)
+    
+    register_commands(app)
+    start_backup_scheduler(app, db)
     
     return app
 
@@ -0,0 +1,135 @@
+"""Helper bersama untuk script benchmark backend"""
+import os
+import sys
+import tempfile
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def create_bench_app(workdir=None, **config):
+    """Buat app dengan database SQLite sementara di ``workdir``.
+
+    ``SQLALCHEMY_DATABASE_URI`` di ``config`` (mis. PostgreSQL dari
+    benchmarks.pg_server) menggantikan database SQLite sementara. Rate limit
+    dimatikan karena semua request benchmark datang dari satu alamat, kecuali
+    ``RATE_LIMIT_ENABLED`` diisi.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix='expense-bench-')
+
+    from app import create_app
+    config.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{os.path.join(workdir, 'db.sqlite3')}")
+    config.setdefault('RATE_LIMIT_ENABLED', False)
+    return create_app(config)
+
+def register_user(client, username='bench', password='bench-password'):
+    """Registrasi user lalu kembalikan header Authorization-nya"""
+    client.post('/api/register', json={
+        'username': username,
+        'email': f'{username}@bench.local',
+        'password': password
+    })
+    response = client.post('/api/login', json={'username': username, 'password': password})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+def token_headers(app, user_id):
+    """Header Authorization untuk user yang dibuat langsung di database"""
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+def seed_user_transactions(app, rows, username='analytics', describe=None, batch_size=50000, seed=7, now=None):
+    """Isi database dengan ``rows`` transaksi untuk satu user baru; kembalikan id user.
+
+    ``describe(rng)`` opsional menghasilkan deskripsi transaksi. ``now`` yang
+    sama menghasilkan tanggal transaksi yang sama persis antar database.
+    """
+    from models import db, User, Category, Transaction
+    from utils.key_utils import new_uuid
+    from utils.migration_utils import backfill_change_seq
+    from utils.money_utils import money_values
+    from utils.shard_utils import using_shard
+
+    rng = random.Random(seed)
+    with app.app_context():
+        user = User(username=username, email=f'{username}@bench.local')
+        user.set_password('bench-password')
+        db.session.add(user)
+        db.session.flush()
+
+        with using_shard(user.id):
+            categories = [Category(name=f'Kategori {i}', user_id=user.id) for i in range(6)]
+            db.session.add_all(categories)
+            db.session.flush()
+            category_ids = [c.id for c in categories]
+
+            now = now or datetime.utcnow()
+            start = now - timedelta(days=5 * 365)
+            batch = []
+            for _ in range(rows):
+                batch.append({
+                    'id': new_uuid(),
+                    **money_values(round(rng.lognormvariate(10, 1), 2), 'IDR', 1),
+                    'description': describe(rng) if describe else 'benchmark',
+                    'date': start + timedelta(seconds=rng.randrange(5 * 365 * 86400)),
+                    'currency': 'IDR',
+                    'user_id': user.id,
+                    'category_id': rng.choice(category_ids),
+                    'created_at': now,
+                    'updated_at': now
+                })
+                if len(batch) == batch_size:
+                    db.session.execute(Transaction.__table__.insert(), batch)
+                    batch = []
+            if batch:
+                db.session.execute(Transaction.__table__.insert(), batch)
+            # INSERT core tidak melewati event ORM yang mengisi change_seq
+            backfill_change_seq(db.session.connection(bind_arguments={'mapper': Transaction.__mapper__}))
+            db.session.commit()
+            return user.id
+
+def percentile(sorted_values, pct):
+    """Percentile dengan interpolasi linear dari list yang sudah terurut"""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (k - lower)
+
+def summarize(latencies, elapsed):
+    """Ringkas latency (detik) menjadi p50/p95/p99 (ms) dan throughput"""
+    values = sorted(latencies)
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        'throughput_rps': round(len(values) / elapsed, 2) if elapsed > 0 else 0.0
+    }
+
+def run_concurrent(app, request_fn, total, threads=1):
+    """Jalankan ``request_fn(client)`` sebanyak ``total`` kali di beberapa thread"""
+    per_thread = [total // threads + (1 if i < total % threads else 0) for i in range(threads)]
+
+    def worker(count):
+        client = app.test_client()
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            request_fn(client)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(worker, per_thread))
+    elapsed = time.perf_counter() - started
+
+    return summarize([lat for chunk in results for lat in chunk], elapsed)
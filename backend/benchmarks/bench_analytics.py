@@ -0,0 +1,76 @@
+"""Benchmark analytics columnar (NumPy) untuk satu user dengan banyak transaksi.
+
+Contoh:
+    python -m benchmarks.bench_analytics --rows 1000000
+    python -m benchmarks.bench_analytics --rows 1000000 --with-db
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks._common import create_bench_app, seed_user_transactions
+
+def synthetic_frame(rows, categories=6, seed=42):
+    """Frame sintetis langsung dari array NumPy, tanpa database"""
+    from utils.analytics_utils import ExpenseFrame
+
+    rng = np.random.default_rng(seed)
+    now = int((datetime.utcnow() - datetime(1970, 1, 1)).total_seconds())
+    timestamps = np.sort(rng.integers(now - 5 * 365 * 86400, now, size=rows, dtype=np.int64))
+    codes = rng.integers(0, categories, size=rows, dtype=np.int32)
+    amounts = rng.lognormal(mean=10, sigma=1, size=rows)
+
+    return ExpenseFrame(
+        ids=np.array([str(i) for i in range(rows)], dtype=object),
+        timestamps=timestamps,
+        category_codes=codes,
+        category_ids=[str(uuid.uuid4()) for _ in range(categories)],
+        amounts=amounts
+    )
+
+def timed(label, fn, results, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    results[label] = round(best * 1000, 3)
+    print(f"{label:<28}{best * 1000:>12.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark analytics columnar')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--with-db', action='store_true', help='Ukur juga waktu load dari SQLite')
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    results = {'rows': args.rows}
+    app = create_bench_app()
+
+    if args.with_db:
+        from utils.analytics_utils import load_frame
+
+        user_id = seed_user_transactions(app, args.rows)
+        with app.app_context():
+            timed('load_frame (SQLite)', lambda: load_frame(user_id), results, repeat=1)
+            frame = load_frame(user_id)
+    else:
+        frame = synthetic_frame(args.rows)
+
+    timed('rolling_average 7d/365d', lambda: frame.rolling_average(7, 365), results)
+    timed('percentiles total', lambda: frame.percentiles([50, 90, 95, 99]), results)
+    timed('percentiles per kategori', lambda: frame.percentiles([50, 90, 95, 99], by_category=True), results)
+    timed('heatmap weekday x hour', frame.heatmap, results)
+    timed('anomalies 3 sigma', lambda: frame.anomalies(3.0), results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
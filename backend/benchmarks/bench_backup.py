@@ -0,0 +1,166 @@
+"""Benchmark latency tulis POST /api/transactions selama backup database SQLite berjalan.
+
+Database diisi tabel pengisi sampai ``--size-mb`` (default 2 GB) di samping
+skema aplikasi. Beberapa thread menulis transaksi dengan jeda tetap,
+selama:
+- baseline: tanpa backup
+- stepped: backup_sqlite per --pages halaman dengan jeda --sleep-ms (perintah backup-database)
+- single-step: backup API dalam satu langkah (seluruh database dalam satu lock baca)
+Setiap skenario dijalankan untuk setiap journal mode (--journal-modes).
+
+Contoh:
+    python -m benchmarks.bench_backup --size-mb 2048
+    python -m benchmarks.bench_backup --size-mb 300 --journal-modes wal delete --writers 4
+"""
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from benchmarks._common import create_bench_app, register_user, summarize
+
+FILLER_ROW_BYTES = 4096
+
+def fill_database(path, size_mb, batch_rows=10000):
+    """Tambah tabel pengisi sampai file ``path`` sekitar ``size_mb`` MB (sebagian bisa dikompres)"""
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE IF NOT EXISTS bench_filler (id INTEGER PRIMARY KEY, payload BLOB)')
+    while os.path.getsize(path) < size_mb * 1048576:
+        conn.executemany('INSERT INTO bench_filler (payload) VALUES (?)', (
+            (os.urandom(FILLER_ROW_BYTES // 4) + bytes(FILLER_ROW_BYTES * 3 // 4),) for _ in range(batch_rows)
+        ))
+        conn.commit()
+    conn.close()
+
+def set_mode(app, path, mode):
+    from models import db
+
+    with app.app_context():
+        db.engine.dispose()
+    conn = sqlite3.connect(path)
+    active = conn.execute(f'PRAGMA journal_mode={mode}').fetchone()[0]
+    conn.close()
+    return active
+
+class Writers:
+    """Thread yang terus membuat transaksi lewat API sampai stop()"""
+
+    def __init__(self, app, users, count, interval):
+        self.app = app
+        self.users = users
+        self.count = count
+        self.interval = interval
+        self.latencies = []
+        self.errors = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _run(self, index):
+        client = self.app.test_client()
+        headers, category_id = self.users[index % len(self.users)]
+        body = {'amount': 25000, 'description': 'Backup bench', 'category_id': category_id}
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            response = client.post('/api/transactions', json=body, headers=headers)
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.latencies.append(elapsed)
+                if response.status_code != 201:
+                    self.errors += 1
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._threads = [threading.Thread(target=self._run, args=(i,)) for i in range(self.count)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        result = summarize(self.latencies, time.perf_counter() - self._started)
+        result['max_ms'] = round(max(self.latencies) * 1000, 3) if self.latencies else 0.0
+        result['errors'] = self.errors
+        return result
+
+def run_scenario(app, users, args, action):
+    writers = Writers(app, users, args.writers, args.write_interval_ms / 1000)
+    writers.start()
+    time.sleep(0.5)
+    outcome = action()
+    writes = writers.stop()
+    return outcome, writes
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark latency tulis selama backup SQLite')
+    parser.add_argument('--size-mb', type=int, default=2048)
+    parser.add_argument('--journal-modes', nargs='+', default=['wal', 'delete'])
+    parser.add_argument('--writers', type=int, default=4, help='Thread penulis')
+    parser.add_argument('--write-interval-ms', type=float, default=20, help='Jeda antar request per thread')
+    parser.add_argument('--pages', type=int, default=1024, help='Halaman per langkah backup (BACKUP_PAGES)')
+    parser.add_argument('--sleep-ms', type=float, default=10, help='Jeda antar langkah (BACKUP_STEP_SLEEP_MS)')
+    parser.add_argument('--max-restarts', type=int, default=100, help='BACKUP_MAX_RESTARTS')
+    parser.add_argument('--baseline-seconds', type=float, default=5)
+    parser.add_argument('--workdir', help='Direktori kerja (default direktori temp, dihapus setelah selesai)')
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    from utils.backup_utils import BackupError, backup_sqlite
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='expense-backup-')
+    path = os.path.join(workdir, 'db.sqlite3')
+    backup_dir = os.path.join(workdir, 'backups')
+    app = create_bench_app(workdir, LOG_LEVEL='WARNING')
+    client = app.test_client()
+    users = []
+    for i in range(args.writers):
+        headers = register_user(client, username=f'backup{i}')
+        users.append((headers, client.get('/api/categories', headers=headers).get_json()['categories'][0]['id']))
+
+    started = time.perf_counter()
+    fill_database(path, args.size_mb)
+    print(f'Database {os.path.getsize(path) / 1048576:.0f} MB dibuat dalam {time.perf_counter() - started:.1f} detik')
+
+    def backup(pages, sleep):
+        def action():
+            try:
+                result = backup_sqlite(path, backup_dir, 'bench', pages=pages, sleep=sleep,
+                                       max_restarts=args.max_restarts, now=datetime.utcnow())
+            except BackupError as e:
+                return {'error': str(e)}
+            os.remove(result['path'])
+            os.remove(result['path'] + '.sha256')
+            return result
+        return action
+
+    scenarios = [
+        ('baseline', lambda: time.sleep(args.baseline_seconds) or {}),
+        ('stepped', backup(args.pages, args.sleep_ms / 1000)),
+        ('single-step', backup(-1, 0))
+    ]
+    results = []
+    for mode in args.journal_modes:
+        active = set_mode(app, path, mode)
+        for name, action in scenarios:
+            outcome, writes = run_scenario(app, users, args, action)
+            results.append({'journal_mode': active, 'scenario': name, 'backup': outcome, 'writes': writes})
+            status = outcome.get('error', 'ok') if name != 'baseline' else '-'
+            print(f"{active:<8}{name:<13} salin {outcome.get('copy_seconds', '-')!s:>8}s total {outcome.get('seconds', '-')!s:>8}s "
+                  f"restart {outcome.get('restarts', '-')!s:>4} | tulis p50 {writes['p50_ms']:>8} p99 {writes['p99_ms']:>9} "
+                  f"max {writes['max_ms']:>9} ms, error {writes['errors']} | {status[:60]}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'size_mb': args.size_mb, 'args': vars(args), 'results': results}, f, indent=2)
+    if not args.workdir:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""Benchmark skema primary/foreign key: ukuran database, ukuran index, insert dan join.
+
+Skema user/category/transaction dengan index yang sama seperti models.py,
+dibuat ulang untuk setiap skema key:
+- string: VARCHAR(36) berisi uuid4 (skema lama)
+- binary: UUIDKey 16 byte berisi uuid4
+- binary-v7: UUIDKey 16 byte berisi UUID versi 7 (skema sekarang)
+- integer: INTEGER autoincrement, hanya sebagai pembanding (tidak aman untuk rebalance shard)
+
+Contoh:
+    python -m benchmarks.bench_keys --rows 1000000
+    python -m benchmarks.bench_keys --rows 200000 --postgres-url postgresql://localhost/bench
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks._common import summarize
+from sqlalchemy import (
+    BigInteger, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table,
+    bindparam, create_engine, func, select, text
+)
+
+SCHEMES = ('string', 'binary', 'binary-v7', 'integer')
+
+def build_schema(scheme):
+    from utils.key_utils import UUIDKey, new_uuid
+
+    if scheme == 'integer':
+        key_type, make_key = Integer, None
+    elif scheme == 'string':
+        key_type, make_key = String(36), lambda: str(uuid.uuid4())
+    else:
+        key_type, make_key = UUIDKey, new_uuid if scheme == 'binary-v7' else lambda: str(uuid.uuid4())
+
+    metadata = MetaData()
+    users = Table('user', metadata, Column('id', key_type, primary_key=True), Column('username', String(80)))
+    categories = Table(
+        'category', metadata,
+        Column('id', key_type, primary_key=True),
+        Column('name', String(100), nullable=False),
+        Column('user_id', key_type, ForeignKey('user.id'), nullable=False)
+    )
+    transactions = Table(
+        'transaction', metadata,
+        Column('id', key_type, primary_key=True),
+        Column('user_id', key_type, ForeignKey('user.id'), nullable=False),
+        Column('category_id', key_type, ForeignKey('category.id'), nullable=False),
+        Column('date', DateTime, nullable=False),
+        Column('currency', String(3)),
+        Column('amount', BigInteger, nullable=False),
+        Column('base_amount_minor', BigInteger, nullable=False),
+        Index('ix_transaction_user_date', 'user_id', 'date'),
+        Index('ix_transaction_user_category_date', 'user_id', 'category_id', 'date'),
+        Index('ix_transaction_user_currency_date', 'user_id', 'currency', 'date'),
+        Index('ix_transaction_user_base_amount', 'user_id', 'base_amount_minor')
+    )
+    return metadata, users, categories, transactions, make_key
+
+def insert_rows(engine, tables, make_key, users, rows, batch_size, rng):
+    """Isi user, kategori lalu transaksi; kembalikan (user_ids, ids transaksi sampel, detik insert transaksi)"""
+    _, user_table, category_table, transaction_table, _ = tables
+    now = datetime(2024, 1, 1)
+
+    with engine.begin() as conn:
+        user_rows = [{'username': f'user{i}', **({'id': make_key()} if make_key else {})} for i in range(users)]
+        conn.execute(user_table.insert(), user_rows)
+        user_ids = [row for (row,) in conn.execute(select(user_table.c.id).order_by(user_table.c.username))]
+        category_rows = [
+            {'name': f'Kategori {j}', 'user_id': user_id, **({'id': make_key()} if make_key else {})}
+            for user_id in user_ids for j in range(6)
+        ]
+        conn.execute(category_table.insert(), category_rows)
+        categories = {}
+        for category_id, user_id in conn.execute(select(category_table.c.id, category_table.c.user_id)):
+            categories.setdefault(user_id, []).append(category_id)
+
+    started = time.perf_counter()
+    sample = []
+    for offset in range(0, rows, batch_size):
+        batch = []
+        for _ in range(min(batch_size, rows - offset)):
+            user_id = rng.choice(user_ids)
+            amount = rng.randrange(1000, 1000000)
+            row = {
+                'user_id': user_id,
+                'category_id': rng.choice(categories[user_id]),
+                'date': now + timedelta(seconds=rng.randrange(365 * 86400)),
+                'currency': 'IDR',
+                'amount': amount,
+                'base_amount_minor': amount * 100
+            }
+            if make_key:
+                row['id'] = make_key()
+                if len(sample) < 1000 and rng.random() < 0.01:
+                    sample.append(row['id'])
+            batch.append(row)
+        # Satu transaksi database per batch, seperti beberapa request tulis berurutan
+        with engine.begin() as conn:
+            conn.execute(transaction_table.insert(), batch)
+    elapsed = time.perf_counter() - started
+
+    if not make_key:
+        with engine.connect() as conn:
+            sample = list(conn.execute(select(transaction_table.c.id).order_by(func.random()).limit(1000)).scalars())
+    return user_ids, sample, elapsed
+
+def storage_sizes(engine):
+    """{'database': byte, nama tabel/index: byte} dari dbstat (SQLite) atau pg_relation_size"""
+    with engine.connect() as conn:
+        if engine.dialect.name == 'postgresql':
+            rows = conn.execute(text(
+                "SELECT c.relname, pg_relation_size(c.oid) FROM pg_class c "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = current_schema() AND c.relkind IN ('r', 'i')"
+            )).all()
+            sizes = dict(rows)
+            sizes['database'] = sum(sizes.values())
+        else:
+            sizes = dict(conn.exec_driver_sql('SELECT name, SUM(pgsize) FROM dbstat GROUP BY name').all())
+            sizes['database'] = conn.exec_driver_sql('PRAGMA page_count').scalar() * conn.exec_driver_sql('PRAGMA page_size').scalar()
+    return sizes
+
+def bench_queries(engine, tables, user_ids, sample, repeat, rng):
+    """Latency join transaksi-kategori per user dan lookup transaksi per id"""
+    _, _, category_table, transaction_table, _ = tables
+    join = select(category_table.c.name, func.sum(transaction_table.c.base_amount_minor)).select_from(
+        transaction_table.join(category_table, category_table.c.id == transaction_table.c.category_id)
+    ).where(transaction_table.c.user_id == bindparam('user_id')).group_by(category_table.c.name)
+    lookup = select(transaction_table).where(transaction_table.c.id == bindparam('id'))
+
+    results = {}
+    with engine.connect() as conn:
+        for name, statement, values in (('join', join, [{'user_id': rng.choice(user_ids)} for _ in range(repeat)]),
+                                        ('lookup', lookup, [{'id': rng.choice(sample)} for _ in range(repeat * 20)])):
+            latencies = []
+            started = time.perf_counter()
+            for params in values:
+                t0 = time.perf_counter()
+                conn.execute(statement, params).all()
+                latencies.append(time.perf_counter() - t0)
+            results[name] = summarize(latencies, time.perf_counter() - started)
+    return results
+
+def bench_scheme(scheme, url, rows, users, batch_size, repeat, seed):
+    metadata, *rest = tables = build_schema(scheme)
+    engine = create_engine(url)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    rng = random.Random(seed)
+
+    user_ids, sample, elapsed = insert_rows(engine, tables, rest[-1], users, rows, batch_size, rng)
+    with engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+    sizes = storage_sizes(engine)
+    queries = bench_queries(engine, tables, user_ids, sample, repeat, rng)
+    metadata.drop_all(engine)
+    engine.dispose()
+    return {
+        'scheme': scheme,
+        'insert_rows_per_s': round(rows / elapsed, 1),
+        'sizes': sizes,
+        'join': queries['join'],
+        'lookup': queries['lookup']
+    }
+
+def mb(value):
+    return f'{value / 1048576:.1f}' if value is not None else '-'
+
+def print_results(title, results):
+    indexes = ['transaction', 'ix_transaction_user_date', 'ix_transaction_user_category_date',
+               'ix_transaction_user_currency_date', 'ix_transaction_user_base_amount']
+    print(f"\n{title}")
+    print(f"{'':<12}{'insert/s':>12}{'DB MB':>10}{'join p50':>10}{'lookup p50':>12}")
+    for result in results:
+        print(f"{result['scheme']:<12}{result['insert_rows_per_s']:>12}{mb(result['sizes']['database']):>10}"
+              f"{result['join']['p50_ms']:>10}{result['lookup']['p50_ms']:>12}")
+    print(f"\n{'MB per tabel/index':<36}" + ''.join(f"{result['scheme']:>12}" for result in results))
+    for name in indexes:
+        print(f'{name:<36}' + ''.join(f"{mb(result['sizes'].get(name)):>12}" for result in results))
+    # Index primary key: sqlite_autoindex_transaction_1 (SQLite) atau transaction_pkey (PostgreSQL)
+    print(f"{'primary key transaction':<36}" + ''.join(
+        f"{mb(result['sizes'].get('sqlite_autoindex_transaction_1', result['sizes'].get('transaction_pkey'))):>12}"
+        for result in results
+    ))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark skema key: ukuran, insert dan join')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=1000, help='Transaksi per transaksi database saat insert')
+    parser.add_argument('--repeat', type=int, default=200, help='Query join per skema (lookup 20x lebih banyak)')
+    parser.add_argument('--schemes', nargs='+', choices=SCHEMES, default=list(SCHEMES))
+    parser.add_argument('--postgres-url', help='Jalankan juga di PostgreSQL ini (tabel user/category/transaction akan di-drop!)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    targets = [('SQLite', None)] + ([('PostgreSQL', args.postgres_url)] if args.postgres_url else [])
+    output = {}
+    for title, url in targets:
+        results = []
+        for scheme in args.schemes:
+            workdir = tempfile.mkdtemp(prefix='expense-keys-')
+            results.append(bench_scheme(
+                scheme, url or f"sqlite:///{os.path.join(workdir, 'keys.sqlite3')}",
+                args.rows, args.users, args.batch_size, args.repeat, args.seed
+            ))
+        print_results(f'{title}: {args.rows} transaksi, {args.users} user', results)
+        output[title] = results
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+
+if __name__ == '__main__':
+    main()
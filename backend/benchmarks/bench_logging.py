@@ -0,0 +1,97 @@
+"""Benchmark latency request saat sink log sengaja dibuat lambat.
+
+Membandingkan tiga mode untuk POST /api/transactions (yang menulis satu log
+per request):
+
+- ``none``: tanpa handler log (baseline)
+- ``blocking``: handler lambat dipasang langsung di root logger, setara
+  dengan print() ke stdout yang lambat
+- ``queue``: handler lambat di belakang QueueHandler/QueueListener
+  (konfigurasi default aplikasi)
+
+Contoh:
+    python -m benchmarks.bench_logging --sink-delay-ms 20 --requests 300
+"""
+import argparse
+import json
+import logging
+import time
+from datetime import datetime
+
+from benchmarks._common import create_bench_app, register_user, run_concurrent
+
+class SlowSink(logging.Handler):
+    """Handler yang meniru konsumen log lambat (pipe penuh, disk/jaringan lambat)"""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.records = 0
+
+    def emit(self, record):
+        self.format(record)
+        time.sleep(self.delay)
+        self.records += 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark logging dengan sink lambat')
+    parser.add_argument('--sink-delay-ms', type=float, default=20.0)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    # Semua log konversi ditulis (tanpa sampling) agar setiap request menyentuh sink
+    app = create_bench_app(LOG_LEVEL='INFO', LOG_SAMPLE_RATE=1.0)
+    client = app.test_client()
+    headers = register_user(client)
+    category_id = client.get('/api/categories', headers=headers).get_json()['categories'][0]['id']
+
+    from utils.currency_utils import exchange_cache
+    from utils.logging_utils import configure_logging, stop_logging, DroppingQueueHandler
+
+    # Kurs di-cache lebih dulu supaya benchmark tidak bergantung pada API eksternal
+    exchange_cache['USD_IDR'] = {'rate': 15000.0, 'timestamp': datetime.now()}
+
+    def create_transaction(client):
+        response = client.post('/api/transactions', headers=headers, json={
+            'amount': 12.5, 'description': 'bench logging', 'category_id': category_id, 'currency': 'USD'
+        })
+        assert response.status_code == 201, response.get_json()
+
+    # Pemanasan: kurangi efek request pertama (koneksi, cache) pada mode pertama
+    stop_logging()
+    run_concurrent(app, create_transaction, args.threads * 5, args.threads)
+
+    root = logging.getLogger()
+    delay = args.sink_delay_ms / 1000.0
+    results = {}
+
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'ditulis':>10}{'dibuang':>10}")
+    for mode in ('none', 'blocking', 'queue'):
+        stop_logging()
+        sink = SlowSink(delay)
+        if mode == 'blocking':
+            root.addHandler(sink)
+        elif mode == 'queue':
+            configure_logging(level='INFO', sink=sink)
+        DroppingQueueHandler.dropped = 0
+
+        result = run_concurrent(app, create_transaction, args.requests, args.threads)
+
+        if mode == 'blocking':
+            root.removeHandler(sink)
+        # Latency sudah diukur; sisa queue dikosongkan di luar pengukuran
+        stop_logging()
+        result['records_written'] = sink.records
+        result['records_dropped'] = DroppingQueueHandler.dropped
+        results[mode] = result
+        print(f"{mode:<10}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+              f"{result['throughput_rps']:>10}{sink.records:>10}{DroppingQueueHandler.dropped:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'sink_delay_ms': args.sink_delay_ms, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
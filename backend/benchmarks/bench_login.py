@@ -0,0 +1,53 @@
+"""Benchmark throughput /api/login untuk beberapa metode hashing password.
+
+Contoh:
+    python -m benchmarks.bench_login --methods pbkdf2:sha256:600000 scrypt:32768:8:1
+"""
+import argparse
+import json
+
+from benchmarks._common import create_bench_app, register_user, run_concurrent
+
+DEFAULT_METHODS = [
+    'pbkdf2:sha256:600000',
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:100000',
+    'scrypt:32768:8:1',
+    'scrypt:16384:8:1'
+]
+
+def bench_method(method, total, threads, workers):
+    app = create_bench_app(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_WORKERS=workers)
+    client = app.test_client()
+    register_user(client, username='bench', password='bench-password')
+
+    def login(client):
+        response = client.post('/api/login', json={'username': 'bench', 'password': 'bench-password'})
+        assert response.status_code == 200, response.get_json()
+
+    result = run_concurrent(app, login, total, threads)
+    result['method'] = method
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark login throughput per metode hashing')
+    parser.add_argument('--methods', nargs='+', default=DEFAULT_METHODS)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=0, help='PASSWORD_HASH_WORKERS')
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'method':<26}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'login/s':>10}")
+    for method in args.methods:
+        result = bench_method(method, args.requests, args.threads, args.workers)
+        results.append(result)
+        print(f"{method:<26}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}{result['throughput_rps']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
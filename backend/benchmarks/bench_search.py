@@ -0,0 +1,74 @@
+"""Benchmark full-text search (FTS5) dibanding LIKE '%term%' pada tabel besar.
+
+Contoh:
+    python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import json
+import time
+
+from benchmarks._common import create_bench_app, seed_user_transactions, summarize, token_headers
+
+WORDS = [
+    'makan', 'siang', 'malam', 'kopi', 'bensin', 'parkir', 'tol', 'listrik', 'air',
+    'pulsa', 'internet', 'bioskop', 'buku', 'obat', 'dokter', 'belanja', 'pasar',
+    'sayur', 'buah', 'roti', 'gojek', 'grab', 'kereta', 'bus', 'hotel', 'tiket',
+    'sepatu', 'baju', 'hadiah', 'arisan', 'sekolah', 'kursus', 'gym', 'salon'
+]
+
+def describe(rng):
+    return ' '.join(rng.sample(WORDS, rng.randint(2, 4)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pencarian transaksi')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--other-users', type=int, default=0, help='Transaksi user lain (noise)')
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    user_id = seed_user_transactions(app, args.rows, username='search', describe=describe)
+    if args.other_users:
+        seed_user_transactions(app, args.other_users, username='noise', describe=describe, seed=11)
+
+    client = app.test_client()
+    headers = token_headers(app, user_id)
+
+    terms = ['kopi', 'makan siang', 'tiket kereta', 'gy', 'obat dokter']
+    results = {'rows': args.rows}
+
+    from models import Transaction
+    for term in terms:
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(args.queries):
+            t0 = time.perf_counter()
+            response = client.get(f'/api/transactions?q={term}&per_page=20', headers=headers)
+            latencies.append(time.perf_counter() - t0)
+        fts = summarize(latencies, time.perf_counter() - started)
+        fts['total'] = response.get_json()['total']
+
+        # Pembanding: LIKE '%term%' (scan seluruh transaksi user)
+        with app.app_context():
+            like_latencies = []
+            started = time.perf_counter()
+            for _ in range(max(args.queries // 10, 1)):
+                t0 = time.perf_counter()
+                query = Transaction.query.filter(Transaction.user_id == user_id)
+                for word in term.split():
+                    query = query.filter(Transaction.description.like(f'%{word}%'))
+                query.count()
+                query.order_by(Transaction.date.desc()).limit(20).all()
+                like_latencies.append(time.perf_counter() - t0)
+            like = summarize(like_latencies, time.perf_counter() - started)
+
+        results[term] = {'fts': fts, 'like': like}
+        print(f"{term:<16} FTS p50 {fts['p50_ms']:>9} ms  LIKE p50 {like['p50_ms']:>9} ms  ({fts['total']} hasil)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
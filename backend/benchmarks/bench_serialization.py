@@ -0,0 +1,126 @@
+"""Benchmark serialisasi list transaksi: JSON provider, sparse fieldset dan kompresi.
+
+Tiga bagian:
+- encode: to_dict() + dumps untuk ``--rows`` transaksi (stdlib vs orjson, semua key vs ``fields``)
+- kompresi: ukuran dan waktu gzip/brotli untuk payload yang sama
+- end-to-end: GET /api/transactions?per_page=500 untuk setiap kombinasi provider, fields dan Accept-Encoding
+
+Contoh:
+    python -m benchmarks.bench_serialization --rows 20000
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+from benchmarks._common import create_bench_app, seed_user_transactions, summarize, token_headers
+
+# Kolom yang dirender Dashboard.jsx untuk transaksi terbaru
+DASHBOARD_FIELDS = 'id,description,category_name,category_color,amount,currency,date,exchange_rate'
+
+def timed(fn, repeat):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started), result
+
+def bench_encode(app, user_id, repeat):
+    from flask.json.provider import DefaultJSONProvider
+    from sqlalchemy.orm import selectinload
+    from models import Transaction
+    from utils.response_utils import OrjsonProvider, orjson
+
+    providers = {'stdlib': DefaultJSONProvider(app)}
+    if orjson is not None:
+        providers['orjson'] = OrjsonProvider(app)
+
+    results = {}
+    with app.app_context():
+        transactions = Transaction.query.filter_by(user_id=user_id).options(
+            selectinload(Transaction.category)
+        ).all()
+        for fields_name, fields in (('all', None), ('dashboard', DASHBOARD_FIELDS.split(','))):
+            to_dict, payload = timed(lambda: [t.to_dict(fields) for t in transactions], repeat)
+            results[f'to_dict {fields_name}'] = to_dict
+            for name, provider in providers.items():
+                dumps, body = timed(lambda: provider.dumps({'transactions': payload}), repeat)
+                dumps['bytes'] = len(body.encode())
+                results[f'dumps {name} {fields_name}'] = dumps
+    return results, body.encode()
+
+def bench_compression(body, repeat):
+    import gzip
+    from utils.response_utils import brotli
+
+    codecs = {f'gzip-{level}': (lambda level=level: gzip.compress(body, compresslevel=level, mtime=0)) for level in (1, 6, 9)}
+    if brotli is not None:
+        for quality in (1, 4, 11):
+            codecs[f'br-{quality}'] = lambda quality=quality: brotli.compress(body, quality=quality)
+
+    results = {}
+    for name, fn in codecs.items():
+        result, compressed = timed(fn, max(repeat // 2, 1) if name in ('gzip-9', 'br-11') else repeat)
+        result['bytes'] = len(compressed)
+        result['ratio'] = round(len(body) / len(compressed), 2)
+        results[name] = result
+    return results
+
+def bench_endpoint(rows, requests, now):
+    from utils.response_utils import orjson, brotli
+
+    results = {}
+    for provider in ['stdlib'] + (['orjson'] if orjson is not None else []):
+        app = create_bench_app(JSON_PROVIDER=provider, LOG_LEVEL='WARNING')
+        user_id = seed_user_transactions(app, rows, username='serialize', now=now)
+        headers = token_headers(app, user_id)
+        client = app.test_client()
+        for fields in (None, DASHBOARD_FIELDS):
+            path = '/api/transactions?per_page=500' + (f'&fields={fields}' if fields else '')
+            for encoding in ['identity', 'gzip'] + (['br'] if brotli is not None else []):
+                request_headers = {**headers, 'Accept-Encoding': encoding}
+
+                def get():
+                    response = client.get(path, headers=request_headers)
+                    assert response.status_code == 200
+                    return response
+
+                result, response = timed(get, requests)
+                result['bytes'] = len(response.data)
+                results[f"{provider} {'dashboard' if fields else 'all'} {encoding}"] = result
+    return results
+
+def print_table(title, results, extra=('bytes',)):
+    print(f"\n{title}")
+    print(f"{'':<28}{'p50 ms':>10}{'p95 ms':>10}" + ''.join(f'{name:>16}' for name in extra))
+    for name, result in results.items():
+        print(f"{name:<28}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+              + ''.join(f"{result.get(key, ''):>16}" for key in extra))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serialisasi dan kompresi response')
+    parser.add_argument('--rows', type=int, default=20000, help='Transaksi yang di-encode di bagian encode/kompresi')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--requests', type=int, default=100, help='Request per kombinasi end-to-end')
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    app = create_bench_app(LOG_LEVEL='WARNING')
+    user_id = seed_user_transactions(app, args.rows, username='serialize', now=now)
+
+    encode, body = bench_encode(app, user_id, args.repeat)
+    print_table(f'Encode {args.rows} transaksi', encode)
+    compression = bench_compression(body, args.repeat)
+    print_table(f'Kompresi payload {len(body)} byte', compression, ('bytes', 'ratio'))
+    endpoint = bench_endpoint(2000, args.requests, now)
+    print_table('GET /api/transactions?per_page=500', endpoint, ('bytes', 'throughput_rps'))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'encode': encode, 'compression': compression, 'endpoint': endpoint}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
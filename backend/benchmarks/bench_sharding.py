@@ -0,0 +1,72 @@
+"""Benchmark throughput tulis POST /api/transactions untuk beberapa SHARD_COUNT.
+
+Banyak user menulis bersamaan dari beberapa thread; setiap konfigurasi memakai
+database baru. SHARD_COUNT 0 adalah database tunggal tanpa sharding sebagai
+pembanding. Dengan SQLite setiap shard adalah file terpisah, jadi penulis di
+shard berbeda tidak saling menunggu lock database yang sama.
+
+Contoh:
+    python -m benchmarks.bench_sharding --shards 0 1 2 4 8 --users 32 --threads 8
+"""
+import argparse
+import itertools
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from benchmarks._common import create_bench_app, register_user, run_concurrent
+
+def bench_shards(count, users, total, threads):
+    workdir = tempfile.mkdtemp(prefix='expense-shard-')
+    app = create_bench_app(
+        workdir,
+        SHARD_COUNT=count,
+        SHARD_URL_TEMPLATE=f"sqlite:///{os.path.join(workdir, 'shard_{index}.sqlite3')}",
+        LOG_LEVEL='WARNING'
+    )
+    client = app.test_client()
+
+    writers = []
+    for i in range(users):
+        headers = register_user(client, username=f'shard{i}')
+        category_id = client.get('/api/categories', headers=headers).get_json()['categories'][0]['id']
+        writers.append((headers, category_id))
+
+    # Request berikutnya memakai user berikutnya secara bergiliran
+    turn = itertools.count()
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    def create_transaction(client):
+        headers, category_id = writers[next(turn) % len(writers)]
+        response = client.post('/api/transactions', headers=headers, json={
+            'amount': 25000, 'description': 'benchmark shard', 'category_id': category_id, 'date': today
+        })
+        assert response.status_code == 201, response.get_json()
+
+    result = run_concurrent(app, create_transaction, total, threads)
+    result['shards'] = count
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark throughput tulis per jumlah shard')
+    parser.add_argument('--shards', type=int, nargs='+', default=[0, 1, 2, 4, 8])
+    parser.add_argument('--users', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'shards':<8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'tulis/s':>10}")
+    for count in args.shards:
+        result = bench_shards(count, args.users, args.requests, args.threads)
+        results.append(result)
+        print(f"{count:<8}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}{result['throughput_rps']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""Load test stream SSE /api/notifications/stream dengan ratusan koneksi idle.
+
+Menjalankan app di server Werkzeug multi-thread lokal, membuka banyak koneksi
+EventSource (via requests, token lewat query string), lalu mengukur:
+
+- waktu sampai event awal diterima setiap koneksi
+- apakah heartbeat tetap mengalir selama koneksi idle
+- latency endpoint biasa sebelum vs selama koneksi idle terbuka
+- latency pengiriman event ``budget`` ke semua tab user setelah POST transaksi
+
+Contoh:
+    python -m benchmarks.bench_sse --connections 300 --users 100 --heartbeat 1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime
+
+import requests
+from werkzeug.serving import make_server
+
+from benchmarks._common import create_bench_app, summarize, token_headers
+from benchmarks.seed import seed_database
+
+class StreamClient(threading.Thread):
+    """Satu koneksi EventSource; mencatat waktu setiap event yang diterima"""
+
+    def __init__(self, url, user_id):
+        super().__init__(daemon=True)
+        self.url = url
+        self.user_id = user_id
+        self.events = []
+        self.heartbeats = 0
+        self.connected = threading.Event()
+        self.started = None
+        self.response = None
+        self.error = None
+
+    def run(self):
+        self.started = time.perf_counter()
+        try:
+            self.response = requests.get(self.url, stream=True, timeout=(10, None))
+            event = None
+            for line in self.response.iter_lines(decode_unicode=True):
+                if line.startswith(': heartbeat'):
+                    self.heartbeats += 1
+                elif line.startswith('event: '):
+                    event = line[len('event: '):]
+                elif line.startswith('data: '):
+                    self.events.append((time.perf_counter(), event, json.loads(line[len('data: '):])))
+                    if event == 'unread':
+                        self.connected.set()
+        except Exception as e:
+            if not self.connected.is_set():
+                self.error = e
+        finally:
+            self.connected.set()
+
+    def close(self):
+        if self.response is not None:
+            self.response.close()
+
+def timed_requests(session, url, headers, count):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(count):
+        t = time.perf_counter()
+        assert session.get(url, headers=headers).status_code == 200
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test SSE dengan koneksi idle')
+    parser.add_argument('--connections', type=int, default=300)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--heartbeat', type=float, default=1.0, help='SSE_HEARTBEAT_SECONDS')
+    parser.add_argument('--idle', type=float, default=3.0, help='Lama koneksi dibiarkan idle (detik)')
+    parser.add_argument('--publishes', type=int, default=50, help='Jumlah POST transaksi saat koneksi terbuka')
+    parser.add_argument('--requests', type=int, default=100, help='Request pembanding per fase')
+    parser.add_argument('--output', help='Simpan hasil ke file JSON')
+    args = parser.parse_args()
+
+    app = create_bench_app(
+        SSE_HEARTBEAT_SECONDS=args.heartbeat,
+        SSE_MAX_CONNECTIONS=args.connections + 10,
+        LOG_LEVEL='WARNING'
+    )
+    users = seed_database(app, users=args.users, transactions=args.users * 20, months=1, log=lambda *a: None)
+    user_ids = [user_id for user_id, _ in users]
+
+    from models import db, User, Category
+    from utils.events_utils import broker
+
+    with app.app_context():
+        # Budget kecil agar setiap transaksi baru mengubah status budget
+        User.query.filter(User.id.in_(user_ids)).update(
+            {User.budget_limit: 1000000, User.budget_limit_minor: 100000000}, synchronize_session=False
+        )
+        db.session.commit()
+        categories = {c.user_id: c.id for c in Category.query.filter(Category.user_id.in_(user_ids)).all()}
+
+    headers = {user_id: token_headers(app, user_id) for user_id in user_ids}
+    tokens = {user_id: h['Authorization'].split(' ', 1)[1] for user_id, h in headers.items()}
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}/api'
+    session = requests.Session()
+    probe_user = user_ids[0]
+    month = datetime.now().strftime('%Y-%m')
+    probe_url = f'{base_url}/transactions/summary?month={month}'
+
+    baseline = timed_requests(session, probe_url, headers[probe_user], args.requests)
+
+    # Koneksi dibagi rata ke user, jadi sebagian besar user punya beberapa tab terbuka
+    clients = []
+    for i in range(args.connections):
+        user_id = user_ids[i % len(user_ids)]
+        client = StreamClient(f'{base_url}/notifications/stream?jwt={tokens[user_id]}', user_id)
+        client.start()
+        clients.append(client)
+    for client in clients:
+        client.connected.wait(30)
+    failed = [c for c in clients if c.error or not c.events]
+    connect_latencies = [c.events[0][0] - c.started for c in clients if c.events]
+
+    heartbeats_before = sum(c.heartbeats for c in clients)
+    time.sleep(args.idle)
+    heartbeats_during_idle = sum(c.heartbeats for c in clients) - heartbeats_before
+
+    during_idle = timed_requests(session, probe_url, headers[probe_user], args.requests)
+
+    # Publish: POST transaksi lalu ukur kapan setiap tab user menerima event budget
+    rng = random.Random(1)
+    delivery = []
+    by_user = {}
+    for client in clients:
+        by_user.setdefault(client.user_id, []).append(client)
+    for _ in range(args.publishes):
+        user_id = rng.choice(user_ids)
+        tabs = by_user[user_id]
+        seen = [len(tab.events) for tab in tabs]
+        sent = time.perf_counter()
+        response = session.post(f'{base_url}/transactions', headers=headers[user_id], json={
+            'amount': 1000, 'description': 'sse bench', 'category_id': categories[user_id], 'currency': 'IDR'
+        })
+        assert response.status_code == 201, response.text
+        for tab, count in zip(tabs, seen):
+            deadline = time.perf_counter() + 5
+            while time.perf_counter() < deadline:
+                received = [e for e in tab.events[count:] if e[1] == 'budget']
+                if received:
+                    delivery.append(received[0][0] - sent)
+                    break
+                time.sleep(0.001)
+
+    open_connections = broker.connection_count()
+    for client in clients:
+        client.close()
+    # Koneksi yang ditutup client baru terdeteksi server saat heartbeat berikutnya gagal ditulis
+    time.sleep(args.heartbeat * 2 + 0.5)
+    remaining = broker.connection_count()
+    server.shutdown()
+
+    results = {
+        'connections': args.connections,
+        'users': args.users,
+        'failed_connections': len(failed),
+        'server_connections_open': open_connections,
+        'server_connections_after_close': remaining,
+        'connect_ms': summarize(connect_latencies, 1.0),
+        'heartbeats_during_idle': heartbeats_during_idle,
+        'expected_heartbeats': int(args.connections * (args.idle // args.heartbeat)),
+        'probe_baseline': baseline,
+        'probe_with_idle_connections': during_idle,
+        'delivery_ms': summarize(delivery, 1.0),
+        'deliveries': len(delivery)
+    }
+
+    print(f"Koneksi: {args.connections} ({len(failed)} gagal), terbuka di server: {open_connections}, "
+          f"setelah ditutup: {remaining}")
+    print(f"Event awal  p50 {results['connect_ms']['p50_ms']} ms  p95 {results['connect_ms']['p95_ms']} ms")
+    print(f"Heartbeat selama idle {args.idle}s: {heartbeats_during_idle} (perkiraan {results['expected_heartbeats']})")
+    print(f"GET summary tanpa stream   p50 {baseline['p50_ms']} ms  p95 {baseline['p95_ms']} ms")
+    print(f"GET summary dengan stream  p50 {during_idle['p50_ms']} ms  p95 {during_idle['p95_ms']} ms")
+    print(f"Pengiriman event budget ({len(delivery)} tab)  p50 {results['delivery_ms']['p50_ms']} ms  "
+          f"p95 {results['delivery_ms']['p95_ms']} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
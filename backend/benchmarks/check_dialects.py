@@ -0,0 +1,150 @@
+"""Pastikan API memberi hasil yang sama di SQLite dan PostgreSQL.
+
+Men-seed data identik ke SQLite sementara dan ke PostgreSQL (server sementara
+dari benchmarks.pg_server, atau ``--postgres-url``), menjalankan urutan request
+yang sama (tulis, agregasi, trend per granularity, pencarian, notifikasi,
+export) di keduanya, lalu membandingkan response setelah id dan timestamp
+dibuang. Keluar dengan status 1 jika ada perbedaan.
+
+Contoh:
+    python -m benchmarks.check_dialects --rows 20000
+    python -m benchmarks.check_dialects --postgres-url postgresql://postgres@127.0.0.1:5432/expense_check
+"""
+import argparse
+import json
+import sys
+import time
+from contextlib import nullcontext
+from datetime import datetime
+
+from benchmarks._common import create_bench_app, seed_user_transactions, token_headers
+from benchmarks.pg_server import temporary_postgres
+
+WORDS = ['kopi', 'makan', 'siang', 'bensin', 'parkir', 'pulsa', 'listrik', 'buku', 'obat', 'tiket']
+
+# Key yang nilainya berbeda antar database (uuid, waktu tulis) dan tidak dibandingkan
+VOLATILE_KEYS = {'id', 'user_id', 'category_id', 'transaction_id', 'created_at', 'updated_at', 'access_token'}
+
+def describe(rng):
+    return ' '.join(rng.sample(WORDS, rng.randint(2, 3)))
+
+def month_offset(now, offset):
+    index = now.year * 12 + now.month - 1 - offset
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+# Langkah yang urutan list di response-nya tidak ditentukan API (GROUP BY tanpa
+# ORDER BY, tanggal yang sama, skor relevansi bm25 vs ts_rank); dibandingkan
+# tanpa memperhatikan urutan
+UNORDERED_STEPS = {'list month', 'search', 'summary', 'summary past', 'trend month', 'trend week', 'trend day'}
+
+def build_steps(now, category_id):
+    """Daftar (nama, method, path, body) yang dijalankan berurutan"""
+    month = month_offset(now, 0)
+    return [
+        ('set budget', 'PUT', '/api/notifications/budget-limit', {'budget_limit': 20000000}),
+        ('create IDR', 'POST', '/api/transactions', {
+            'amount': 1234567.89, 'description': 'kopi dialect', 'category_id': category_id,
+            'currency': 'IDR', 'date': now.isoformat()
+        }),
+        ('create JPY', 'POST', '/api/transactions', {
+            'amount': 1500, 'description': 'tiket dialect', 'category_id': category_id,
+            'currency': 'JPY', 'date': now.isoformat()
+        }),
+        ('list month', 'GET', f'/api/transactions?month={month}', None),
+        ('list amount', 'GET', '/api/transactions?per_page=50&sort=amount&order=desc', None),
+        ('list filter', 'GET', f'/api/transactions?per_page=50&start_date={month_offset(now, 6)}-01&min_amount=50000', None),
+        ('search', 'GET', '/api/transactions?q=kopi%20mak&per_page=500', None),
+        ('summary', 'GET', f'/api/transactions/summary?month={month}', None),
+        ('summary past', 'GET', f'/api/transactions/summary?month={month_offset(now, 13)}', None),
+        ('trend month', 'GET', f'/api/analytics/trend?from={month_offset(now, 23)}&to={month}&compare=yoy', None),
+        ('trend week', 'GET', f'/api/analytics/trend?from={month_offset(now, 5)}&to={month}&granularity=week', None),
+        ('trend day', 'GET', f'/api/analytics/trend?from={month_offset(now, 1)}&to={month}&granularity=day', None),
+        ('budget check', 'GET', '/api/notifications/budget-check', None),
+        ('notifications', 'GET', '/api/notifications', None),
+        ('mark read', 'POST', '/api/notifications/mark-read', {'all': True}),
+        ('unread count', 'GET', '/api/notifications/unread-count', None),
+        ('percentiles', 'GET', '/api/analytics/percentiles?by=category', None),
+        ('export excel', 'GET', '/api/export/excel', None),
+        ('export pdf', 'GET', f'/api/export/pdf?start_date={month_offset(now, 12)}-01', None)
+    ]
+
+def normalize(value, ordered=True):
+    if isinstance(value, dict):
+        return {k: normalize(v, ordered) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        items = [normalize(item, ordered) for item in value]
+        return items if ordered else sorted(items, key=lambda item: json.dumps(item, sort_keys=True))
+    return value
+
+def run_checks(database_url, rows, now):
+    """Seed database lalu jalankan semua langkah; kembalikan {nama: (status, body)}"""
+    config = {'LOG_LEVEL': 'WARNING'}
+    if database_url:
+        config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app = create_bench_app(**config)
+
+    from models import db, Category
+    if database_url:
+        # Database yang dipakai ulang: mulai dari skema kosong
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+    user_id = seed_user_transactions(app, rows, username='dialect', describe=describe, now=now)
+    headers = token_headers(app, user_id)
+    with app.app_context():
+        category_id = Category.query.filter_by(user_id=user_id, name='Kategori 0').one().id
+
+    client = app.test_client()
+    results = {}
+    timings = {}
+    for name, method, path, body in build_steps(now, category_id):
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, json=body)
+        timings[name] = (time.perf_counter() - started) * 1000
+        if response.is_json:
+            payload = normalize(response.get_json(), ordered=name not in UNORDERED_STEPS)
+        else:
+            payload = {'mimetype': response.mimetype, 'non_empty': len(response.data) > 0}
+        results[name] = (response.status_code, payload)
+    return results, timings, app
+
+def main():
+    parser = argparse.ArgumentParser(description='Bandingkan hasil API di SQLite dan PostgreSQL')
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--postgres-url', help='Pakai server PostgreSQL ini (tabelnya akan di-drop!)')
+    args = parser.parse_args()
+
+    # Tanggal seed dikunci agar kedua database berisi transaksi yang sama persis
+    now = datetime.utcnow().replace(microsecond=0)
+    sqlite_results, sqlite_timings, _ = run_checks(None, args.rows, now)
+
+    server = nullcontext(args.postgres_url) if args.postgres_url else temporary_postgres()
+    with server as url:
+        postgres_results, postgres_timings, app = run_checks(url, args.rows, now)
+        with app.app_context():
+            from models import db
+            db.engine.dispose()
+
+    mismatches = 0
+    print(f"{'langkah':<16}{'status':>8}{'sqlite ms':>12}{'postgres ms':>13}  hasil")
+    for name, (status, payload) in sqlite_results.items():
+        other_status, other_payload = postgres_results[name]
+        same = status == other_status and payload == other_payload
+        mismatches += not same
+        print(f"{name:<16}{status:>8}{sqlite_timings[name]:>12.1f}{postgres_timings[name]:>13.1f}  "
+              f"{'✅ sama' if same else '❌ berbeda'}")
+        if not same:
+            print(f'  sqlite   [{status}]: {json.dumps(payload, default=str)[:500]}')
+            print(f'  postgres [{other_status}]: {json.dumps(other_payload, default=str)[:500]}')
+        elif status >= 400:
+            mismatches += 1
+            print(f'  kedua database gagal: {json.dumps(payload, default=str)[:500]}')
+
+    if mismatches:
+        print(f'\n❌ {mismatches} langkah berbeda atau gagal')
+        sys.exit(1)
+    print('\n✅ SQLite dan PostgreSQL memberi hasil yang sama')
+
+if __name__ == '__main__':
+    main()
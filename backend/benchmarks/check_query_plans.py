@@ -0,0 +1,88 @@
+"""Pastikan setiap kombinasi filter list transaksi memakai index, bukan full scan.
+
+Menjalankan EXPLAIN QUERY PLAN (SQLite) untuk query yang dibangun oleh
+TransactionQueryBuilder dan keluar dengan status 1 jika ada yang men-scan
+tabel transaction tanpa index.
+
+Contoh:
+    python -m benchmarks.check_query_plans --rows 20000
+"""
+import argparse
+import itertools
+import sys
+
+from werkzeug.datastructures import MultiDict
+
+from benchmarks._common import create_bench_app, seed_user_transactions
+
+FILTERS = {
+    'month': '2024-05',
+    'date_range': {'start_date': '2024-01-01', 'end_date': '2024-03-31'},
+    'category': None,  # diisi id kategori hasil seed
+    'categories': None,
+    'currency': 'USD',
+    'amount': {'min_amount': '10000', 'max_amount': '500000'}
+}
+SORTS = [('date', 'desc'), ('date', 'asc'), ('amount', 'desc'), ('amount', 'asc')]
+
+def explain(db, query):
+    """EXPLAIN QUERY PLAN untuk query ORM; kembalikan daftar detail plan"""
+    compiled = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True}
+    )
+    params = compiled.construct_params()
+    values = [params[name] for name in compiled.positiontup]
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), tuple(values)).all()
+    return [row[-1] for row in rows]
+
+def uses_full_scan(plan):
+    return any(
+        detail.startswith('SCAN') and 'transaction' in detail and 'INDEX' not in detail
+        for detail in plan
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Cek index usage filter transaksi')
+    parser.add_argument('--rows', type=int, default=20000, help='Transaksi per user')
+    parser.add_argument('--other-users', type=int, default=4)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    user_id = seed_user_transactions(app, args.rows, username='plans')
+    # User lain agar statistik ANALYZE mencerminkan tabel multi-user
+    for i in range(args.other_users):
+        seed_user_transactions(app, args.rows, username=f'noise{i}', seed=100 + i)
+
+    from models import db, Category
+    from utils.query_utils import TransactionQueryBuilder
+
+    failures = 0
+    with app.app_context():
+        db.session.execute(db.text('ANALYZE'))
+        category_ids = [c.id for c in Category.query.filter_by(user_id=user_id).all()]
+        FILTERS['category'] = {'category_id': category_ids[0]}
+        FILTERS['categories'] = {'category_ids': ','.join(category_ids[:3])}
+
+        names = list(FILTERS)
+        for size in range(0, len(names) + 1):
+            for combo in itertools.combinations(names, size):
+                for sort, order in SORTS:
+                    values = MultiDict({'sort': sort, 'order': order})
+                    for name in combo:
+                        value = FILTERS[name]
+                        values.update(value if isinstance(value, dict) else {name: value})
+
+                    builder = TransactionQueryBuilder(user_id).apply_args(values)
+                    for label, query in (('list', builder.ordered()),
+                                         ('count', builder.query.order_by(None))):
+                        plan = explain(db, query)
+                        if uses_full_scan(plan):
+                            failures += 1
+                            print(f"FULL SCAN [{label}] filters={combo or '-'} sort={sort} {order}: {plan}")
+
+    print('✅ Semua kombinasi filter memakai index' if not failures else f'❌ {failures} query tanpa index')
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
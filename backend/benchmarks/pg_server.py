@@ -0,0 +1,65 @@
+"""PostgreSQL sementara di direktori temp untuk benchmark dan pengecekan dialect.
+
+Memakai ``initdb`` dan ``pg_ctl`` dari PATH atau dari direktori ``PG_BIN``.
+Cluster dibuat dengan fsync mati dan dihapus lagi setelah selesai, jadi hanya
+untuk pengujian. PostgreSQL menolak berjalan sebagai root; jalankan script ini
+sebagai user biasa.
+
+Contoh (server tetap hidup sampai Ctrl+C):
+    python -m benchmarks.pg_server
+"""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+
+def find_pg_binary(name):
+    bin_dir = os.getenv('PG_BIN')
+    path = os.path.join(bin_dir, name) if bin_dir else shutil.which(name)
+    if not path or not os.path.exists(path):
+        raise RuntimeError(f'{name} tidak ditemukan; install PostgreSQL atau set PG_BIN')
+    return path
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def temporary_postgres(port=None):
+    """Jalankan cluster PostgreSQL baru; yield URL SQLAlchemy-nya"""
+    initdb = find_pg_binary('initdb')
+    pg_ctl = find_pg_binary('pg_ctl')
+    workdir = tempfile.mkdtemp(prefix='expense-pg-')
+    data_dir = os.path.join(workdir, 'data')
+    port = port or free_port()
+
+    subprocess.run(
+        [initdb, '-D', data_dir, '-U', 'postgres', '-A', 'trust', '-E', 'UTF8'],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    options = f'-p {port} -k {workdir} -c listen_addresses=127.0.0.1 -c fsync=off -c synchronous_commit=off'
+    subprocess.run(
+        [pg_ctl, '-D', data_dir, '-o', options, '-l', os.path.join(workdir, 'postgres.log'), '-w', 'start'],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    try:
+        yield f'postgresql://postgres@127.0.0.1:{port}/postgres'
+    finally:
+        subprocess.run([pg_ctl, '-D', data_dir, '-m', 'fast', 'stop'], stdout=subprocess.DEVNULL)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main():
+    with temporary_postgres() as url:
+        print(f'PostgreSQL siap: {url}')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == '__main__':
+    main()
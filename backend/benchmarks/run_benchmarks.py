@@ -0,0 +1,210 @@
+"""Load test end-to-end untuk endpoint utama API.
+
+Men-seed database sintetis, lalu menjalankan setiap skenario endpoint lewat
+Flask test client (default) atau server lokal (``--base-url``), dan
+melaporkan p50/p95/p99 latency serta throughput. Hasil disimpan sebagai JSON
+agar bisa dibandingkan antar commit dengan ``--compare``.
+
+Contoh:
+    python -m benchmarks.run_benchmarks --users 200 --transactions 200000
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/abc123.json
+    python -m benchmarks.run_benchmarks --base-url http://localhost:5000 --database-url sqlite:////path/db.sqlite3
+    python -m benchmarks.run_benchmarks --postgres --users 50 --transactions 50000
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks._common import BACKEND_DIR, create_bench_app, summarize
+from benchmarks.pg_server import temporary_postgres
+from benchmarks.seed import seed_database
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+
+class HttpClient:
+    """Adapter requests.Session dengan interface mirip Flask test client"""
+
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+
+    def open(self, path, method='GET', **kwargs):
+        return self.session.request(method, self.base_url + path, **kwargs)
+
+def current_month(offset=0):
+    now = datetime.utcnow()
+    index = now.year * 12 + now.month - 1 - offset
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+def build_scenarios(users, categories_by_user):
+    """Daftar (nama, fungsi rng -> (method, path, user_id, json)) per endpoint"""
+    month = current_month()
+
+    def pick(rng):
+        return rng.choice(users)
+
+    def create_transaction(rng):
+        user_id = pick(rng)
+        return ('POST', '/api/transactions', user_id, {
+            'amount': rng.randint(5000, 500000),
+            'description': 'load test',
+            'category_id': rng.choice(categories_by_user[user_id]),
+            # Mata uang base agar tidak memanggil API kurs eksternal
+            'currency': 'IDR'
+        })
+
+    return [
+        ('GET /transactions?month', lambda rng: ('GET', f'/api/transactions?month={month}', pick(rng), None)),
+        ('GET /transactions page', lambda rng: ('GET', '/api/transactions?per_page=50&sort=amount', pick(rng), None)),
+        ('GET /transactions?q', lambda rng: ('GET', '/api/transactions?q=kopi', pick(rng), None)),
+        ('GET /transactions/summary', lambda rng: ('GET', f'/api/transactions/summary?month={month}', pick(rng), None)),
+        ('GET /analytics/trend', lambda rng: ('GET', f'/api/analytics/trend?from={current_month(11)}&to={month}', pick(rng), None)),
+        ('GET /notifications/budget-check', lambda rng: ('GET', '/api/notifications/budget-check', pick(rng), None)),
+        ('POST /transactions', create_transaction),
+        ('GET /export/excel', lambda rng: ('GET', f'/api/export/excel?start_date={month}-01', pick(rng), None)),
+        ('GET /export/pdf', lambda rng: ('GET', f'/api/export/pdf?start_date={month}-01', pick(rng), None)),
+    ]
+
+def run_scenario(make_client, tokens, build_request, total, threads, seed):
+    """Jalankan satu skenario; kembalikan ringkasan latency dan jumlah error"""
+    per_thread = [total // threads + (1 if i < total % threads else 0) for i in range(threads)]
+
+    def worker(args):
+        index, count = args
+        rng = random.Random(seed + index)
+        client = make_client()
+        latencies, errors = [], 0
+        for _ in range(count):
+            method, path, user_id, payload = build_request(rng)
+            kwargs = {'headers': tokens[user_id]}
+            if payload is not None:
+                kwargs['json'] = payload
+            started = time.perf_counter()
+            response = client.open(path, method=method, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(worker, enumerate(per_thread)))
+    elapsed = time.perf_counter() - started
+
+    result = summarize([lat for chunk, _ in results for lat in chunk], elapsed)
+    result['errors'] = sum(errors for _, errors in results)
+    return result
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return 'unknown'
+
+def compare(previous_path, results):
+    """Cetak perubahan p50/p95/throughput dibanding hasil sebelumnya"""
+    with open(previous_path) as f:
+        previous = json.load(f)
+
+    print(f"\nPerbandingan dengan {previous['meta'].get('commit')} ({previous_path}):")
+    for name, current in results['endpoints'].items():
+        before = previous['endpoints'].get(name)
+        if not before:
+            continue
+        deltas = []
+        for key in ('p50_ms', 'p95_ms', 'throughput_rps'):
+            if before[key]:
+                deltas.append(f"{key} {(current[key] - before[key]) / before[key] * 100:+.1f}%")
+        print(f"  {name:<34}{'  '.join(deltas)}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test endpoint API')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--transactions', type=int, default=200000)
+    parser.add_argument('--requests', type=int, default=200, help='Request per endpoint')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--only', nargs='+', help='Jalankan hanya skenario yang namanya mengandung teks ini')
+    parser.add_argument('--database-url', help='Pakai database ini (tanpa seed jika --no-seed)')
+    parser.add_argument('--no-seed', action='store_true', help='Pakai data yang sudah ada di --database-url')
+    parser.add_argument('--postgres', action='store_true', help='Jalankan di PostgreSQL sementara (benchmarks.pg_server)')
+    parser.add_argument('--base-url', help='Jalankan terhadap server lokal, mis. http://localhost:5000')
+    parser.add_argument('--output', help='File JSON hasil (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='File JSON hasil sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    if args.postgres:
+        with temporary_postgres() as database_url:
+            args.database_url = database_url
+            run(args)
+    else:
+        run(args)
+
+def run(args):
+    config = {'SQLALCHEMY_DATABASE_URI': args.database_url} if args.database_url else {}
+    app = create_bench_app(**config)
+
+    from flask_jwt_extended import create_access_token
+    from models import User, Category
+
+    if not args.no_seed:
+        seed_database(app, args.users, args.transactions)
+
+    with app.app_context():
+        users = [u.id for u in User.query.filter(User.username.like('seed_%')).limit(args.users).all()]
+        categories_by_user = {}
+        for category in Category.query.filter(Category.user_id.in_(users)).all():
+            categories_by_user.setdefault(category.user_id, []).append(category.id)
+        tokens = {}
+        for user_id in users:
+            tokens[user_id] = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+
+    if args.base_url:
+        # Token harus ditandatangani dengan JWT_SECRET_KEY yang sama dengan server
+        make_client = lambda: HttpClient(args.base_url)
+    else:
+        make_client = app.test_client
+
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'target': args.base_url or 'flask-test-client',
+            'database': args.database_url.split(':')[0] if args.database_url else 'sqlite',
+            'users': len(users),
+            'transactions': args.transactions,
+            'requests_per_endpoint': args.requests,
+            'threads': args.threads
+        },
+        'endpoints': {}
+    }
+
+    print(f"{'endpoint':<34}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'err':>6}")
+    for index, (name, build_request) in enumerate(build_scenarios(users, categories_by_user)):
+        if args.only and not any(part in name for part in args.only):
+            continue
+        result = run_scenario(make_client, tokens, build_request, args.requests, args.threads, seed=index * 1000)
+        results['endpoints'][name] = result
+        print(f"{name:<34}{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}"
+              f"{result['throughput_rps']:>10}{result['errors']:>6}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'\nHasil disimpan di {output}')
+
+    if args.compare:
+        compare(args.compare, results)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Generator data sintetis dalam jumlah besar untuk benchmark dan load test.
+
+Membuat ribuan user (dengan kategori default), lalu jutaan transaksi yang
+tersebar di semua mata uang yang didukung dan beberapa bulan terakhir.
+
+Contoh:
+    python -m benchmarks.seed --users 2000 --transactions 2000000 --database-url sqlite:////tmp/seed.sqlite3
+"""
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks._common import create_bench_app
+
+SEED_PASSWORD = 'bench-password'
+
+# Mata uang transaksi: sebagian besar IDR, sisanya tersebar di mata uang lain
+CURRENCY_WEIGHTS = {
+    'IDR': 70, 'USD': 8, 'SGD': 5, 'MYR': 4, 'JPY': 4,
+    'EUR': 3, 'AUD': 2, 'GBP': 2, 'CAD': 1, 'CHF': 1
+}
+
+DESCRIPTIONS = {
+    'Makanan & Minuman': ['makan siang', 'kopi', 'makan malam', 'sarapan', 'jajan', 'roti', 'bakso'],
+    'Transportasi': ['bensin', 'parkir', 'tol', 'gojek', 'grab', 'kereta', 'bus'],
+    'Belanja': ['belanja bulanan', 'sayur', 'baju', 'sepatu', 'pasar', 'minimarket'],
+    'Hiburan': ['bioskop', 'konser', 'langganan streaming', 'game', 'karaoke'],
+    'Kesehatan': ['obat', 'dokter', 'vitamin', 'gym', 'apotek'],
+    'Lainnya': ['pulsa', 'internet', 'listrik', 'air', 'arisan', 'hadiah']
+}
+
+# Rentang jumlah (dalam mata uang transaksi) per kategori
+AMOUNT_RANGES = {
+    'IDR': (5000, 1500000), 'JPY': (300, 20000)
+}
+DEFAULT_AMOUNT_RANGE = (1, 150)
+
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+def seed_database(app, users=1000, transactions=1000000, months=24, seed=42, batch_size=20000, log=print):
+    """Isi database app dengan data sintetis; kembalikan list (user_id, username)"""
+    from models import db, User, Category, Transaction
+    from routes.auth_routes import DEFAULT_CATEGORIES
+    from utils.currency_utils import CurrencyConverter
+    from utils.security_utils import hash_password
+    from utils.key_utils import new_uuid
+    from utils.migration_utils import backfill_change_seq
+    from utils.money_utils import money_values, to_base_minor
+    from utils.shard_utils import execute_sharded, shard_engines
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    # Satu hash dipakai semua user; hashing ribuan password akan mendominasi waktu seed
+    password_hash = hash_password(SEED_PASSWORD)
+    currencies = list(CURRENCY_WEIGHTS)
+    weights = list(CURRENCY_WEIGHTS.values())
+    rates = {c: CurrencyConverter.get_fallback_rate(c, 'IDR') if c != 'IDR' else 1.0 for c in currencies}
+
+    started = time.perf_counter()
+    with app.app_context():
+        run_id = uuid.uuid4().hex[:6]
+        user_rows, category_rows = [], []
+        user_categories = []
+        for i in range(users):
+            user_id = new_uuid()
+            username = f'seed_{run_id}_{i}'
+            budget_limit = rng.choice([0, 2000000, 5000000, 10000000])
+            user_rows.append({
+                'id': user_id,
+                'username': username,
+                'email': f'{username}@seed.local',
+                'password_hash': password_hash,
+                'budget_limit': float(budget_limit),
+                'budget_limit_minor': to_base_minor(budget_limit),
+                'base_currency': 'IDR',
+                'created_at': now
+            })
+            categories = []
+            for cat in DEFAULT_CATEGORIES:
+                category_id = new_uuid()
+                categories.append((category_id, cat['name']))
+                category_rows.append({
+                    'id': category_id,
+                    'name': cat['name'],
+                    'color': cat['color'],
+                    'user_id': user_id,
+                    'created_at': now
+                })
+            user_categories.append((user_id, username, categories))
+
+        for chunk in _chunks(user_rows, batch_size):
+            db.session.execute(User.__table__.insert(), chunk)
+        for chunk in _chunks(category_rows, batch_size):
+            execute_sharded(db.session, Category.__table__.insert(), chunk)
+        db.session.commit()
+        log(f'{users} user dan {len(category_rows)} kategori dibuat')
+
+        span = months * 30 * 86400
+        batch = []
+        for n in range(transactions):
+            # Distribusi condong: sebagian user jauh lebih aktif dari yang lain
+            user_id, _, categories = user_categories[int(users * rng.random() ** 2)]
+            category_id, category_name = rng.choice(categories)
+            currency = rng.choices(currencies, weights)[0]
+            low, high = AMOUNT_RANGES.get(currency, DEFAULT_AMOUNT_RANGE)
+            amount = round(rng.uniform(low, high), 0 if currency in ('IDR', 'JPY') else 2)
+            batch.append({
+                'id': new_uuid(),
+                **money_values(amount, currency, rates[currency]),
+                'description': rng.choice(DESCRIPTIONS[category_name]),
+                'date': now - timedelta(seconds=rng.randrange(span)),
+                'currency': currency,
+                'user_id': user_id,
+                'category_id': category_id,
+                'created_at': now,
+                'updated_at': now
+            })
+            if len(batch) == batch_size:
+                execute_sharded(db.session, Transaction.__table__.insert(), batch)
+                db.session.commit()
+                batch = []
+                if (n + 1) % (batch_size * 10) == 0:
+                    log(f'{n + 1} transaksi ({time.perf_counter() - started:.1f}s)')
+        if batch:
+            execute_sharded(db.session, Transaction.__table__.insert(), batch)
+            db.session.commit()
+
+        for engine in [db.engine, *shard_engines(db).values()]:
+            # INSERT core tidak melewati event ORM yang mengisi change_seq
+            with engine.begin() as conn:
+                backfill_change_seq(conn)
+            if engine.dialect.name == 'sqlite':
+                with engine.begin() as conn:
+                    conn.exec_driver_sql('ANALYZE')
+
+    log(f'✅ Seed selesai: {users} user, {transactions} transaksi ({time.perf_counter() - started:.1f}s)')
+    return [(user_id, username) for user_id, username, _ in user_categories]
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate data sintetis untuk benchmark')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--transactions', type=int, default=1000000)
+    parser.add_argument('--months', type=int, default=24)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='Default: SQLite sementara')
+    args = parser.parse_args()
+
+    config = {'SQLALCHEMY_DATABASE_URI': args.database_url} if args.database_url else {}
+    app = create_bench_app(**config)
+    print(f"Database: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    seed_database(app, args.users, args.transactions, args.months, args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import click
+import os
+from datetime import datetime, timedelta
+from flask import current_app
+from models import db
+from utils.archive_utils import archive_cutoff, archive_transactions
+from utils.backup_utils import (
+    BackupError, backup_label, database_engines, list_backups, restore_sqlite, run_backups, sqlite_path
+)
+from utils.idempotency_utils import purge_expired_keys
+from utils.sync_utils import compact_tombstones
+from utils.search_utils import rebuild_search_index
+from utils.shard_utils import rebalance_shards, shard_engines, sharding_enabled
+
+def register_commands(app):
+    """Daftarkan perintah CLI ``flask`` untuk maintenance"""
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Bangun ulang index full-text search transaksi"""
+        if db.engine.dialect.name != 'sqlite':
+            click.echo('Index FTS5 hanya dipakai di SQLite; PostgreSQL mencari langsung dengan tsvector')
+            return
+
+        total = rebuild_search_index(db.engine)
+        click.echo(f'✅ Index pencarian dibangun ulang: {total} transaksi')
+        for index, engine in shard_engines(db).items():
+            total = rebuild_search_index(engine)
+            click.echo(f'✅ Index pencarian shard_{index} dibangun ulang: {total} transaksi')
+
+    @app.cli.command('rebalance-shards')
+    @click.option('--from-default', is_flag=True, help='Pindahkan juga data dari database utama (migrasi awal ke mode shard)')
+    @click.option('--dry-run', is_flag=True, help='Hanya tampilkan user yang akan dipindahkan')
+    def rebalance_shards_command(from_default, dry_run):
+        """Pindahkan data user ke shard yang benar sesuai SHARD_COUNT"""
+        if not sharding_enabled():
+            click.echo('SHARD_COUNT belum diatur; sharding tidak aktif')
+            return
+
+        result = rebalance_shards(db, include_default=from_default, dry_run=dry_run, log=click.echo)
+        action = 'akan dipindahkan' if dry_run else 'dipindahkan'
+        click.echo(f"✅ {result['users']} user {action} ({result['rows']} baris)")
+
+    @app.cli.command('archive-transactions')
+    @click.option('--months', type=int, help='Archive transaksi yang lebih lama dari N bulan (default ARCHIVE_AFTER_MONTHS)')
+    @click.option('--batch-size', default=2000, show_default=True, help='Transaksi per batch/transaksi database')
+    @click.option('--dry-run', is_flag=True, help='Hanya hitung transaksi yang akan di-archive')
+    def archive_transactions_command(months, batch_size, dry_run):
+        """Pindahkan transaksi lama ke archive dan simpan total bulanannya"""
+        if months is None:
+            months = current_app.config['ARCHIVE_AFTER_MONTHS']
+        try:
+            before = archive_cutoff(months)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--months')
+
+        result = archive_transactions(before, batch_size=batch_size, dry_run=dry_run, log=click.echo)
+        action = 'akan di-archive' if dry_run else 'di-archive'
+        click.echo(f"✅ {result['transactions']} transaksi sebelum {before:%Y-%m-%d} {action} ({result['users']} user)")
+
+    @app.cli.command('purge-idempotency-keys')
+    def purge_idempotency_keys_command():
+        """Hapus Idempotency-Key yang sudah kedaluwarsa (jalankan berkala, mis. cron)"""
+        total = purge_expired_keys(db.engine)
+        for engine in shard_engines(db).values():
+            total += purge_expired_keys(engine)
+        click.echo(f'✅ {total} idempotency key kedaluwarsa dihapus')
+
+    @app.cli.command('compact-sync-tombstones')
+    @click.option('--days', type=int, help='Hapus tombstone yang lebih lama dari N hari (default SYNC_TOMBSTONE_DAYS)')
+    def compact_sync_tombstones_command(days):
+        """Hapus tombstone delta sync lama; client dengan token lebih lama akan sync ulang penuh"""
+        if days is None:
+            days = current_app.config['SYNC_TOMBSTONE_DAYS']
+        before = datetime.utcnow() - timedelta(days=days)
+        total = compact_tombstones(db.engine, before)
+        for engine in shard_engines(db).values():
+            total += compact_tombstones(engine, before)
+        click.echo(f'✅ {total} tombstone sebelum {before:%Y-%m-%d} dihapus')
+
+    @app.cli.command('backup-database')
+    @click.option('--dir', 'directory', help='Direktori tujuan (default BACKUP_DIR)')
+    @click.option('--keep', type=int, help='Jumlah backup terbaru per database yang disimpan (default BACKUP_KEEP)')
+    def backup_database_command(directory, keep):
+        """Backup online database SQLite (utama dan shard) ke file .gz dengan checksum"""
+        config = dict(current_app.config)
+        if directory:
+            config['BACKUP_DIR'] = directory
+        if keep is not None:
+            config['BACKUP_KEEP'] = keep
+        try:
+            results = run_backups(db, config, log=click.echo)
+        except BackupError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"✅ {len(results)} database di-backup ke {config['BACKUP_DIR']}")
+
+    @app.cli.command('restore-backup')
+    @click.argument('backup_file', required=False)
+    @click.option('--target', help='Database tujuan: default atau shard_N (default dari nama file)')
+    @click.option('--list', 'list_only', is_flag=True, help='Tampilkan backup yang tersedia di BACKUP_DIR')
+    @click.option('--yes', is_flag=True, help='Jangan minta konfirmasi')
+    def restore_backup_command(backup_file, target, list_only, yes):
+        """Kembalikan database SQLite dari file backup (checksum dicek dulu)"""
+        if list_only or not backup_file:
+            for path in list_backups(current_app.config['BACKUP_DIR']):
+                click.echo(f'{path}  ({os.path.getsize(path) / 1048576:.1f} MB)')
+            return
+
+        target = target or backup_label(backup_file)
+        engines = dict(database_engines(db))
+        if target not in engines:
+            raise click.BadParameter(f"pilih salah satu: {', '.join(engines)}", param_hint='--target')
+        path = sqlite_path(engines[target])
+        if path is None:
+            raise click.ClickException(f'{target} bukan file SQLite')
+
+        if not yes:
+            click.confirm(f'Seluruh isi {path} akan diganti dengan {os.path.basename(backup_file)}. Lanjutkan?', abort=True)
+        try:
+            restore_sqlite(backup_file, path)
+        except BackupError as e:
+            raise click.ClickException(str(e))
+        click.echo(f'✅ {target} dikembalikan dari {backup_file}')
+
+    @app.cli.command('seed-data')
+    @click.option('--users', default=100, show_default=True, help='Jumlah user sintetis')
+    @click.option('--transactions', default=100000, show_default=True, help='Jumlah transaksi sintetis')
+    @click.option('--months', default=24, show_default=True, help='Rentang tanggal transaksi (bulan)')
+    @click.option('--seed', default=42, show_default=True, help='Seed random generator')
+    def seed_data_command(users, transactions, months, seed):
+        """Isi database dengan data sintetis untuk development/benchmark"""
+        from benchmarks.seed import seed_database, SEED_PASSWORD
+
+        seed_database(app, users, transactions, months, seed, log=click.echo)
+        click.echo(f'Password semua user sintetis: {SEED_PASSWORD}')
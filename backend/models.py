@@ -1,50 +1,71 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import create_access_token
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.security_utils import hash_password, verify_password, needs_rehash
+from utils.money_utils import money_values, to_base_minor, from_base_minor, from_minor
+from utils.shard_utils import ShardedSession
+from utils.key_utils import UUIDKey, new_uuid
 from datetime import datetime
-import uuid
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': ShardedSession})
 
 class User(db.Model):
     """Model untuk user/pengguna"""
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
+    # budget_limit (float) hanya cermin dari budget_limit_minor (1/100 base currency)
     budget_limit = db.Column(db.Float, default=0.0)
+    budget_limit_minor = db.Column(db.BigInteger, default=0, nullable=False)
     base_currency = db.Column(db.String(3), default='IDR')
+    # Counter yang dijaga bersama BudgetNotification.is_read agar jumlah unread O(1)
+    unread_notifications = db.Column(db.Integer, default=0, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     transactions = db.relationship('Transaction', backref='user', lazy=True, cascade='all, delete-orphan')
     categories = db.relationship('Category', backref='user', lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
+    
+    def set_budget_limit(self, value):
+        self.budget_limit_minor = to_base_minor(value)
+        self.budget_limit = from_base_minor(self.budget_limit_minor)
     
     def to_dict(self):
         return {
             'id': self.id,
             'username': self.username,
             'email': self.email,
-            'budget_limit': self.budget_limit,
+            'budget_limit': from_base_minor(self.budget_limit_minor),
             'base_currency': self.base_currency,
             'created_at': self.created_at.isoformat()
         }
 
 class Category(db.Model):
     """Model untuk kategori pengeluaran"""
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     color = db.Column(db.String(7), default='#3B82F6')
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Nomor perubahan per user untuk delta sync (diisi otomatis, lihat sync_utils)
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_category_user_change_seq', 'user_id', 'change_seq'),
+    )
     
-    transactions = db.relationship('Transaction', backref='category', lazy=True)
+    # Hapus kategori tidak memuat transaksinya; delete_category sudah menolak kategori yang masih dipakai
+    transactions = db.relationship('Transaction', backref='category', lazy=True, passive_deletes=True)
+    budget = db.relationship('CategoryBudget', backref='category', uselist=False, cascade='all, delete-orphan')
     
     def to_dict(self):
         return {
@@ -58,21 +79,51 @@ class Category(db.Model):
 
 class Transaction(db.Model):
     """Model untuk transaksi pengeluaran"""
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
+    # amount & exchange_rate (float) hanya cermin dari kolom integer di bawah,
+    # dipertahankan untuk filter/sort lama dan database yang sudah ada
     amount = db.Column(db.Float, nullable=False)
     description = db.Column(db.String(200), nullable=False)
     date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     currency = db.Column(db.String(3), default='IDR')
     exchange_rate = db.Column(db.Float, default=1.0)
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
-    category_id = db.Column(db.String(36), db.ForeignKey('category.id'), nullable=False)
+    # Amount dalam minor unit mata uang transaksi, kurs * 10^8, dan hasil
+    # konversi dalam 1/100 base currency; semua agregat memakai base_amount_minor
+    amount_minor = db.Column(db.BigInteger, nullable=False)
+    rate_scaled = db.Column(db.BigInteger, nullable=False)
+    base_amount_minor = db.Column(db.BigInteger, nullable=False)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), nullable=False)
+    category_id = db.Column(UUIDKey, db.ForeignKey('category.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Nomor perubahan per user untuk delta sync (diisi otomatis, lihat sync_utils)
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False)
     
-    def to_dict(self):
+    __table_args__ = (
+        db.Index('ix_transaction_user_date', 'user_id', 'date'),
+        db.Index('ix_transaction_user_change_seq', 'user_id', 'change_seq'),
+        db.Index('ix_transaction_user_category_date', 'user_id', 'category_id', 'date'),
+        db.Index('ix_transaction_user_currency_date', 'user_id', 'currency', 'date'),
+        db.Index('ix_transaction_user_base_amount', 'user_id', 'base_amount_minor'),
+    )
+    
+    def set_money(self, amount, currency, exchange_rate):
+        """Isi currency, amount, kurs dan hasil konversi secara konsisten"""
+        self.currency = currency
+        for column, value in money_values(amount, currency, exchange_rate).items():
+            setattr(self, column, value)
+    
+    @property
+    def converted_amount(self):
+        return from_base_minor(self.base_amount_minor)
+    
+    def to_dict(self, fields=None):
+        """Dict untuk response API; ``fields`` membatasi key (lihat TRANSACTION_FIELDS)"""
+        if fields is not None:
+            return {field: TRANSACTION_FIELDS[field][1](self) for field in fields}
         return {
             'id': self.id,
-            'amount': self.amount,
+            'amount': from_minor(self.amount_minor, self.currency),
             'description': self.description,
             'date': self.date.isoformat(),
             'currency': self.currency,
@@ -85,15 +136,106 @@ class Transaction(db.Model):
             'updated_at': self.updated_at.isoformat()
         }
 
+# Key Transaction.to_dict() -> (kolom yang harus dimuat, pembentuk nilai);
+# dipakai untuk sparse fieldset ``?fields=`` di list transaksi
+TRANSACTION_FIELDS = {
+    'id': (('id',), lambda t: t.id),
+    'amount': (('amount_minor', 'currency'), lambda t: from_minor(t.amount_minor, t.currency)),
+    'description': (('description',), lambda t: t.description),
+    'date': (('date',), lambda t: t.date.isoformat()),
+    'currency': (('currency',), lambda t: t.currency),
+    'exchange_rate': (('exchange_rate',), lambda t: t.exchange_rate),
+    'user_id': (('user_id',), lambda t: t.user_id),
+    'category_id': (('category_id',), lambda t: t.category_id),
+    'category_name': (('category_id',), lambda t: t.category.name if t.category else None),
+    'category_color': (('category_id',), lambda t: t.category.color if t.category else None),
+    'created_at': (('created_at',), lambda t: t.created_at.isoformat()),
+    'updated_at': (('updated_at',), lambda t: t.updated_at.isoformat())
+}
+
+class ArchivedTransaction(db.Model):
+    """Transaksi lama yang dipindahkan dari tabel transaction oleh job archive.
+
+    Hanya kolom yang dibutuhkan export; amount dihitung dari amount_minor.
+    Total per bulan per kategori juga disimpan di MonthlyRollup.
+    """
+    id = db.Column(UUIDKey, primary_key=True)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), nullable=False)
+    category_id = db.Column(UUIDKey, db.ForeignKey('category.id'), nullable=False)
+    date = db.Column(db.DateTime, nullable=False)
+    description = db.Column(db.String(200), nullable=False)
+    currency = db.Column(db.String(3), default='IDR')
+    amount_minor = db.Column(db.BigInteger, nullable=False)
+    rate_scaled = db.Column(db.BigInteger, nullable=False)
+    base_amount_minor = db.Column(db.BigInteger, nullable=False)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    category = db.relationship('Category')
+    
+    __table_args__ = (
+        db.Index('ix_archived_transaction_user_date', 'user_id', 'date'),
+        db.Index('ix_archived_transaction_category_date', 'category_id', 'date'),
+    )
+    
+    @property
+    def amount(self):
+        return from_minor(self.amount_minor, self.currency)
+
+class MonthlyRollup(db.Model):
+    """Total base_amount_minor transaksi yang sudah di-archive, per user/bulan/kategori"""
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), nullable=False)
+    category_id = db.Column(UUIDKey, db.ForeignKey('category.id'), nullable=False)
+    # Bulan YYYY-MM, sama dengan key bucket month di aggregation_utils
+    period = db.Column(db.String(7), nullable=False)
+    total_minor = db.Column(db.BigInteger, default=0, nullable=False)
+    transaction_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period', 'category_id', name='uq_monthly_rollup_period_category'),
+    )
+
+class CategoryBudget(db.Model):
+    """Budget bulanan satu kategori, dalam 1/100 base currency seperti User.budget_limit_minor"""
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), nullable=False)
+    category_id = db.Column(UUIDKey, db.ForeignKey('category.id'), nullable=False)
+    limit_minor = db.Column(db.BigInteger, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'category_id', name='uq_category_budget_user_category'),
+    )
+    
+    def set_limit(self, value):
+        self.limit_minor = to_base_minor(value)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'category_id': self.category_id,
+            'budget_limit': from_base_minor(self.limit_minor),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
 class BudgetNotification(db.Model):
     """Model untuk menyimpan notifikasi budget"""
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('user.id'), nullable=False)
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), nullable=False)
     message = db.Column(db.Text, nullable=False)
     type = db.Column(db.String(20), nullable=False)
     is_read = db.Column(db.Boolean, default=False)
+    # Bulan (YYYY-MM) dan threshold persen (80/90/100) yang memicu notifikasi
+    period = db.Column(db.String(7))
+    threshold = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'period', 'threshold', name='uq_budget_notification_threshold'),
+        db.Index('ix_budget_notification_user_read_created', 'user_id', 'is_read', 'created_at'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -101,5 +243,58 @@ class BudgetNotification(db.Model):
             'message': self.message,
             'type': self.type,
             'is_read': self.is_read,
+            'period': self.period,
+            'threshold': self.threshold,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class IdempotencyKey(db.Model):
+    """Response tersimpan untuk header Idempotency-Key pada request tulis.
+
+    Baris dibuat (response_status NULL) sebelum handler berjalan sebagai
+    kunci untuk request paralel dengan key yang sama, lalu diisi response
+    handler. Berlaku sampai ``expires_at``.
+    """
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    # Hash method, path dan body; key yang sama dengan request berbeda ditolak
+    request_hash = db.Column(db.String(64), nullable=False)
+    response_status = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    response_mimetype = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'key', name='uq_idempotency_key_user_key'),
+        db.Index('ix_idempotency_key_expires_at', 'expires_at'),
+    )
+
+class SyncState(db.Model):
+    """Counter perubahan per user untuk delta sync.
+
+    ``change_seq`` dinaikkan dalam transaksi database yang sama dengan setiap
+    perubahan kategori/transaksi, sehingga nomornya berurutan sesuai commit.
+    ``compacted_seq`` adalah nomor tombstone tertinggi yang sudah dihapus;
+    token sync yang lebih lama harus sync ulang penuh.
+    """
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), unique=True, nullable=False)
+    change_seq = db.Column(db.BigInteger, default=0, nullable=False)
+    compacted_seq = db.Column(db.BigInteger, default=0, nullable=False)
+
+class SyncTombstone(db.Model):
+    """Catatan kategori/transaksi yang dihapus, untuk delta sync"""
+    id = db.Column(UUIDKey, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDKey, db.ForeignKey('user.id'), nullable=False)
+    # Nama tabel entitas: category atau transaction
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(UUIDKey, nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_sync_tombstone_user_change_seq', 'user_id', 'change_seq'),
+        db.Index('ix_sync_tombstone_deleted_at', 'deleted_at'),
+    )
@@ -0,0 +1,250 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import timedelta
+from models import Category, Transaction
+from utils.aggregation_utils import (
+    aggregate_expenses, bucket_keys, month_range, shift_years, BUCKET_FORMATS
+)
+from utils.analytics_utils import get_frame, EPOCH
+from utils.money_utils import from_base_minor
+import logging
+
+analytics_bp = Blueprint('analytics', __name__)
+logger = logging.getLogger(__name__)
+
+MAX_DAY_BUCKETS = 366
+WEEKDAYS = ['Senin', 'Selasa', 'Rabu', 'Kamis', 'Jumat', 'Sabtu', 'Minggu']
+
+def _bucket_totals(rows):
+    """Kelompokkan hasil aggregate_expenses menjadi {bucket: {total, categories}}"""
+    buckets = {}
+    for row in rows:
+        bucket = buckets.setdefault(row.bucket, {'total_minor': 0, 'categories': []})
+        bucket['total_minor'] += row.total_minor or 0
+        bucket['categories'].append({
+            'category_id': row.category_id,
+            'name': row.name,
+            'color': row.color,
+            'total': from_base_minor(row.total_minor)
+        })
+    for bucket in buckets.values():
+        bucket['total'] = from_base_minor(bucket['total_minor'])
+    return buckets
+
+def _shift_bucket_key(key, years):
+    """Geser key bucket (selalu diawali YYYY) sebanyak ``years`` tahun"""
+    return f"{int(key[:4]) + years:04d}{key[4:]}"
+
+@analytics_bp.route('/analytics/trend', methods=['GET'])
+@jwt_required()
+def get_trend():
+    """Endpoint untuk tren pengeluaran per bucket waktu dan per kategori"""
+    try:
+        user_id = get_jwt_identity()
+        from_month = request.args.get('from')
+        to_month = request.args.get('to')
+        granularity = request.args.get('granularity', 'month')
+        compare = request.args.get('compare')
+
+        if not from_month or not to_month:
+            return jsonify({'error': 'Parameter from dan to (YYYY-MM) diperlukan'}), 400
+
+        if granularity not in BUCKET_FORMATS:
+            return jsonify({'error': 'Granularity harus day, week, atau month'}), 400
+
+        try:
+            start, _ = month_range(from_month)
+            _, end = month_range(to_month)
+        except ValueError:
+            return jsonify({'error': 'Format bulan tidak valid. Gunakan format YYYY-MM'}), 400
+
+        if start >= end:
+            return jsonify({'error': 'Parameter from harus sebelum atau sama dengan to'}), 400
+
+        if granularity == 'day' and (end - start).days > MAX_DAY_BUCKETS:
+            return jsonify({'error': f'Granularity day maksimal {MAX_DAY_BUCKETS} hari'}), 400
+
+        current = _bucket_totals(aggregate_expenses(user_id, start, end, granularity))
+
+        previous = None
+        if compare == 'yoy':
+            previous_rows = aggregate_expenses(
+                user_id, shift_years(start, -1), shift_years(end, -1), granularity
+            )
+            previous = {
+                _shift_bucket_key(key, 1): value
+                for key, value in _bucket_totals(previous_rows).items()
+            }
+
+        buckets = []
+        for key in bucket_keys(start, end, granularity):
+            bucket = current.get(key, {'total': 0.0, 'categories': []})
+            item = {
+                'bucket': key,
+                'total': bucket['total'],
+                'categories': bucket['categories']
+            }
+
+            if previous is not None:
+                previous_total = previous.get(key, {'total': 0.0})['total']
+                item['previous_total'] = previous_total
+                item['yoy_change'] = (
+                    round((bucket['total'] - previous_total) / previous_total * 100, 2)
+                    if previous_total > 0 else None
+                )
+
+            buckets.append(item)
+
+        return jsonify({
+            'from': from_month,
+            'to': to_month,
+            'granularity': granularity,
+            'buckets': buckets,
+            'total_expenses': from_base_minor(sum(bucket['total_minor'] for bucket in current.values()))
+        }), 200
+
+    except Exception as e:
+        logger.exception('Gagal menghitung trend')
+        return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
+
+def _category_lookup(user_id):
+    """Map id kategori ke (name, color) untuk melengkapi hasil analytics"""
+    return {
+        c.id: {'name': c.name, 'color': c.color}
+        for c in Category.query.filter_by(user_id=user_id).all()
+    }
+
+@analytics_bp.route('/analytics/rolling', methods=['GET'])
+@jwt_required()
+def get_rolling_average():
+    """Endpoint untuk rata-rata bergulir pengeluaran harian"""
+    try:
+        user_id = get_jwt_identity()
+        window = request.args.get('window', 7, type=int)
+        days = request.args.get('days', 90, type=int)
+
+        if not 1 <= window <= 365 or not 1 <= days <= 3660:
+            return jsonify({'error': 'Parameter window (1-365) atau days (1-3660) tidak valid'}), 400
+
+        result = get_frame(user_id).rolling_average(window_days=window, days=days)
+        start = EPOCH + timedelta(days=int(result['start_day']))
+
+        return jsonify({
+            'window': window,
+            'series': [
+                {
+                    'date': (start + timedelta(days=i)).strftime('%Y-%m-%d'),
+                    'total': float(total),
+                    'rolling_average': float(average)
+                }
+                for i, (total, average) in enumerate(zip(result['daily_totals'], result['rolling_average']))
+            ]
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
+
+@analytics_bp.route('/analytics/percentiles', methods=['GET'])
+@jwt_required()
+def get_percentiles():
+    """Endpoint untuk percentile amount transaksi"""
+    try:
+        user_id = get_jwt_identity()
+        by_category = request.args.get('by') == 'category'
+
+        try:
+            quantiles = [float(q) for q in request.args.get('q', '50,90,95,99').split(',')]
+        except ValueError:
+            return jsonify({'error': 'Parameter q harus berupa daftar angka'}), 400
+
+        if not quantiles or any(q < 0 or q > 100 for q in quantiles):
+            return jsonify({'error': 'Parameter q harus di antara 0-100'}), 400
+
+        frame = get_frame(user_id)
+        result = frame.percentiles(quantiles, by_category=by_category)
+
+        if not by_category:
+            return jsonify({
+                'count': len(frame),
+                'percentiles': dict(zip(map(str, quantiles), result))
+            }), 200
+
+        categories = _category_lookup(user_id)
+        return jsonify({
+            'count': len(frame),
+            'categories': [
+                {
+                    'category_id': category_id,
+                    'name': categories.get(category_id, {}).get('name'),
+                    'percentiles': dict(zip(map(str, quantiles), values))
+                }
+                for category_id, values in result.items()
+            ]
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
+
+@analytics_bp.route('/analytics/heatmap', methods=['GET'])
+@jwt_required()
+def get_heatmap():
+    """Endpoint untuk heatmap pengeluaran per hari dan jam"""
+    try:
+        user_id = get_jwt_identity()
+        totals, counts = get_frame(user_id).heatmap()
+
+        return jsonify({
+            'weekdays': WEEKDAYS,
+            'hours': list(range(24)),
+            'totals': totals.round(2).tolist(),
+            'counts': counts.tolist(),
+            'weekday_totals': totals.sum(axis=1).round(2).tolist(),
+            'hour_totals': totals.sum(axis=0).round(2).tolist()
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
+
+@analytics_bp.route('/analytics/anomalies', methods=['GET'])
+@jwt_required()
+def get_anomalies():
+    """Endpoint untuk transaksi yang jauh di atas rata-rata kategorinya"""
+    try:
+        user_id = get_jwt_identity()
+        sigma = request.args.get('sigma', 3.0, type=float)
+        limit = min(request.args.get('limit', 50, type=int), 500)
+
+        frame = get_frame(user_id)
+        indexes, scores = frame.anomalies(sigma=sigma)
+        counts, means, stds = frame.category_stats()
+
+        flagged = indexes[:limit]
+        transactions = {
+            t.id: t for t in Transaction.query.filter(
+                Transaction.user_id == user_id,
+                Transaction.id.in_([frame.ids[i] for i in flagged])
+            ).all()
+        } if len(flagged) else {}
+
+        anomalies = []
+        for i in flagged:
+            transaction = transactions.get(frame.ids[i])
+            if not transaction:
+                continue
+            code = frame.category_codes[i]
+            anomalies.append({
+                'transaction': transaction.to_dict(),
+                'converted_amount': float(frame.amounts[i]),
+                'category_mean': float(means[code]),
+                'category_std': float(stds[code]),
+                'z_score': round(float(scores[i]), 2)
+            })
+
+        return jsonify({
+            'sigma': sigma,
+            'total_flagged': int(len(indexes)),
+            'anomalies': anomalies
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
@@ -1,11 +1,24 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from models import db, User
+from utils.ratelimit_utils import rate_limited
+from utils.shard_utils import using_shard
 from datetime import timedelta
 
 auth_bp = Blueprint('auth', __name__)
 
+# Kategori default untuk setiap user baru
+DEFAULT_CATEGORIES = [
+    {'name': 'Makanan & Minuman', 'color': '#EF4444'},
+    {'name': 'Transportasi', 'color': '#3B82F6'},
+    {'name': 'Belanja', 'color': '#10B981'},
+    {'name': 'Hiburan', 'color': '#8B5CF6'},
+    {'name': 'Kesehatan', 'color': '#06B6D4'},
+    {'name': 'Lainnya', 'color': '#6B7280'}
+]
+
 @auth_bp.route('/register', methods=['POST'])
+@rate_limited('auth', heavy=True)
 def register():
     """Endpoint untuk registrasi user baru"""
     try:
@@ -32,26 +45,18 @@ def register():
         db.session.add(user)
         db.session.commit()
         
-        # Buat default categories untuk user baru
-        default_categories = [
-            {'name': 'Makanan & Minuman', 'color': '#EF4444'},
-            {'name': 'Transportasi', 'color': '#3B82F6'},
-            {'name': 'Belanja', 'color': '#10B981'},
-            {'name': 'Hiburan', 'color': '#8B5CF6'},
-            {'name': 'Kesehatan', 'color': '#06B6D4'},
-            {'name': 'Lainnya', 'color': '#6B7280'}
-        ]
-        
+        # Buat default categories untuk user baru (di shard milik user jika sharding aktif)
         from models import Category
-        for cat_data in default_categories:
-            category = Category(
-                name=cat_data['name'],
-                color=cat_data['color'],
-                user_id=user.id
-            )
-            db.session.add(category)
-        
-        db.session.commit()
+        with using_shard(user.id):
+            for cat_data in DEFAULT_CATEGORIES:
+                category = Category(
+                    name=cat_data['name'],
+                    color=cat_data['color'],
+                    user_id=user.id
+                )
+                db.session.add(category)
+            
+            db.session.commit()
         
         return jsonify({
             'message': 'User berhasil dibuat',
@@ -63,6 +68,7 @@ def register():
         return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limited('auth', heavy=True)
 def login():
     """Endpoint untuk login user"""
     try:
@@ -77,6 +83,11 @@ def login():
         
         # Verifikasi user dan password
         if user and user.check_password(data['password']):
+            # Upgrade hash secara transparan jika metode/cost berubah
+            if user.password_needs_rehash():
+                user.set_password(data['password'])
+                db.session.commit()
+            
             # Buat JWT token
             access_token = create_access_token(
                 identity=user.id,
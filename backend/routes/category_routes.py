@@ -1,20 +1,31 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, Category
+from utils.category_utils import category_in_use, category_stats, stats_dict
 
 category_bp = Blueprint('categories', __name__)
 
 @category_bp.route('/categories', methods=['GET'])
 @jwt_required()
 def get_categories():
-    """Endpoint untuk mendapatkan semua kategori user"""
+    """Endpoint untuk mendapatkan semua kategori user.
+
+    ``with_stats=1`` menambahkan jumlah transaksi, total, total bulan ini dan
+    tanggal terakhir dipakai per kategori (dari query ter-group, bukan per kategori).
+    """
     try:
         user_id = get_jwt_identity()
         
         categories = Category.query.filter_by(user_id=user_id).order_by(Category.name).all()
+        result = [c.to_dict() for c in categories]
+        
+        if request.args.get('with_stats') in ('1', 'true'):
+            stats = category_stats(user_id)
+            for item in result:
+                item['stats'] = stats_dict(stats.get(item['id']))
         
         return jsonify({
-            'categories': [c.to_dict() for c in categories]
+            'categories': result
         }), 200
         
     except Exception as e:
@@ -106,8 +117,8 @@ def delete_category(category_id):
         if not category:
             return jsonify({'error': 'Kategori tidak ditemukan'}), 404
         
-        # Cek apakah kategori digunakan oleh transaksi
-        if category.transactions:
+        # Cek apakah kategori digunakan oleh transaksi (termasuk yang sudah di-archive)
+        if category_in_use(user_id, category.id):
             return jsonify({
                 'error': 'Tidak dapat menghapus kategori yang masih digunakan oleh transaksi'
             }), 400
@@ -0,0 +1,93 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from models import User, Transaction
+from routes.notification_routes import (
+    category_budgets, empty_budget_status, monthly_spending_by_category, monthly_spending_minor
+)
+from utils.aggregation_utils import (
+    archived_expenses, grouped_totals, merge_totals, month_range, summarize_categories
+)
+from utils.money_utils import from_base_minor
+from utils.notification_utils import combined_budget_status, current_period
+from utils.query_utils import TransactionQueryBuilder, parse_fields, parse_pagination, transaction_load_options
+import logging
+
+dashboard_bp = Blueprint('dashboard', __name__)
+logger = logging.getLogger(__name__)
+
+DEFAULT_RECENT_PER_PAGE = 5
+
+@dashboard_bp.route('/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    """Endpoint untuk semua data dashboard dalam satu request.
+
+    Berisi profil, ringkasan kategori bulan ``month``, status budget bulan
+    berjalan, transaksi terbaru bulan ``month`` (``page``, ``per_page``
+    default 5, ``fields``) dan jumlah notifikasi unread. User dimuat sekali
+    dan aggregate bulanan dihitung sekali: dipakai untuk ringkasan, total
+    paginasi dan, jika ``month`` adalah bulan berjalan, status budget
+    (termasuk semua budget kategori).
+    Transaksi archive ikut di ringkasan, tetapi tidak di daftar transaksi.
+    """
+    try:
+        user_id = get_jwt_identity()
+        period = current_period()
+        month = request.args.get('month') or period
+
+        try:
+            start, end = month_range(month)
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        user = User.query.get(user_id)
+        if not user:
+            return jsonify({'error': 'User tidak ditemukan'}), 404
+
+        # Sama dengan aggregate_expenses, tapi bagian transaksi aktif dipakai lagi untuk paginasi
+        live_rows = grouped_totals(Transaction, user_id, start, end)
+        rows = merge_totals(live_rows, archived_expenses(user_id, start, end))
+        categories_summary, total_minor = summarize_categories(rows)
+
+        budgets = category_budgets(user_id)
+        if month == period:
+            spending_minor = total_minor
+            spent_by_category = {row.category_id: row.total_minor for row in rows}
+        elif budgets:
+            spent_by_category = monthly_spending_by_category(user_id, period)
+            spending_minor = sum(spent_by_category.values())
+        else:
+            spent_by_category = {}
+            spending_minor = monthly_spending_minor(user_id, period) if user.budget_limit_minor > 0 else 0
+        status = (combined_budget_status(user.budget_limit_minor, spending_minor, budgets, spent_by_category)
+                  or empty_budget_status())
+
+        page, per_page = parse_pagination(request.args, default_per_page=DEFAULT_RECENT_PER_PAGE)
+        builder = TransactionQueryBuilder(user_id).filter_date_range(start, end)
+        recent = (builder.ordered().options(*transaction_load_options(fields))
+                  .limit(per_page).offset((page - 1) * per_page).all())
+
+        return jsonify({
+            'month': month,
+            'profile': user.to_dict(),
+            'summary': {
+                'summary': categories_summary,
+                'total_expenses': from_base_minor(total_minor),
+                'month': month
+            },
+            'budget_status': status,
+            'recent_transactions': {
+                'transactions': [t.to_dict(fields) for t in recent],
+                # Dari aggregate yang sama, tanpa query COUNT terpisah
+                'total': sum(row.transaction_count for row in live_rows),
+                'total_amount': from_base_minor(sum(row.total_minor or 0 for row in live_rows)),
+                'page': page,
+                'per_page': per_page
+            },
+            'unread_count': user.unread_notifications
+        }), 200
+
+    except Exception as e:
+        logger.exception('Gagal memuat dashboard')
+        return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
@@ -3,11 +3,13 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 import io
 from utils.export_utils import generate_pdf_report, generate_excel_report
+from utils.ratelimit_utils import rate_limited
 
 export_bp = Blueprint('export', __name__)
 
 @export_bp.route('/export/pdf', methods=['GET'])
 @jwt_required()
+@rate_limited('export', heavy=True)
 def export_pdf():
     """Endpoint untuk export data ke PDF"""
     try:
@@ -38,6 +40,7 @@ def export_pdf():
 
 @export_bp.route('/export/excel', methods=['GET'])
 @jwt_required()
+@rate_limited('export', heavy=True)
 def export_excel():
     """Endpoint untuk export data ke Excel"""
     try:
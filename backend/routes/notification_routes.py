@@ -1,67 +1,129 @@
-from flask import Blueprint, request, jsonify
+from decimal import InvalidOperation
+from flask import Blueprint, request, jsonify, Response, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User, Transaction, BudgetNotification
-from datetime import datetime
-from sqlalchemy import extract, func
+from sqlalchemy.exc import IntegrityError
+from models import db, User, Category, CategoryBudget, Transaction, BudgetNotification
+from utils.aggregation_utils import month_range, sum_minor
+from utils.notification_utils import (
+    combined_budget_status, current_period, mark_notifications_read,
+    record_threshold_crossing, threshold_for, unread_count
+)
+from utils.events_utils import broker, format_sse
+from utils.money_utils import to_base_minor, from_base_minor
+import logging
 
 notification_bp = Blueprint('notifications', __name__)
+logger = logging.getLogger(__name__)
 
-def currency_formatter(amount):
-    """Format amount ke string currency"""
-    return f"Rp {amount:,.0f}" if amount else "Rp 0"
+def empty_budget_status():
+    return {
+        'budget_limit': 0,
+        'current_spending': 0,
+        'percentage': 0,
+        'notifications': [],
+        'categories': []
+    }
 
-def check_budget_limit(user_id, transaction_amount=0):
-    """Cek apakah pengeluaran sudah mendekati/melampaui budget limit"""
+def publish_budget_status(user_id, budget_status, notification=None):
+    """Dorong status budget (dan notifikasi baru) ke stream SSE user yang terbuka"""
+    if not broker.has_subscribers(user_id):
+        return
+    broker.publish(user_id, 'budget', budget_status or empty_budget_status())
+    if notification is not None:
+        broker.publish(user_id, 'notification', {
+            'notification': notification.to_dict(),
+            'unread_count': unread_count(user_id)
+        })
+
+def monthly_spending_minor(user_id, period):
+    """Total pengeluaran bulan ``period`` (YYYY-MM) dalam integer 1/100 base currency"""
+    start, end = month_range(period)
+    return db.session.query(
+        sum_minor(Transaction.base_amount_minor)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= start,
+        Transaction.date < end
+    ).scalar() or 0
+
+def monthly_spending_by_category(user_id, period, category_ids=None):
+    """{category_id: total_minor} bulan ``period`` dalam satu GROUP BY.
+
+    Dengan ``category_ids`` hanya kategori itu yang dibaca, lewat index
+    (user_id, category_id, date).
+    """
+    start, end = month_range(period)
+    query = db.session.query(
+        Transaction.category_id,
+        sum_minor(Transaction.base_amount_minor)
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.date >= start,
+        Transaction.date < end
+    )
+    if category_ids is not None:
+        query = query.filter(Transaction.category_id.in_(category_ids))
+    return {category_id: total or 0 for category_id, total in query.group_by(Transaction.category_id)}
+
+def category_budgets(user_id, category_ids=None):
+    """Budget kategori user sebagai (category_id, nama, limit_minor), urut nama kategori"""
+    query = db.session.query(CategoryBudget.category_id, Category.name, CategoryBudget.limit_minor).join(
+        Category, Category.id == CategoryBudget.category_id
+    ).filter(CategoryBudget.user_id == user_id)
+    if category_ids is not None:
+        query = query.filter(CategoryBudget.category_id.in_(category_ids))
+    return [tuple(row) for row in query.order_by(Category.name)]
+
+def check_budget_limit(user_id, transaction_amount=0, record=False, category_ids=None):
+    """Cek apakah pengeluaran sudah mendekati/melampaui budget bulanan dan budget kategori.
+
+    ``transaction_amount`` ditambahkan ke total bulan ini untuk transaksi yang
+    belum disimpan; setelah commit cukup panggil tanpa amount. Dengan
+    ``category_ids`` (kategori yang baru diubah) hanya budget kategori itu
+    yang dievaluasi dan ada di ``categories``; tanpanya semua budget kategori.
+    Pengeluaran semua kategori dihitung dalam satu GROUP BY, bukan satu query
+    per kategori. Dengan ``record=True`` threshold budget bulanan yang baru
+    dilewati disimpan sebagai BudgetNotification (sekali per threshold per
+    bulan) dan status terbaru dikirim ke stream SSE user.
+    """
     try:
         user = User.query.get(user_id)
-        if not user or user.budget_limit <= 0:
+        budgets = category_budgets(user_id, category_ids) if user else []
+        if not user or (user.budget_limit_minor <= 0 and not budgets):
+            if record:
+                publish_budget_status(user_id, None)
             return None
         
-        current_month = datetime.now().month
-        current_year = datetime.now().year
-        
-        monthly_expenses = db.session.query(
-            func.sum(Transaction.amount * Transaction.exchange_rate)
-        ).filter(
-            Transaction.user_id == user_id,
-            extract('year', Transaction.date) == current_year,
-            extract('month', Transaction.date) == current_month
-        ).scalar() or 0
-        
-        total_with_new = monthly_expenses + transaction_amount
-        budget_limit = user.budget_limit
-        percentage = (total_with_new / budget_limit) * 100 if budget_limit > 0 else 0
-        
-        notifications = []
-        
-        if percentage >= 100:
-            notifications.append({
-                'type': 'danger',
-                'message': f'⚠️ Budget terlampaui! Pengeluaran {percentage:.1f}% dari budget bulanan ({currency_formatter(total_with_new)} / {currency_formatter(budget_limit)})',
-                'percentage': percentage
-            })
-        elif percentage >= 90:
-            notifications.append({
-                'type': 'warning', 
-                'message': f'💰 Budget hampir habis! Pengeluaran {percentage:.1f}% dari budget bulanan ({currency_formatter(total_with_new)} / {currency_formatter(budget_limit)})',
-                'percentage': percentage
-            })
-        elif percentage >= 80:
-            notifications.append({
-                'type': 'info',
-                'message': f'📊 Pengeluaran {percentage:.1f}% dari budget bulanan ({currency_formatter(total_with_new)} / {currency_formatter(budget_limit)})',
-                'percentage': percentage
-            })
-        
-        return {
-            'budget_limit': budget_limit,
-            'current_spending': total_with_new,
-            'percentage': percentage,
-            'notifications': notifications
-        }
+        period = current_period()
+        if not budgets:
+            spent_by_category = {}
+            total_minor = monthly_spending_minor(user_id, period)
+        else:
+            # Total bulanan hanya dibutuhkan jika budget bulanan diatur
+            spent_by_category = monthly_spending_by_category(
+                user_id, period, None if user.budget_limit_minor > 0 else [budget[0] for budget in budgets]
+            )
+            total_minor = sum(spent_by_category.values())
+        total_minor += to_base_minor(transaction_amount)
+        budget_status = combined_budget_status(user.budget_limit_minor, total_minor, budgets, spent_by_category)
+        
+        notification = None
+        crossed = threshold_for(budget_status['percentage'])
+        if record and crossed:
+            notification = record_threshold_crossing(
+                user_id, period, budget_status['percentage'],
+                budget_status['current_spending'], budget_status['budget_limit']
+            )
+            if notification:
+                db.session.commit()
         
-    except Exception as e:
-        print(f"Error checking budget: {str(e)}")
+        if record:
+            publish_budget_status(user_id, budget_status, notification)
+        return budget_status
+        
+    except Exception:
+        db.session.rollback()
+        logger.exception('Gagal mengecek budget')
         return None
 
 @notification_bp.route('/notifications/budget-check', methods=['GET'])
@@ -75,12 +137,7 @@ def get_budget_status():
         if budget_status:
             return jsonify(budget_status), 200
         else:
-            return jsonify({
-                'budget_limit': 0,
-                'current_spending': 0,
-                'percentage': 0,
-                'notifications': []
-            }), 200
+            return jsonify(empty_budget_status()), 200
             
     except Exception as e:
         return jsonify({'error': f'Gagal memeriksa budget: {str(e)}'}), 500
@@ -100,14 +157,14 @@ def set_budget_limit():
         if not user:
             return jsonify({'error': 'User tidak ditemukan'}), 404
         
-        user.budget_limit = float(data['budget_limit'])
+        user.set_budget_limit(data['budget_limit'])
         db.session.commit()
         
-        budget_status = check_budget_limit(user_id)
+        budget_status = check_budget_limit(user_id, record=True)
         
         return jsonify({
             'message': 'Budget limit berhasil diupdate',
-            'budget_limit': user.budget_limit,
+            'budget_limit': from_base_minor(user.budget_limit_minor),
             'budget_status': budget_status
         }), 200
         
@@ -115,20 +172,183 @@ def set_budget_limit():
         db.session.rollback()
         return jsonify({'error': f'Gagal mengatur budget limit: {str(e)}'}), 500
 
+@notification_bp.route('/notifications/category-budgets/<category_id>', methods=['PUT'])
+@jwt_required()
+def set_category_budget(category_id):
+    """Endpoint untuk mengatur budget bulanan satu kategori (``budget_limit`` > 0)"""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        if not data or data.get('budget_limit') is None:
+            return jsonify({'error': 'Budget limit diperlukan'}), 400
+        try:
+            limit_minor = to_base_minor(data['budget_limit'])
+        except (InvalidOperation, TypeError, ValueError):
+            return jsonify({'error': 'Budget limit harus berupa angka'}), 400
+        if limit_minor <= 0:
+            return jsonify({'error': 'Budget limit harus lebih dari 0'}), 400
+        
+        category = Category.query.filter_by(id=category_id, user_id=user_id).first()
+        if not category:
+            return jsonify({'error': 'Kategori tidak ditemukan'}), 404
+        
+        budget = CategoryBudget.query.filter_by(user_id=user_id, category_id=category.id).first()
+        if budget is None:
+            budget = CategoryBudget(user_id=user_id, category_id=category.id)
+            db.session.add(budget)
+        budget.limit_minor = limit_minor
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Request paralel sudah membuat budget kategori ini; timpa limitnya
+            db.session.rollback()
+            budget = CategoryBudget.query.filter_by(user_id=user_id, category_id=category.id).first()
+            budget.limit_minor = limit_minor
+            db.session.commit()
+        
+        return jsonify({
+            'message': 'Budget kategori berhasil diupdate',
+            'category_budget': budget.to_dict(),
+            'budget_status': check_budget_limit(user_id, record=True, category_ids=[category.id])
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Gagal mengatur budget kategori: {str(e)}'}), 500
+
+@notification_bp.route('/notifications/category-budgets/<category_id>', methods=['DELETE'])
+@jwt_required()
+def delete_category_budget(category_id):
+    """Endpoint untuk menghapus budget kategori"""
+    try:
+        user_id = get_jwt_identity()
+        
+        budget = CategoryBudget.query.filter_by(user_id=user_id, category_id=category_id).first()
+        if not budget:
+            return jsonify({'error': 'Budget kategori tidak ditemukan'}), 404
+        
+        db.session.delete(budget)
+        db.session.commit()
+        
+        return jsonify({
+            'message': 'Budget kategori berhasil dihapus',
+            'budget_status': check_budget_limit(user_id, record=True)
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Gagal menghapus budget kategori: {str(e)}'}), 500
+
 @notification_bp.route('/notifications', methods=['GET'])
 @jwt_required()
 def get_notifications():
-    """Endpoint untuk mendapatkan notifikasi"""
+    """Endpoint untuk mendapatkan notifikasi terbaru (``?unread=1`` untuk yang belum dibaca saja)"""
+    try:
+        user_id = get_jwt_identity()
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        
+        query = BudgetNotification.query.filter(BudgetNotification.user_id == user_id)
+        if request.args.get('unread') in ('1', 'true'):
+            # Prefix (user_id, is_read) dari index, urut created_at tanpa sort tambahan
+            query = query.filter(BudgetNotification.is_read == False)
+        notifications = query.order_by(BudgetNotification.created_at.desc()).limit(limit).all()
+        
+        return jsonify({
+            'notifications': [n.to_dict() for n in notifications],
+            'unread_count': unread_count(user_id)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Gagal mengambil notifikasi: {str(e)}'}), 500
+
+@notification_bp.route('/notifications/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    """Endpoint murah untuk polling jumlah notifikasi yang belum dibaca"""
+    try:
+        user_id = get_jwt_identity()
+        return jsonify({'unread_count': unread_count(user_id)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Gagal mengambil jumlah notifikasi: {str(e)}'}), 500
+
+@notification_bp.route('/notifications/mark-read', methods=['POST'])
+@jwt_required()
+def mark_read():
+    """Endpoint untuk menandai beberapa notifikasi (atau semua dengan ``all: true``) sudah dibaca"""
     try:
         user_id = get_jwt_identity()
+        data = request.get_json() or {}
         
-        notifications = BudgetNotification.query.filter_by(
-            user_id=user_id
-        ).order_by(BudgetNotification.created_at.desc()).limit(10).all()
+        if data.get('all'):
+            notification_ids = None
+        else:
+            notification_ids = data.get('ids')
+            if not isinstance(notification_ids, list) or not notification_ids:
+                return jsonify({'error': 'ids (list) atau all: true diperlukan'}), 400
+        
+        updated = mark_notifications_read(user_id, notification_ids)
+        db.session.commit()
+        
+        count = unread_count(user_id)
+        if updated:
+            broker.publish(user_id, 'unread', {'unread_count': count})
         
         return jsonify({
-            'notifications': [n.to_dict() for n in notifications]
+            'message': 'Notifikasi ditandai sudah dibaca',
+            'updated': updated,
+            'unread_count': count
         }), 200
         
     except Exception as e:
-        return jsonify({'error': f'Gagal mengambil notifikasi: {str(e)}'}), 500
\ No newline at end of file
+        db.session.rollback()
+        return jsonify({'error': f'Gagal menandai notifikasi: {str(e)}'}), 500
+
+@notification_bp.route('/notifications/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_notifications():
+    """Endpoint Server-Sent Events untuk status budget dan notifikasi baru.
+
+    EventSource di browser tidak bisa mengirim header, jadi token juga
+    diterima lewat query string ``?jwt=...`` (hanya untuk endpoint ini).
+    Event: ``budget`` (status budget), ``notification`` (notifikasi baru +
+    unread_count) dan ``unread`` (unread_count berubah). Komentar heartbeat
+    dikirim setiap SSE_HEARTBEAT_SECONDS agar proxy tidak menutup koneksi dan
+    koneksi yang sudah putus terdeteksi.
+    """
+    try:
+        user_id = get_jwt_identity()
+        config = current_app.config
+        
+        if broker.connection_count() >= config['SSE_MAX_CONNECTIONS']:
+            return jsonify({'error': 'Terlalu banyak koneksi stream, coba lagi nanti'}), 503
+        
+        # Status awal dihitung sekarang; generator berjalan setelah session DB dilepas
+        initial = [
+            format_sse('budget', check_budget_limit(user_id) or empty_budget_status()),
+            format_sse('unread', {'unread_count': unread_count(user_id)})
+        ]
+        subscription = broker.subscribe(user_id, config['SSE_QUEUE_SIZE'])
+        heartbeat = config['SSE_HEARTBEAT_SECONDS']
+        
+        def generate():
+            try:
+                yield f'retry: {config["SSE_RETRY_MS"]}\n\n'
+                yield from initial
+                while True:
+                    message = subscription.get(timeout=heartbeat)
+                    yield message if message is not None else ': heartbeat\n\n'
+            finally:
+                broker.unsubscribe(subscription)
+        
+        response = Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        # Body yang tidak pernah diiterasi (mis. HEAD) tidak menjalankan finally di generator
+        response.call_on_close(lambda: broker.unsubscribe(subscription))
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': f'Gagal membuka stream notifikasi: {str(e)}'}), 500
@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from utils.sync_utils import DEFAULT_SYNC_LIMIT, MAX_SYNC_LIMIT, parse_sync_token, sync_changes
+import logging
+
+sync_bp = Blueprint('sync', __name__)
+logger = logging.getLogger(__name__)
+
+@sync_bp.route('/sync', methods=['GET'])
+@jwt_required()
+def get_sync():
+    """Endpoint delta sync kategori dan transaksi untuk client offline.
+
+    ``since`` adalah ``token`` dari response sebelumnya (kosong untuk sync
+    pertama). Response hanya berisi data yang dibuat/diubah setelah token itu
+    dan id yang dihapus (``deleted``); ``reset`` berarti snapshot penuh yang
+    menggantikan data lokal, ``has_more`` berarti masih ada halaman berikutnya.
+    """
+    try:
+        user_id = get_jwt_identity()
+        
+        try:
+            since, snapshot = parse_sync_token(request.args.get('since'))
+            limit = int(request.args.get('limit', DEFAULT_SYNC_LIMIT))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        if limit < 1 or limit > MAX_SYNC_LIMIT:
+            return jsonify({'error': f'limit harus 1-{MAX_SYNC_LIMIT}'}), 400
+        
+        return jsonify(sync_changes(user_id, since, limit, snapshot)), 200
+        
+    except Exception as e:
+        logger.exception('Gagal memuat delta sync')
+        return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
@@ -2,47 +2,76 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models import db, Transaction, Category, User
 from datetime import datetime
-from sqlalchemy import func
 from utils.currency_utils import get_cached_exchange_rate
 from routes.notification_routes import check_budget_limit
+from utils.events_utils import broker
+from utils.aggregation_utils import aggregate_expenses, month_range, summarize_categories
+from utils.analytics_utils import invalidate_frame
+from utils.search_utils import apply_search
+from utils.query_utils import TransactionQueryBuilder, parse_fields, parse_pagination, transaction_load_options
+from utils.money_utils import from_base_minor
+from utils.idempotency_utils import idempotent
+import logging
 
 transaction_bp = Blueprint('transactions', __name__)
+logger = logging.getLogger(__name__)
 
 @transaction_bp.route('/transactions', methods=['GET'])
 @jwt_required()
 def get_transactions():
-    """Endpoint untuk mendapatkan semua transaksi user"""
+    """Endpoint untuk mendapatkan transaksi user dengan filter, sorting, dan paginasi.
+
+    ``fields=id,amount,...`` membatasi key tiap transaksi (dan kolom yang dimuat).
+    """
     try:
         user_id = get_jwt_identity()
+        q = request.args.get('q', '').strip()
         
-        category_id = request.args.get('category_id')
-        month = request.args.get('month')
-        
-        query = Transaction.query.filter_by(user_id=user_id)
+        try:
+            builder = TransactionQueryBuilder(user_id).apply_args(request.args)
+            fields = parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if category_id:
-            query = query.filter_by(category_id=category_id)
+        # Pencarian selalu terpaginasi dan diurutkan per relevansi
+        page, per_page = parse_pagination(request.args, default_per_page=20 if q else None)
         
-        if month:
-            year, month_num = map(int, month.split('-'))
-            query = query.filter(
-                db.extract('year', Transaction.date) == year,
-                db.extract('month', Transaction.date) == month_num
-            )
+        if q:
+            query = apply_search(builder.query, user_id, q)
+            if query is None:
+                transactions, total, total_amount = [], 0, 0.0
+            else:
+                builder.query = query
+                total, total_amount = builder.totals()
+                transactions = (query.options(*transaction_load_options(fields))
+                                .limit(per_page).offset((page - 1) * per_page).all())
+        else:
+            total, total_amount = builder.totals()
+            query = builder.ordered().options(*transaction_load_options(fields))
+            if per_page:
+                query = query.limit(per_page).offset((page - 1) * per_page)
+            transactions = query.all()
+        
+        response = {
+            'transactions': [t.to_dict(fields) for t in transactions],
+            'total': total,
+            'total_amount': total_amount
+        }
+        if per_page:
+            response.update({'page': page, 'per_page': per_page})
+        if q:
+            response['q'] = q
         
-        transactions = query.order_by(Transaction.date.desc()).all()
-        
-        return jsonify({
-            'transactions': [t.to_dict() for t in transactions]
-        }), 200
+        return jsonify(response), 200
         
     except Exception as e:
         return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
 
 @transaction_bp.route('/transactions', methods=['POST'])
 @jwt_required()
+@idempotent
 def create_transaction():
-    """Endpoint untuk membuat transaksi baru"""
+    """Endpoint untuk membuat transaksi baru (mendukung header Idempotency-Key)"""
     try:
         user_id = get_jwt_identity()
         data = request.get_json()
@@ -67,36 +96,42 @@ def create_transaction():
             exchange_rate = 1.0
         else:
             exchange_rate = get_cached_exchange_rate(transaction_currency, base_currency)
-            print(f"Transaction: {data['amount']} {transaction_currency} -> {float(data['amount']) * exchange_rate} {base_currency} (rate: {exchange_rate})")
         
         transaction = Transaction(
-            amount=float(data['amount']),
             description=data['description'],
             category_id=data['category_id'],
-            user_id=user_id,
-            currency=transaction_currency,
-            exchange_rate=exchange_rate
+            user_id=user_id
         )
+        transaction.set_money(data['amount'], transaction_currency, exchange_rate)
+        
+        if transaction_currency != base_currency:
+            logger.info(
+                'Transaksi %s %s -> %s %s (rate: %s)',
+                transaction.amount, transaction_currency, transaction.converted_amount, base_currency,
+                transaction.exchange_rate, extra={'sampled': True}
+            )
         
         if data.get('date'):
             transaction.date = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
         
         db.session.add(transaction)
         db.session.commit()
+        invalidate_frame(user_id)
         
-        converted_amount = float(data['amount']) * exchange_rate
-        budget_status = check_budget_limit(user_id, converted_amount)
+        # Transaksi sudah ter-commit dan ikut dihitung; jangan ditambahkan lagi.
+        # Dari budget kategori hanya kategori transaksi ini yang dievaluasi ulang
+        budget_status = check_budget_limit(user_id, record=True, category_ids=[transaction.category_id])
         
         response_data = {
             'message': 'Transaksi berhasil dibuat',
             'transaction': transaction.to_dict(),
             'budget_status': budget_status,
             'conversion_info': {
-                'original_amount': float(data['amount']),
+                'original_amount': transaction.amount,
                 'original_currency': transaction_currency,
-                'converted_amount': converted_amount,
+                'converted_amount': transaction.converted_amount,
                 'converted_currency': base_currency,
-                'exchange_rate': exchange_rate
+                'exchange_rate': transaction.exchange_rate
             }
         }
         
@@ -104,7 +139,7 @@ def create_transaction():
         
     except Exception as e:
         db.session.rollback()
-        print(f"Error creating transaction: {str(e)}")
+        logger.exception('Gagal membuat transaksi')
         return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
 
 @transaction_bp.route('/transactions/<transaction_id>', methods=['PUT'])
@@ -122,6 +157,10 @@ def update_transaction(transaction_id):
         user = User.query.get(user_id)
         base_currency = user.base_currency if user else 'IDR'
         
+        # Kategori lama dan baru, untuk evaluasi ulang budget kategori
+        touched_categories = {transaction.category_id}
+        transaction_currency = transaction.currency
+        exchange_rate = transaction.exchange_rate
         if 'currency' in data:
             transaction_currency = data['currency']
             from utils.currency_utils import CurrencyConverter
@@ -133,29 +172,30 @@ def update_transaction(transaction_id):
                 exchange_rate = 1.0
             else:
                 exchange_rate = get_cached_exchange_rate(transaction_currency, base_currency)
-            
-            transaction.currency = transaction_currency
-            transaction.exchange_rate = exchange_rate
         
-        if 'amount' in data:
-            transaction.amount = float(data['amount'])
+        if 'currency' in data or 'amount' in data:
+            amount = data['amount'] if 'amount' in data else transaction.amount
+            transaction.set_money(amount, transaction_currency, exchange_rate)
         if 'description' in data:
             transaction.description = data['description']
         if 'category_id' in data:
             category = Category.query.filter_by(id=data['category_id'], user_id=user_id).first()
             if not category:
                 return jsonify({'error': 'Kategori tidak ditemukan'}), 404
-            transaction.category_id = data['category_id']
+            transaction.category_id = category.id
+            touched_categories.add(category.id)
         if 'date' in data:
             transaction.date = datetime.fromisoformat(data['date'].replace('Z', '+00:00'))
         
         transaction.updated_at = datetime.utcnow()
         
         db.session.commit()
+        invalidate_frame(user_id)
         
         return jsonify({
             'message': 'Transaksi berhasil diupdate',
-            'transaction': transaction.to_dict()
+            'transaction': transaction.to_dict(),
+            'budget_status': check_budget_limit(user_id, record=True, category_ids=list(touched_categories))
         }), 200
         
     except Exception as e:
@@ -173,8 +213,14 @@ def delete_transaction(transaction_id):
         if not transaction:
             return jsonify({'error': 'Transaksi tidak ditemukan'}), 404
         
+        category_id = transaction.category_id
         db.session.delete(transaction)
         db.session.commit()
+        invalidate_frame(user_id)
+        
+        # Status budget hanya dihitung ulang jika ada tab yang mendengarkan
+        if broker.has_subscribers(user_id):
+            check_budget_limit(user_id, record=True, category_ids=[category_id])
         
         return jsonify({
             'message': 'Transaksi berhasil dihapus'
@@ -195,38 +241,17 @@ def get_summary():
         if not month:
             return jsonify({'error': 'Parameter month (YYYY-MM) diperlukan'}), 400
         
-        year, month_num = map(int, month.split('-'))
-        
-        summary = db.session.query(
-            Category.name,
-            Category.color,
-            func.sum(Transaction.amount * Transaction.exchange_rate).label('total')
-        ).join(Transaction).filter(
-            Transaction.user_id == user_id,
-            db.extract('year', Transaction.date) == year,
-            db.extract('month', Transaction.date) == month_num
-        ).group_by(Category.name, Category.color).all()
-        
-        total_expenses = sum(item.total for item in summary) if summary else 0
-        
-        categories_summary = []
-        for item in summary:
-            percentage = (item.total / total_expenses * 100) if total_expenses > 0 else 0
-            categories_summary.append({
-                'name': item.name,
-                'color': item.color,
-                'total': float(item.total),
-                'percentage': round(percentage, 2)
-            })
+        start, end = month_range(month)
+        categories_summary, total_minor = summarize_categories(aggregate_expenses(user_id, start, end))
         
         return jsonify({
             'summary': categories_summary,
-            'total_expenses': float(total_expenses),
+            'total_expenses': from_base_minor(total_minor),
             'month': month
         }), 200
         
     except Exception as e:
-        print(f"Error in get_summary: {str(e)}")
+        logger.exception('Gagal menghitung summary')
         return jsonify({'error': f'Terjadi kesalahan: {str(e)}'}), 500
 
 @transaction_bp.route('/profile', methods=['GET'])
@@ -265,7 +290,7 @@ def update_profile():
             user.base_currency = data['base_currency']
         
         if 'budget_limit' in data:
-            user.budget_limit = float(data['budget_limit'])
+            user.set_budget_limit(data['budget_limit'])
         
         db.session.commit()
         
@@ -0,0 +1,151 @@
+"""Fixture bersama: app dengan database sementara dan user yang sudah login.
+
+Test yang memakai ``dialect_app`` dijalankan di SQLite dan PostgreSQL.
+PostgreSQL diambil dari TEST_POSTGRES_URL, atau dijalankan sementara lewat
+benchmarks.pg_server (butuh initdb/pg_ctl di PATH atau PG_BIN, bukan sebagai
+root); jika tidak tersedia, varian postgres di-skip.
+"""
+import os
+import subprocess
+import uuid
+from contextlib import ExitStack
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+
+from app import create_app
+from models import db
+
+def make_app(database_url, **config):
+    """App untuk test; hashing password murah dan rate limit mati"""
+    return create_app({
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+        'RATE_LIMIT_ENABLED': False,
+        'LOG_LEVEL': 'WARNING',
+        **config
+    })
+
+@pytest.fixture
+def app_config():
+    """Konfigurasi tambahan untuk fixture ``app``; override di modul test"""
+    return {}
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    app = make_app(f"sqlite:///{tmp_path / 'db.sqlite3'}", **app_config)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def register(client, username='tester', password='tester-password'):
+    """Registrasi dan login; kembalikan header Authorization"""
+    client.post('/api/register', json={'username': username, 'email': f'{username}@test.local', 'password': password})
+    response = client.post('/api/login', json={'username': username, 'password': password})
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+@pytest.fixture
+def auth_headers(client):
+    return register(client)
+
+@pytest.fixture
+def category_ids(client, auth_headers):
+    """Id kategori default user ``auth_headers``"""
+    return [category['id'] for category in client.get('/api/categories', headers=auth_headers).get_json()['categories']]
+
+@pytest.fixture(scope='session')
+def postgres_server():
+    """URL server PostgreSQL untuk seluruh sesi test"""
+    url = os.getenv('TEST_POSTGRES_URL')
+    if url:
+        yield url
+        return
+
+    from benchmarks.pg_server import temporary_postgres
+
+    with ExitStack() as stack:
+        try:
+            url = stack.enter_context(temporary_postgres())
+        except RuntimeError as e:
+            pytest.skip(str(e))
+        except subprocess.CalledProcessError as e:
+            pytest.skip(f'PostgreSQL sementara gagal dijalankan ({e.cmd[0]}); set TEST_POSTGRES_URL')
+        yield url
+
+@pytest.fixture(params=['sqlite', 'postgres'])
+def database_url(request, tmp_path):
+    """URL database kosong: file SQLite baru atau database PostgreSQL baru per test"""
+    if request.param == 'sqlite':
+        yield f"sqlite:///{tmp_path / 'db.sqlite3'}"
+        return
+
+    server = make_url(request.getfixturevalue('postgres_server'))
+    name = f'test_{uuid.uuid4().hex[:12]}'
+    admin = create_engine(server, isolation_level='AUTOCOMMIT')
+    with admin.connect() as conn:
+        conn.exec_driver_sql(f'CREATE DATABASE {name}')
+    try:
+        yield server.set(database=name).render_as_string(hide_password=False)
+    finally:
+        with admin.connect() as conn:
+            conn.exec_driver_sql(f'DROP DATABASE IF EXISTS {name} WITH (FORCE)')
+        admin.dispose()
+
+@pytest.fixture
+def dialect_app(database_url, app_config):
+    app = make_app(database_url, **app_config)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+def add_transaction(app, user_id, category_id, amount, currency, rate, date, description=None):
+    """Simpan transaksi langsung lewat model dengan kurs tetap (tanpa fetch kurs)"""
+    from models import Transaction
+
+    with app.app_context():
+        transaction = Transaction(
+            user_id=user_id, category_id=category_id, date=date,
+            description=description or f'{currency} {amount}'
+        )
+        transaction.set_money(amount, currency, rate)
+        db.session.add(transaction)
+        db.session.commit()
+        return transaction.id
+
+def seed_mixed_currency(app, username='fx'):
+    """User dengan dua kategori dan transaksi IDR/USD/JPY pada Januari-Februari 2024.
+
+    Total dalam base currency (IDR): Januari 100.000, Februari 255.000;
+    kategori Makan 205.000, Transport 150.000.
+    """
+    from datetime import datetime
+    from models import User, Category
+
+    with app.app_context():
+        user = User(username=username, email=f'{username}@test.local')
+        user.set_password('tester-password')
+        db.session.add(user)
+        db.session.flush()
+        food = Category(name='Makan', user_id=user.id)
+        transport = Category(name='Transport', user_id=user.id)
+        db.session.add_all([food, transport])
+        db.session.commit()
+        user_id, food_id, transport_id = user.id, food.id, transport.id
+
+    add_transaction(app, user_id, food_id, 100000, 'IDR', 1, datetime(2024, 1, 10))
+    add_transaction(app, user_id, transport_id, 10, 'USD', 15000, datetime(2024, 2, 5))
+    add_transaction(app, user_id, food_id, 1000, 'JPY', 105, datetime(2024, 2, 20))
+    return user_id, {'Makan': food_id, 'Transport': transport_id}
+
+def token_headers(app, user_id):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
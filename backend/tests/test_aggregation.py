@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import add_transaction, seed_mixed_currency, token_headers
+from utils.aggregation_utils import aggregate_expenses
+from utils.archive_utils import archive_user_transactions
+
+@pytest.fixture
+def fx_user(dialect_app):
+    user_id, categories = seed_mixed_currency(dialect_app)
+    return user_id, categories
+
+def totals(user_id, granularity=None):
+    return sorted(
+        (row.bucket, row.name, row.total_minor, row.transaction_count)
+        for row in aggregate_expenses(user_id, datetime(2023, 1, 1), datetime(2025, 1, 1), granularity)
+    )
+
+def test_summary_per_month(dialect_app, fx_user):
+    user_id, _ = fx_user
+    client = dialect_app.test_client()
+    headers = token_headers(dialect_app, user_id)
+
+    data = client.get('/api/transactions/summary?month=2024-02', headers=headers).get_json()
+    assert data['total_expenses'] == 255000
+    assert {row['name']: row['total'] for row in data['summary']} == {'Makan': 105000, 'Transport': 150000}
+
+    data = client.get('/api/transactions/summary?month=2024-01', headers=headers).get_json()
+    assert data['total_expenses'] == 100000
+
+@pytest.mark.parametrize('granularity', ['day', 'week', 'month'])
+def test_bucket_keys_match_python(dialect_app, fx_user, granularity):
+    user_id, categories = fx_user
+    # Batas minggu %W: 1 Jan 2023 hari Minggu (minggu 00), 1 Jan 2024 hari Senin (minggu 01)
+    for date in (datetime(2023, 1, 1), datetime(2024, 1, 1), datetime(2024, 12, 31)):
+        add_transaction(dialect_app, user_id, categories['Makan'], 1000, 'IDR', 1, date)
+
+    with dialect_app.app_context():
+        buckets = {row[0] for row in totals(user_id, granularity)}
+
+    formats = {'day': '%Y-%m-%d', 'week': '%Y-W%W', 'month': '%Y-%m'}
+    dates = [datetime(2024, 1, 10), datetime(2024, 2, 5), datetime(2024, 2, 20),
+             datetime(2023, 1, 1), datetime(2024, 1, 1), datetime(2024, 12, 31)]
+    assert buckets == {date.strftime(formats[granularity]) for date in dates}
+    if granularity == 'week':
+        assert {'2023-W00', '2024-W01', '2024-W53'} <= buckets
+
+def test_aggregation_unchanged_by_archive(dialect_app, fx_user):
+    user_id, _ = fx_user
+    with dialect_app.app_context():
+        before = totals(user_id, 'month'), totals(user_id)
+        assert archive_user_transactions(user_id, datetime(2024, 2, 1)) == 1
+        assert (totals(user_id, 'month'), totals(user_id)) == before
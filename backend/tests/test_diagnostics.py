@@ -0,0 +1,52 @@
+import pytest
+
+from models import Category, Transaction
+from utils.diagnostics_utils import QueryBudgetExceeded
+
+@pytest.fixture
+def app_config():
+    # TESTING: exception dari after_request diteruskan ke test, bukan menjadi 500
+    return {
+        'TESTING': True,
+        'QUERY_DIAGNOSTICS': True,
+        'QUERY_BUDGET_RAISE': True,
+        'N_PLUS_ONE_THRESHOLD': 3
+    }
+
+@pytest.fixture(autouse=True)
+def n_plus_one_route(app):
+    """Route dengan pola N+1: satu query COUNT per kategori"""
+    @app.route('/test/category-counts')
+    def category_counts():
+        return {
+            category.name: Transaction.query.filter_by(category_id=category.id).count()
+            for category in Category.query.all()
+        }
+
+def test_over_budget_request_fails(app, client, auth_headers):
+    app.config['QUERY_BUDGET'] = 1
+
+    with pytest.raises(QueryBudgetExceeded, match='GET /api/categories menjalankan'):
+        client.get('/api/categories?with_stats=1', headers=auth_headers)
+
+def test_request_within_budget_passes(app, client, auth_headers):
+    app.config['QUERY_BUDGET'] = 20
+
+    assert client.get('/api/categories?with_stats=1', headers=auth_headers).status_code == 200
+
+def test_repeated_statement_flagged_as_n_plus_one(client, auth_headers, caplog):
+    caplog.set_level('WARNING', logger='utils.diagnostics_utils')
+
+    counts = client.get('/test/category-counts').get_json()
+    assert len(counts) > 3
+
+    warnings = [record.getMessage() for record in caplog.records if 'Kemungkinan N+1' in record.getMessage()]
+    assert len(warnings) == 1
+    assert f'dijalankan {len(counts)} kali di GET /test/category-counts' in warnings[0]
+    assert 'count(*)' in warnings[0].lower()
+
+def test_distinct_statements_not_flagged(client, auth_headers, caplog):
+    caplog.set_level('WARNING', logger='utils.diagnostics_utils')
+
+    assert client.get('/api/categories?with_stats=1', headers=auth_headers).status_code == 200
+    assert not [record for record in caplog.records if 'Kemungkinan N+1' in record.getMessage()]
@@ -0,0 +1,68 @@
+import io
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+
+from conftest import seed_mixed_currency, token_headers
+from utils.archive_utils import archive_user_transactions
+
+@pytest.fixture
+def fx_user(dialect_app):
+    user_id, _ = seed_mixed_currency(dialect_app)
+    return user_id, token_headers(dialect_app, user_id)
+
+def export_excel(client, headers):
+    response = client.get('/api/export/excel', headers=headers)
+    assert response.status_code == 200
+    return load_workbook(io.BytesIO(response.data))
+
+def sections(sheet):
+    """Baris sheet Ringkasan per judul section ('' untuk baris total di atas)"""
+    result = {'': {}}
+    current = ''
+    rows = iter(sheet.iter_rows(values_only=True))
+    for row in rows:
+        if not any(value is not None for value in row):
+            continue
+        if row[0] and all(value is None for value in row[1:]):
+            current = row[0]
+            result[current] = {}
+            next(rows)
+            continue
+        result[current][row[0]] = row[1:]
+    return result
+
+def check_totals(workbook):
+    detail = list(workbook['Laporan Pengeluaran'].iter_rows(min_row=2, values_only=True))
+    *rows, total = detail
+    assert total[2] == 'TOTAL'
+    assert total[5] == sum(row[5] for row in rows) == 355000
+
+    summary = sections(workbook['Ringkasan'])
+    assert summary['']['Total Transaksi'][0] == 3
+    assert summary['']['Total Pengeluaran (IDR)'][0] == 355000
+    assert {name: row[1] for name, row in summary['Per Kategori'].items()} == {'Makan': 205000, 'Transport': 150000}
+    assert summary['Per Mata Uang'] == {
+        'IDR': (1, 100000, 100000),
+        'USD': (1, 10, 150000),
+        'JPY': (1, 1000, 105000)
+    }
+    assert {month: row[1] for month, row in summary['Per Bulan'].items()} == {'2024-01': 100000, '2024-02': 255000}
+
+def test_excel_totals_match_rows(dialect_app, fx_user):
+    _, headers = fx_user
+    check_totals(export_excel(dialect_app.test_client(), headers))
+
+def test_excel_totals_include_archive(dialect_app, fx_user):
+    user_id, headers = fx_user
+    with dialect_app.app_context():
+        assert archive_user_transactions(user_id, datetime(2024, 2, 1)) == 1
+
+    check_totals(export_excel(dialect_app.test_client(), headers))
+
+def test_pdf_export(dialect_app, fx_user):
+    _, headers = fx_user
+    response = dialect_app.test_client().get('/api/export/pdf', headers=headers)
+    assert response.status_code == 200
+    assert response.data.startswith(b'%PDF')
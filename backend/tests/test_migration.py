@@ -0,0 +1,57 @@
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from conftest import add_transaction, seed_mixed_currency
+from models import db, Transaction
+from utils.migration_utils import migrate_schema
+
+MONEY_COLUMNS = ('amount_minor', 'rate_scaled', 'base_amount_minor')
+
+def downgrade_money_columns(engine):
+    """Kembalikan tabel transaction ke skema sebelum kolom integer uang"""
+    with engine.begin() as conn:
+        conn.exec_driver_sql('DROP INDEX ix_transaction_user_base_amount')
+        conn.exec_driver_sql('CREATE INDEX ix_transaction_user_amount ON "transaction" (user_id, amount)')
+        for column in MONEY_COLUMNS:
+            conn.exec_driver_sql(f'ALTER TABLE "transaction" DROP COLUMN {column}')
+
+def money_rows():
+    return {
+        row.id: (row.amount_minor, row.rate_scaled, row.base_amount_minor, row.updated_at)
+        for row in db.session.execute(db.select(
+            Transaction.id, Transaction.amount_minor, Transaction.rate_scaled,
+            Transaction.base_amount_minor, Transaction.updated_at
+        ))
+    }
+
+def test_migration_backfills_money_columns(dialect_app):
+    user_id, categories = seed_mixed_currency(dialect_app)
+    add_transaction(dialect_app, user_id, categories['Makan'], 12.5, 'USD', 15123.4567, datetime(2024, 3, 1))
+
+    with dialect_app.app_context():
+        expected = money_rows()
+        db.session.rollback()
+        downgrade_money_columns(db.engine)
+        migrate_schema(db.engine)
+
+        assert money_rows() == expected
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('transaction')}
+        assert 'ix_transaction_user_base_amount' in indexes
+        assert 'ix_transaction_user_amount' not in indexes
+
+        total = db.session.execute(text('SELECT SUM(base_amount_minor) FROM "transaction"')).scalar()
+        assert total == sum(values[2] for values in expected.values())
+
+def test_migration_is_idempotent(dialect_app, caplog):
+    seed_mixed_currency(dialect_app)
+
+    with dialect_app.app_context():
+        expected = money_rows()
+        db.session.rollback()
+        caplog.set_level('INFO', logger='utils.migration_utils')
+        migrate_schema(db.engine)
+        migrate_schema(db.engine)
+
+        assert money_rows() == expected
+        assert not [record for record in caplog.records if record.name == 'utils.migration_utils']
@@ -0,0 +1,88 @@
+from datetime import datetime
+
+import pytest
+
+from conftest import add_transaction, seed_mixed_currency, token_headers
+from models import db, Category, Transaction
+from utils.search_utils import FTS_TABLE, KEY_TABLE, drop_search_index, install_search_index
+
+@pytest.fixture
+def fx_user(app):
+    user_id, categories = seed_mixed_currency(app)
+    return user_id, categories, token_headers(app, user_id)
+
+def search(client, headers, q):
+    response = client.get('/api/transactions', query_string={'q': q}, headers=headers)
+    assert response.status_code == 200
+    return sorted(transaction['description'] for transaction in response.get_json()['transactions'])
+
+def test_category_rename_updates_index(app, client, fx_user):
+    user_id, categories, headers = fx_user
+    other_id, other_categories = seed_mixed_currency(app, username='other')
+
+    with app.app_context():
+        db.session.get(Category, categories['Makan']).name = 'Kuliner'
+        db.session.commit()
+
+    assert search(client, headers, 'kuliner') == ['IDR 100000', 'JPY 1000']
+    assert search(client, headers, 'makan') == []
+    assert search(client, token_headers(app, other_id), 'makan') == ['IDR 100000', 'JPY 1000']
+
+def test_category_rename_trigger_uses_index(app):
+    trigger_query = (
+        f'SELECT k.fts_rowid FROM "transaction" t JOIN {KEY_TABLE} k ON k.transaction_id = t.id '
+        'WHERE t.user_id = ? AND t.category_id = ?'
+    )
+    with app.app_context():
+        plan = [row[-1] for row in db.session.connection().exec_driver_sql(
+            f'EXPLAIN QUERY PLAN {trigger_query}', (b'\0' * 16, b'\1' * 16)
+        )]
+    assert not [line for line in plan if line.startswith('SCAN')]
+    assert 'ix_transaction_user_category_date' in plan[0]
+
+def test_index_stays_in_sync_after_vacuum(app, client, fx_user):
+    user_id, categories, headers = fx_user
+    ids = [
+        add_transaction(app, user_id, categories['Transport'], 5000, 'IDR', 1, datetime(2024, 3, day), f'Parkir {day}')
+        for day in range(1, 6)
+    ]
+
+    with app.app_context():
+        for transaction_id in ids[:3]:
+            db.session.delete(db.session.get(Transaction, transaction_id))
+        db.session.commit()
+        # VACUUM boleh menomori ulang rowid tabel tanpa INTEGER PRIMARY KEY;
+        # versi SQLite yang tidak melakukannya disimulasikan dengan menggeser rowid
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('VACUUM')
+            conn.exec_driver_sql('UPDATE "transaction" SET rowid = rowid + 1000')
+
+        db.session.get(Transaction, ids[3]).description = 'Tol 4'
+        db.session.delete(db.session.get(Transaction, ids[4]))
+        db.session.commit()
+
+    assert search(client, headers, 'parkir') == []
+    assert search(client, headers, 'tol') == ['Tol 4']
+    assert search(client, headers, 'usd') == ['USD 10']
+
+def test_old_index_rebuilt_on_install(app, client, fx_user):
+    _, _, headers = fx_user
+
+    with app.app_context():
+        with db.engine.begin() as conn:
+            drop_search_index(conn)
+            # Skema lama: rowid FTS = rowid transaction, tanpa tabel key
+            conn.exec_driver_sql(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(description, category_name, user_id, transaction_id UNINDEXED)")
+            conn.exec_driver_sql(
+                f'CREATE TRIGGER transaction_fts_ad AFTER DELETE ON "transaction" BEGIN '
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = old.rowid; END'
+            )
+        install_search_index(db.engine)
+
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql(f'SELECT count(*) FROM {KEY_TABLE}').scalar() == 3
+            assert 'fts_rowid' in conn.exec_driver_sql(
+                "SELECT sql FROM sqlite_master WHERE name = 'transaction_fts_ad'"
+            ).scalar()
+
+    assert search(client, headers, 'makan') == ['IDR 100000', 'JPY 1000']
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from models import db
+from utils.sync_utils import compact_tombstones
+
+def create_transactions(client, headers, category_id, count):
+    ids = []
+    for i in range(count):
+        response = client.post('/api/transactions', json={
+            'amount': 1000 + i, 'description': f'sync {i}', 'category_id': category_id
+        }, headers=headers)
+        assert response.status_code == 201
+        ids.append(response.get_json()['transaction']['id'])
+    return ids
+
+def page_through(client, headers, token, limit, max_pages=50):
+    """Ikuti ``has_more`` sampai habis; kembalikan (halaman, token terakhir)"""
+    pages = []
+    for _ in range(max_pages):
+        response = client.get('/api/sync', query_string={'since': token, 'limit': limit}, headers=headers)
+        assert response.status_code == 200
+        page = response.get_json()
+        pages.append(page)
+        token = page['token']
+        if not page['has_more']:
+            return pages, token
+    raise AssertionError(f'Sync tidak selesai setelah {max_pages} halaman (token {token})')
+
+def test_resync_after_compaction_pages_to_the_end(app, client, auth_headers, category_ids):
+    ids = create_transactions(client, auth_headers, category_ids[0], 8)
+    _, old_token = page_through(client, auth_headers, '', limit=500)
+
+    for transaction_id in ids[:3]:
+        assert client.delete(f'/api/transactions/{transaction_id}', headers=auth_headers).status_code == 200
+    with app.app_context():
+        assert compact_tombstones(db.engine, datetime.utcnow() + timedelta(seconds=1)) == 3
+
+    pages, token = page_through(client, auth_headers, old_token, limit=3)
+
+    assert pages[0]['reset'] is True
+    assert all(page['reset'] is False for page in pages[1:])
+    assert len(pages) > 1
+    synced = [transaction['id'] for page in pages for transaction in page['transactions']]
+    assert sorted(synced) == sorted(ids[3:])
+    assert sum(len(page['categories']) for page in pages) == len(category_ids)
+
+    # Token akhir snapshot adalah token biasa: tidak ada perubahan lagi
+    page = client.get('/api/sync', query_string={'since': token}, headers=auth_headers).get_json()
+    assert (page['reset'], page['has_more'], page['transactions'], page['token']) == (False, False, [], token)
+
+def test_changes_during_resync_arrive_in_next_sync(client, auth_headers, category_ids):
+    ids = create_transactions(client, auth_headers, category_ids[0], 6)
+    first = client.get('/api/sync', query_string={'limit': 2}, headers=auth_headers).get_json()
+    assert first['reset'] and first['has_more'] and ':' in first['token']
+
+    # Diubah dan dihapus setelah halaman pertama snapshot
+    client.put(f'/api/transactions/{ids[-1]}', json={'description': 'diubah'}, headers=auth_headers)
+    client.delete(f'/api/transactions/{ids[-2]}', headers=auth_headers)
+
+    pages, token = page_through(client, auth_headers, first['token'], limit=2)
+    page = client.get('/api/sync', query_string={'since': token}, headers=auth_headers).get_json()
+    assert [t['description'] for t in page['transactions']] == ['diubah']
+    assert page['deleted']['transactions'] == [ids[-2]]
+
+def test_invalid_sync_token(client, auth_headers):
+    for token in ('abc', '-1', '5:3', '1:x'):
+        response = client.get('/api/sync', query_string={'since': token}, headers=auth_headers)
+        assert response.status_code == 400
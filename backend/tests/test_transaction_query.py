@@ -0,0 +1,98 @@
+import itertools
+from datetime import datetime
+
+import pytest
+from werkzeug.datastructures import MultiDict
+
+from benchmarks._common import seed_user_transactions
+from benchmarks.check_query_plans import FILTERS, SORTS, explain
+from conftest import add_transaction as _add_transaction, make_app
+from models import db, Category, User
+
+COMBOS = [combo for size in range(len(FILTERS) + 1) for combo in itertools.combinations(FILTERS, size)]
+
+@pytest.fixture(scope='module')
+def seeded(tmp_path_factory):
+    """Database dengan beberapa user agar statistik ANALYZE mirip tabel multi-user"""
+    app = make_app(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'db.sqlite3'}")
+    user_id = seed_user_transactions(app, 3000, username='plans')
+    for i in range(2):
+        seed_user_transactions(app, 3000, username=f'noise{i}', seed=100 + i)
+    with app.app_context():
+        db.session.execute(db.text('ANALYZE'))
+        category_ids = [category.id for category in Category.query.filter_by(user_id=user_id)]
+    filters = dict(FILTERS, category={'category_id': category_ids[0]}, categories={'category_ids': ','.join(category_ids[:3])})
+    return app, user_id, filters
+
+@pytest.mark.parametrize('sort,order', SORTS)
+@pytest.mark.parametrize('combo', COMBOS, ids=lambda combo: '+'.join(combo) or 'none')
+def test_filter_combinations_use_index(seeded, combo, sort, order):
+    from utils.query_utils import TransactionQueryBuilder
+
+    app, user_id, filters = seeded
+    values = MultiDict({'sort': sort, 'order': order})
+    for name in combo:
+        value = filters[name]
+        values.update(value if isinstance(value, dict) else {name: value})
+
+    with app.app_context():
+        builder = TransactionQueryBuilder(user_id).apply_args(values)
+        for query in (builder.ordered(), builder.query.order_by(None)):
+            plan = [detail for detail in explain(db, query) if 'transaction' in detail]
+            assert plan, 'Query tidak membaca tabel transaction'
+            assert not any(detail.startswith('SCAN') for detail in plan), plan
+            assert all('INDEX' in detail for detail in plan), plan
+
+def add_transaction(app, username, category_id, amount, currency, rate, date):
+    with app.app_context():
+        user_id = User.query.filter_by(username=username).one().id
+    return _add_transaction(app, user_id, category_id, amount, currency, rate, date)
+
+def listed(client, headers, **params):
+    response = client.get('/api/transactions', query_string=params, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+def test_end_date_is_inclusive(app, client, auth_headers, category_ids):
+    inside = add_transaction(app, 'tester', category_ids[0], 1000, 'IDR', 1, datetime(2024, 3, 31, 23, 30))
+    add_transaction(app, 'tester', category_ids[0], 1000, 'IDR', 1, datetime(2024, 4, 1))
+    add_transaction(app, 'tester', category_ids[0], 1000, 'IDR', 1, datetime(2024, 2, 29, 23, 59))
+
+    result = listed(client, auth_headers, start_date='2024-03-01', end_date='2024-03-31')
+    assert [transaction['id'] for transaction in result['transactions']] == [inside]
+
+def test_amount_filter_and_sort_use_base_currency(app, client, auth_headers, category_ids):
+    day = datetime(2024, 5, 1)
+    usd = add_transaction(app, 'tester', category_ids[0], 10, 'USD', 15000, day)      # 150.000
+    jpy = add_transaction(app, 'tester', category_ids[0], 60000, 'JPY', 0.11, day)    # 6.600
+    idr = add_transaction(app, 'tester', category_ids[0], 50000, 'IDR', 1, day)      # 50.000
+
+    def ids(**params):
+        return [transaction['id'] for transaction in listed(client, auth_headers, **params)['transactions']]
+
+    assert ids(min_amount=50000, sort='amount', order='desc') == [usd, idr]
+    assert ids(max_amount=100000, sort='amount', order='asc') == [jpy, idr]
+    assert ids(sort='amount', order='desc') == [usd, idr, jpy]
+
+@pytest.mark.parametrize('value', ['nan', 'inf', '-inf', 'abc'])
+def test_invalid_amount_is_rejected(client, auth_headers, value):
+    response = client.get('/api/transactions', query_string={'min_amount': value}, headers=auth_headers)
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Parameter min_amount harus berupa angka'
+
+def test_multiple_category_ids(app, client, auth_headers, category_ids):
+    day = datetime(2024, 5, 1)
+    for category_id in category_ids[:3]:
+        add_transaction(app, 'tester', category_id, 1000, 'IDR', 1, day)
+
+    result = listed(client, auth_headers, category_ids=','.join(category_ids[:2]))
+    assert sorted(transaction['category_id'] for transaction in result['transactions']) == sorted(category_ids[:2])
+
+def test_total_counts_all_pages(app, client, auth_headers, category_ids):
+    for day in range(1, 8):
+        add_transaction(app, 'tester', category_ids[day % 2], 1000 * day, 'IDR', 1, datetime(2024, 6, day))
+
+    result = listed(client, auth_headers, month='2024-06', category_id=category_ids[1], per_page=2, page=1)
+    assert len(result['transactions']) == 2
+    assert result['total'] == 4
+    assert result['total_amount'] == 1000 * (1 + 3 + 5 + 7)
@@ -0,0 +1,190 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import func, cast, BigInteger, Integer, String
+from models import db, Transaction, ArchivedTransaction, MonthlyRollup, Category
+from utils.money_utils import from_base_minor
+
+# Format bucket, dipakai sama persis oleh SQLite strftime dan Python strftime
+BUCKET_FORMATS = {
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m'
+}
+
+def _postgres_week(date):
+    # Padanan %W: minggu dimulai Senin, hari sebelum Senin pertama = minggu 00
+    week = cast(func.floor((func.extract('doy', date) + 7 - func.extract('isodow', date)) / 7), Integer)
+    return func.to_char(date, 'YYYY') + '-W' + func.lpad(cast(week, String), 2, '0')
+
+# Ekspresi yang menghasilkan key identik dengan BUCKET_FORMATS di PostgreSQL
+POSTGRES_BUCKETS = {
+    'day': lambda date: func.to_char(date, 'YYYY-MM-DD'),
+    'week': _postgres_week,
+    'month': lambda date: func.to_char(date, 'YYYY-MM')
+}
+
+def parse_month(month):
+    """Parse string YYYY-MM menjadi (year, month)"""
+    year, month_num = map(int, month.split('-'))
+    if not 1 <= month_num <= 12:
+        raise ValueError('Bulan harus di antara 01-12')
+    return year, month_num
+
+def month_start(year, month_num):
+    """Tanggal awal bulan; month_num boleh lebih dari 12 (lanjut ke tahun berikutnya)"""
+    year += (month_num - 1) // 12
+    month_num = (month_num - 1) % 12 + 1
+    return datetime(year, month_num, 1)
+
+def month_range(month):
+    """Rentang [awal, akhir) untuk string YYYY-MM, ramah index pada kolom date"""
+    year, month_num = parse_month(month)
+    return month_start(year, month_num), month_start(year, month_num + 1)
+
+def shift_years(value, years):
+    """Geser datetime sebanyak ``years`` tahun (29 Feb menjadi 28 Feb)"""
+    try:
+        return value.replace(year=value.year + years)
+    except ValueError:
+        return value.replace(year=value.year + years, day=28)
+
+# Satu baris hasil aggregate_expenses; bucket None jika tanpa granularity
+AggregateRow = namedtuple('AggregateRow', ['bucket', 'category_id', 'name', 'color', 'total_minor', 'transaction_count'])
+
+def bucket_expression(granularity, dialect='sqlite', column=None):
+    """Ekspresi SQL yang mengubah kolom tanggal (default Transaction.date) menjadi key bucket"""
+    column = Transaction.date if column is None else column
+    if dialect == 'postgresql':
+        return POSTGRES_BUCKETS[granularity](column)
+    return func.strftime(BUCKET_FORMATS[granularity], column)
+
+def sum_minor(column):
+    """SUM kolom integer minor unit yang selalu kembali sebagai int.
+
+    PostgreSQL mengembalikan SUM(bigint) sebagai numeric (Decimal di Python);
+    CAST ke BIGINT membuat hasilnya sama dengan SQLite.
+    """
+    return cast(func.sum(column), BigInteger)
+
+def bucket_keys(start, end, granularity):
+    """Semua key bucket di rentang [start, end), berurutan"""
+    fmt = BUCKET_FORMATS[granularity]
+    keys = []
+    current = start
+    while current < end:
+        key = current.strftime(fmt)
+        if not keys or keys[-1] != key:
+            keys.append(key)
+        current += timedelta(days=1)
+    return keys
+
+def is_month_start(value):
+    return value == datetime(value.year, value.month, 1)
+
+def grouped_totals(model, user_id, start, end, granularity=None):
+    """GROUP BY (bucket,) kategori atas tabel transaksi ``model`` di rentang [start, end)"""
+    columns = [
+        Category.id.label('category_id'),
+        Category.name,
+        Category.color,
+        sum_minor(model.base_amount_minor).label('total_minor'),
+        func.count(model.id).label('transaction_count')
+    ]
+    group_by = [Category.id, Category.name, Category.color]
+
+    if granularity:
+        dialect = db.session.get_bind().dialect.name
+        bucket = bucket_expression(granularity, dialect, model.date).label('bucket')
+        columns.insert(0, bucket)
+        group_by.insert(0, bucket)
+
+    return db.session.query(*columns).join(
+        model, model.category_id == Category.id
+    ).filter(
+        model.user_id == user_id,
+        model.date >= start,
+        model.date < end
+    ).group_by(*group_by).all()
+
+def _rollup_totals(user_id, start, end, granularity=None):
+    """Total transaksi archive dari MonthlyRollup; start dan end harus awal bulan"""
+    columns = [
+        Category.id.label('category_id'),
+        Category.name,
+        Category.color,
+        sum_minor(MonthlyRollup.total_minor).label('total_minor'),
+        cast(func.sum(MonthlyRollup.transaction_count), BigInteger).label('transaction_count')
+    ]
+    group_by = [Category.id, Category.name, Category.color]
+
+    if granularity:
+        columns.insert(0, MonthlyRollup.period.label('bucket'))
+        group_by.insert(0, MonthlyRollup.period)
+
+    return db.session.query(*columns).join(
+        MonthlyRollup, MonthlyRollup.category_id == Category.id
+    ).filter(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.period >= start.strftime(BUCKET_FORMATS['month']),
+        MonthlyRollup.period < end.strftime(BUCKET_FORMATS['month'])
+    ).group_by(*group_by).all()
+
+def archived_expenses(user_id, start, end, granularity=None):
+    """Total transaksi yang sudah di-archive, dengan bentuk hasil yang sama dengan aggregate_expenses.
+
+    Rentang per bulan penuh (summary, trend bulanan) cukup membaca
+    MonthlyRollup; bucket harian/mingguan atau rentang lain dihitung dari
+    tabel archived_transaction.
+    """
+    if granularity in (None, 'month') and is_month_start(start) and is_month_start(end):
+        return _rollup_totals(user_id, start, end, granularity)
+    return grouped_totals(ArchivedTransaction, user_id, start, end, granularity)
+
+def merge_totals(*results):
+    """Gabungkan beberapa hasil GROUP BY menjadi satu AggregateRow per (bucket, kategori)"""
+    merged = {}
+    for rows in results:
+        for row in rows:
+            bucket = getattr(row, 'bucket', None)
+            key = (bucket, row.category_id)
+            previous = merged.get(key)
+            total = (previous.total_minor if previous else 0) + (row.total_minor or 0)
+            count = (previous.transaction_count if previous else 0) + (row.transaction_count or 0)
+            merged[key] = AggregateRow(bucket, row.category_id, row.name, row.color, total, count)
+    return list(merged.values())
+
+def aggregate_expenses(user_id, start, end, granularity=None):
+    """Total pengeluaran per kategori di rentang [start, end).
+
+    ``total_minor`` adalah SUM integer base_amount_minor (1/100 base currency),
+    exact; konversi ke float dilakukan caller setelah semua penjumlahan selesai.
+    ``transaction_count`` adalah jumlah transaksinya.
+
+    Jika ``granularity`` diisi (day/week/month), hasil juga dikelompokkan per
+    bucket waktu. Semua dihitung dalam satu GROUP BY memakai filter rentang
+    tanggal sehingga index (user_id, date) bisa dipakai. Dipakai oleh summary
+    bulanan maupun trend agar angkanya selalu sama. Transaksi yang sudah
+    di-archive ikut dijumlahkan (lihat archived_expenses).
+    """
+    return merge_totals(
+        grouped_totals(Transaction, user_id, start, end, granularity),
+        archived_expenses(user_id, start, end, granularity)
+    )
+
+def summarize_categories(rows):
+    """Ringkasan per kategori dari aggregate_expenses; kembalikan (list, total_minor).
+
+    Total dijumlahkan dalam integer (1/100 base currency) dan dikonversi sekali
+    di akhir; bentuk list sama dengan ``summary`` di /transactions/summary.
+    """
+    total_minor = sum(row.total_minor for row in rows)
+    summary = []
+    for row in rows:
+        percentage = (row.total_minor / total_minor * 100) if total_minor > 0 else 0
+        summary.append({
+            'name': row.name,
+            'color': row.color,
+            'total': from_base_minor(row.total_minor),
+            'percentage': round(percentage, 2)
+        })
+    return summary, total_minor
@@ -0,0 +1,203 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from models import db, Transaction, SyncState
+from utils.money_utils import BASE_SCALE
+
+SECONDS_PER_DAY = 86400
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+CACHE_MAX_USERS = 128
+
+class ExpenseFrame:
+    """Data transaksi satu user dalam bentuk kolom NumPy yang ringkas.
+
+    Kolom disimpan terurut berdasarkan tanggal:
+    - ``ids``: id transaksi (object array, hanya dipakai untuk hasil anomali)
+    - ``timestamps``: epoch detik (int64)
+    - ``category_codes``: index ke ``category_ids`` (int32)
+    - ``amounts``: amount hasil konversi ke base currency (float64)
+    """
+
+    __slots__ = ('ids', 'timestamps', 'category_codes', 'category_ids', 'amounts')
+
+    def __init__(self, ids, timestamps, category_codes, category_ids, amounts):
+        self.ids = ids
+        self.timestamps = timestamps
+        self.category_codes = category_codes
+        self.category_ids = category_ids
+        self.amounts = amounts
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @classmethod
+    def from_rows(cls, rows, amount_scale=1):
+        """Bangun frame dari iterable (id, date, category_id, amount).
+
+        ``amount_scale`` membagi amount setelah dimuat, mis. 100 untuk kolom
+        integer base_amount_minor.
+        """
+        ids, timestamps, codes, amounts = [], [], [], []
+        category_codes = {}
+        for row_id, date, category_id, amount in rows:
+            ids.append(row_id)
+            timestamps.append((date - EPOCH) // ONE_SECOND)
+            codes.append(category_codes.setdefault(category_id, len(category_codes)))
+            amounts.append(amount or 0.0)
+
+        return cls(
+            ids=np.array(ids, dtype=object),
+            timestamps=np.array(timestamps, dtype=np.int64),
+            category_codes=np.array(codes, dtype=np.int32),
+            category_ids=list(category_codes),
+            amounts=np.array(amounts, dtype=np.float64) / amount_scale
+        )
+
+    def rolling_average(self, window_days=7, days=90, until=None):
+        """Rata-rata bergulir total harian untuk ``days`` hari terakhir"""
+        until = until or datetime.utcnow()
+        end_day = (until - EPOCH) // ONE_SECOND // SECONDS_PER_DAY
+        first_day = end_day - days - window_days + 2
+
+        day_index = self.timestamps // SECONDS_PER_DAY - first_day
+        mask = (day_index >= 0) & (day_index <= end_day - first_day)
+        daily = np.bincount(
+            day_index[mask], weights=self.amounts[mask], minlength=end_day - first_day + 1
+        )
+
+        cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+        rolling = (cumulative[window_days:] - cumulative[:-window_days]) / window_days
+
+        return {
+            'start_day': first_day + window_days - 1,
+            'daily_totals': daily[window_days - 1:],
+            'rolling_average': rolling
+        }
+
+    def percentiles(self, quantiles, by_category=False):
+        """Percentile amount transaksi, total atau per kategori"""
+        if not len(self):
+            return {} if by_category else [0.0 for _ in quantiles]
+
+        if not by_category:
+            return np.percentile(self.amounts, quantiles).tolist()
+
+        # Kelompokkan per kategori sekali, lalu hitung percentile tiap segmen
+        order = np.argsort(self.category_codes, kind='stable')
+        codes = self.category_codes[order]
+        amounts = self.amounts[order]
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries, [len(codes)]))
+
+        return {
+            self.category_ids[codes[start]]: np.percentile(amounts[start:end], quantiles).tolist()
+            for start, end in zip(starts, ends)
+        }
+
+    def heatmap(self):
+        """Total dan jumlah transaksi per (hari dalam minggu, jam); Senin = 0"""
+        days = self.timestamps // SECONDS_PER_DAY
+        weekday = (days + 3) % 7  # 1970-01-01 adalah hari Kamis
+        hour = (self.timestamps % SECONDS_PER_DAY) // 3600
+        cell = weekday * 24 + hour
+
+        totals = np.bincount(cell, weights=self.amounts, minlength=7 * 24).reshape(7, 24)
+        counts = np.bincount(cell, minlength=7 * 24).reshape(7, 24)
+        return totals, counts
+
+    def category_stats(self):
+        """Jumlah, mean, dan standar deviasi amount per kategori"""
+        size = len(self.category_ids)
+        counts = np.bincount(self.category_codes, minlength=size)
+        sums = np.bincount(self.category_codes, weights=self.amounts, minlength=size)
+        squares = np.bincount(self.category_codes, weights=self.amounts ** 2, minlength=size)
+
+        safe_counts = np.maximum(counts, 1)
+        means = sums / safe_counts
+        variances = np.maximum(squares / safe_counts - means ** 2, 0.0)
+        return counts, means, np.sqrt(variances)
+
+    def anomalies(self, sigma=3.0, min_count=5):
+        """Index transaksi yang lebih dari ``sigma`` standar deviasi di atas mean kategorinya"""
+        counts, means, stds = self.category_stats()
+        row_means = means[self.category_codes]
+        row_stds = stds[self.category_codes]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(row_stds > 0, (self.amounts - row_means) / row_stds, 0.0)
+
+        mask = (scores > sigma) & (counts[self.category_codes] >= min_count)
+        indexes = np.flatnonzero(mask)
+        return indexes[np.argsort(-scores[indexes])], scores
+
+# Cache frame per user (LRU): (frame, versi data, waktu load). Frame dipakai ulang
+# hanya jika change_seq user di database belum berubah dan umurnya di bawah
+# ANALYTICS_CACHE_TTL_SECONDS, sehingga penulisan dari worker lain juga terlihat.
+_frames = OrderedDict()
+# Naik setiap invalidate_frame; frame yang dimuat saat ada invalidasi tidak disimpan
+_generation = 0
+_lock = threading.Lock()
+
+def load_frame(user_id):
+    """Muat kolom transaksi user dari database dalam satu query"""
+    statement = select(
+        Transaction.id,
+        Transaction.date,
+        Transaction.category_id,
+        Transaction.base_amount_minor
+    ).where(
+        Transaction.user_id == user_id
+    ).order_by(Transaction.date).execution_options(yield_per=10000)
+
+    # yield_per memakai server-side cursor di PostgreSQL; baris dibaca per batch
+    return ExpenseFrame.from_rows(db.session.execute(statement), amount_scale=BASE_SCALE)
+
+def data_version(user_id):
+    """change_seq user di sync_state (satu lookup index).
+
+    Naik pada setiap create/update/delete transaksi lewat ORM, di worker mana
+    pun. Perubahan di luar ORM (archive, rebalance shard) memanggil
+    invalidate_frame di proses yang menjalankannya dan tertangkap TTL di
+    proses lain.
+    """
+    return db.session.execute(
+        select(SyncState.change_seq).where(SyncState.user_id == user_id)
+    ).scalar() or 0
+
+def get_frame(user_id):
+    """Ambil frame user dari cache, atau muat dari database jika belum ada atau sudah usang"""
+    ttl = current_app.config['ANALYTICS_CACHE_TTL_SECONDS']
+    version = data_version(user_id)
+    with _lock:
+        entry = _frames.get(user_id)
+        if entry is not None and entry[1] == version and time.monotonic() - entry[2] < ttl:
+            _frames.move_to_end(user_id)
+            return entry[0]
+        generation = _generation
+
+    loaded_at = time.monotonic()
+    frame = load_frame(user_id)
+
+    with _lock:
+        # Penulisan yang commit selama load membuat version di atas usang, jadi
+        # request berikutnya memuat ulang; invalidasi lokal membatalkan penyimpanan
+        if _generation == generation:
+            _frames[user_id] = (frame, version, loaded_at)
+            _frames.move_to_end(user_id)
+            while len(_frames) > CACHE_MAX_USERS:
+                _frames.popitem(last=False)
+
+    return frame
+
+def invalidate_frame(user_id):
+    """Buang frame user dari cache setelah transaksinya berubah"""
+    global _generation
+    with _lock:
+        _frames.pop(user_id, None)
+        _generation += 1
@@ -0,0 +1,112 @@
+from datetime import datetime
+from sqlalchemy import select, insert, update, delete, func
+from models import db, User, Transaction, ArchivedTransaction, MonthlyRollup
+from utils.aggregation_utils import month_start, BUCKET_FORMATS
+from utils.analytics_utils import invalidate_frame
+from utils.shard_utils import using_shard
+
+# Kolom transaksi yang disimpan di archived_transaction
+ARCHIVE_COLUMNS = (
+    'id', 'user_id', 'category_id', 'date', 'description', 'currency',
+    'amount_minor', 'rate_scaled', 'base_amount_minor'
+)
+
+def archive_cutoff(months, now=None):
+    """Awal bulan ``months`` bulan sebelum bulan ini; transaksi sebelum tanggal ini di-archive.
+
+    Selalu awal bulan agar bulan yang di-archive utuh dan MonthlyRollup bisa
+    dipakai untuk summary bulanan.
+    """
+    if months < 1:
+        raise ValueError('Horizon archive minimal 1 bulan')
+    now = now or datetime.now()
+    return month_start(now.year, now.month - months)
+
+def _add_rollups(user_id, totals):
+    """Tambahkan {(period, category_id): [total_minor, count]} ke MonthlyRollup"""
+    rollups = MonthlyRollup.__table__
+    for (period, category_id), (total_minor, count) in totals.items():
+        result = db.session.execute(
+            update(rollups).where(
+                rollups.c.user_id == user_id,
+                rollups.c.period == period,
+                rollups.c.category_id == category_id
+            ).values(
+                total_minor=rollups.c.total_minor + total_minor,
+                transaction_count=rollups.c.transaction_count + count
+            )
+        )
+        if result.rowcount == 0:
+            db.session.execute(insert(rollups).values(
+                user_id=user_id, period=period, category_id=category_id,
+                total_minor=total_minor, transaction_count=count
+            ))
+
+def archive_user_transactions(user_id, before, batch_size=2000):
+    """Pindahkan transaksi ``user_id`` dengan date < ``before`` ke archive.
+
+    Setiap batch (salin ke archived_transaction, tambah MonthlyRollup, hapus
+    dari transaction) berjalan dalam satu transaksi database, jadi total di
+    rollup selalu sama dengan isi archive. Kembalikan jumlah transaksi.
+    """
+    transactions = Transaction.__table__
+    archived = 0
+    with using_shard(user_id):
+        while True:
+            rows = db.session.execute(
+                select(*[transactions.c[name] for name in ARCHIVE_COLUMNS]).where(
+                    transactions.c.user_id == user_id,
+                    transactions.c.date < before
+                ).order_by(transactions.c.date, transactions.c.id).limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                break
+
+            totals = {}
+            for row in rows:
+                key = (row['date'].strftime(BUCKET_FORMATS['month']), row['category_id'])
+                total = totals.setdefault(key, [0, 0])
+                total[0] += row['base_amount_minor']
+                total[1] += 1
+
+            try:
+                db.session.execute(insert(ArchivedTransaction.__table__), [dict(row) for row in rows])
+                _add_rollups(user_id, totals)
+                db.session.execute(
+                    delete(transactions).where(transactions.c.id.in_([row['id'] for row in rows]))
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            archived += len(rows)
+    if archived:
+        # Frame analytics hanya berisi tabel transaction aktif
+        invalidate_frame(user_id)
+    return archived
+
+def count_archivable(user_id, before):
+    with using_shard(user_id):
+        return db.session.query(func.count(Transaction.id)).filter(
+            Transaction.user_id == user_id,
+            Transaction.date < before
+        ).scalar()
+
+def archive_transactions(before, batch_size=2000, dry_run=False, log=print):
+    """Archive transaksi semua user yang lebih lama dari ``before``.
+
+    Kembalikan {'users': ..., 'transactions': ...}; dengan ``dry_run`` hanya
+    menghitung transaksi yang akan di-archive.
+    """
+    user_ids = [user_id for (user_id,) in db.session.query(User.id).order_by(User.id)]
+    users = total = 0
+    for user_id in user_ids:
+        if dry_run:
+            count = count_archivable(user_id, before)
+        else:
+            count = archive_user_transactions(user_id, before, batch_size)
+        if count:
+            users += 1
+            total += count
+            log(f'user {user_id}: {count} transaksi')
+    return {'users': users, 'transactions': total}
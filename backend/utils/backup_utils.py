@@ -0,0 +1,263 @@
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: scheduler berjalan tanpa lock antar proses
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BACKUP_SUFFIX = '.sqlite3.gz'
+CHECKSUM_SUFFIX = '.sha256'
+CHUNK_SIZE = 1024 * 1024
+
+class BackupError(RuntimeError):
+    """Backup/restore gagal: database sibuk, checksum salah, atau file rusak"""
+
+def sqlite_path(engine):
+    """Path file database SQLite milik ``engine``, atau None (PostgreSQL, in-memory)"""
+    if engine.dialect.name != 'sqlite':
+        return None
+    database = engine.url.database
+    if not database or database == ':memory:' or database.startswith('file:'):
+        return None
+    return os.path.abspath(database)
+
+def set_journal_mode(engine, mode):
+    """Atur journal_mode database SQLite ``engine`` (mis. ``wal``); kembalikan mode aktif.
+
+    Mode WAL tersimpan di file database. Di mode ini reader tidak menahan
+    writer, sehingga backup bisa membaca satu snapshot sambil aplikasi tetap
+    menulis.
+    """
+    if not mode or sqlite_path(engine) is None:
+        return None
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f'PRAGMA journal_mode={mode}').scalar()
+
+class _RestartGuard:
+    """Callback progress backup: hentikan jika backup terus diulang dari awal.
+
+    Di mode journal selain WAL, setiap commit dari koneksi lain membuat
+    backup SQLite mulai lagi dari halaman pertama.
+    """
+
+    def __init__(self, max_restarts):
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.steps = 0
+        self._remaining = None
+
+    def __call__(self, status, remaining, total):
+        self.steps += 1
+        if self._remaining is not None and remaining > self._remaining:
+            self.restarts += 1
+            if self.restarts > self.max_restarts:
+                raise BackupError(
+                    f'Backup diulang {self.restarts} kali karena database terus ditulis; '
+                    'aktifkan SQLITE_JOURNAL_MODE=wal atau jalankan saat sepi'
+                )
+        self._remaining = remaining
+
+def _remove(*paths):
+    """Hapus file sementara beserta file -wal/-shm SQLite-nya jika ada"""
+    for path in paths:
+        for leftover in (path, path + '-wal', path + '-shm'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _quick_check(path):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute('PRAGMA quick_check').fetchone()[0]
+    finally:
+        conn.close()
+    if result != 'ok':
+        raise BackupError(f'File database rusak ({os.path.basename(path)}): {result}')
+
+def backup_sqlite(path, directory, label, pages=1024, sleep=0.01, compress_level=6, max_restarts=100, now=None):
+    """Backup online database SQLite ``path`` ke ``directory``/<label>-<waktu UTC>.sqlite3.gz.
+
+    Memakai backup API SQLite per ``pages`` halaman dengan jeda ``sleep``
+    detik, jadi writer hanya menunggu selama satu langkah. Di mode WAL backup
+    membaca satu snapshot (transaksi baca yang ditahan sampai selesai) tanpa
+    menahan writer dan tanpa diulang. Salinan dicek (quick_check), di-gzip,
+    lalu checksum SHA-256 file .gz ditulis ke file .sha256 (format sha256sum).
+    """
+    os.makedirs(directory, exist_ok=True)
+    stamp = (now or datetime.utcnow()).strftime('%Y%m%dT%H%M%SZ')
+    target = os.path.join(directory, f'{label}-{stamp}{BACKUP_SUFFIX}')
+    partial = target[:-len('.gz')] + '.partial'
+    guard = _RestartGuard(max_restarts)
+
+    started = time.perf_counter()
+    try:
+        source = sqlite3.connect(path, timeout=30, isolation_level=None)
+        copy = sqlite3.connect(partial)
+        try:
+            snapshot = source.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            if snapshot:
+                source.execute('BEGIN')
+                source.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchall()
+            source.backup(copy, pages=pages, progress=guard, sleep=sleep)
+            if snapshot:
+                source.execute('COMMIT')
+        finally:
+            copy.close()
+            source.close()
+        copy_seconds = time.perf_counter() - started
+
+        _quick_check(partial)
+        with open(partial, 'rb') as src, gzip.open(target + '.tmp', 'wb', compresslevel=compress_level) as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        checksum = file_sha256(target + '.tmp')
+        os.replace(target + '.tmp', target)
+        with open(target + CHECKSUM_SUFFIX, 'w') as f:
+            f.write(f'{checksum}  {os.path.basename(target)}\n')
+        size = os.path.getsize(partial)
+    finally:
+        _remove(partial, target + '.tmp')
+
+    return {
+        'path': target,
+        'size': size,
+        'compressed_size': os.path.getsize(target),
+        'sha256': checksum,
+        'snapshot': snapshot,
+        'steps': guard.steps,
+        'restarts': guard.restarts,
+        'copy_seconds': round(copy_seconds, 3),
+        'seconds': round(time.perf_counter() - started, 3)
+    }
+
+def list_backups(directory, label=None):
+    """File backup di ``directory`` (hanya milik ``label`` jika diisi), dari yang terlama"""
+    if not os.path.isdir(directory):
+        return []
+    prefix = f'{label}-' if label else ''
+    names = [name for name in os.listdir(directory) if name.startswith(prefix) and name.endswith(BACKUP_SUFFIX)]
+    return [os.path.join(directory, name) for name in sorted(names)]
+
+def backup_label(path):
+    """Label database dari nama file backup (``default``, ``shard_0``, ...)"""
+    return os.path.basename(path).rsplit('-', 1)[0]
+
+def prune_backups(directory, label, keep):
+    """Hapus backup ``label`` selain ``keep`` yang terbaru; kembalikan file yang dihapus"""
+    backups = list_backups(directory, label)
+    removed = backups[:-keep] if keep > 0 else []
+    for path in removed:
+        os.remove(path)
+        if os.path.exists(path + CHECKSUM_SUFFIX):
+            os.remove(path + CHECKSUM_SUFFIX)
+    return removed
+
+def verify_backup(path):
+    """Cocokkan checksum file backup dengan file .sha256-nya"""
+    checksum_path = path + CHECKSUM_SUFFIX
+    if not os.path.exists(checksum_path):
+        raise BackupError(f'File checksum tidak ditemukan: {os.path.basename(checksum_path)}')
+    with open(checksum_path) as f:
+        expected = f.read().split()[0]
+    if file_sha256(path) != expected:
+        raise BackupError(f'Checksum tidak cocok: {os.path.basename(path)}')
+
+def restore_sqlite(backup_path, path):
+    """Kembalikan database SQLite ``path`` dari file backup.
+
+    Checksum dan isi backup dicek dulu. Isi database ditimpa lewat backup API
+    (bukan mengganti file), sehingga koneksi aplikasi yang masih terbuka
+    langsung melihat data hasil restore. Writer menunggu sampai selesai.
+    """
+    verify_backup(backup_path)
+    restored = path + '.restore'
+    try:
+        with gzip.open(backup_path, 'rb') as src, open(restored, 'wb') as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        _quick_check(restored)
+
+        source = sqlite3.connect(restored)
+        target = sqlite3.connect(path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    finally:
+        _remove(restored)
+
+def database_engines(db):
+    """[(label, engine)] database utama dan semua shard"""
+    from utils.shard_utils import shard_engines
+
+    return [('default', db.engine)] + [(f'shard_{index}', engine) for index, engine in shard_engines(db).items()]
+
+def run_backups(db, config, log=logger.info):
+    """Backup semua database SQLite (utama dan shard) lalu terapkan retensi BACKUP_KEEP"""
+    results = []
+    for label, engine in database_engines(db):
+        path = sqlite_path(engine)
+        if path is None:
+            log(f'{label}: bukan file SQLite, dilewati (gunakan pg_dump untuk PostgreSQL)')
+            continue
+        result = backup_sqlite(
+            path, config['BACKUP_DIR'], label,
+            pages=config['BACKUP_PAGES'],
+            sleep=config['BACKUP_STEP_SLEEP_MS'] / 1000,
+            compress_level=config['BACKUP_COMPRESS_LEVEL'],
+            max_restarts=config['BACKUP_MAX_RESTARTS']
+        )
+        removed = prune_backups(config['BACKUP_DIR'], label, config['BACKUP_KEEP'])
+        log(f"{label}: {result['path']} ({result['size'] / 1048576:.1f} MB -> "
+            f"{result['compressed_size'] / 1048576:.1f} MB, {result['seconds']} detik, {len(removed)} backup lama dihapus)")
+        results.append(result)
+    return results
+
+def start_backup_scheduler(app, db):
+    """Thread yang menjalankan run_backups setiap BACKUP_INTERVAL_HOURS.
+
+    Dengan beberapa worker, lock file di BACKUP_DIR memastikan hanya satu
+    proses yang membuat backup di setiap putaran; worker lain melewatkan
+    putarannya jika backup terbaru belum setengah interval.
+    """
+    interval = app.config['BACKUP_INTERVAL_HOURS'] * 3600
+    if interval <= 0:
+        return None
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                os.makedirs(app.config['BACKUP_DIR'], exist_ok=True)
+                with open(os.path.join(app.config['BACKUP_DIR'], '.lock'), 'w') as lock:
+                    if fcntl is not None:
+                        try:
+                            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        except OSError:
+                            continue
+                    latest = list_backups(app.config['BACKUP_DIR'], 'default')
+                    if latest and time.time() - os.path.getmtime(latest[-1]) < interval / 2:
+                        continue
+                    with app.app_context():
+                        run_backups(db, app.config)
+            except Exception:
+                logger.exception('Backup terjadwal gagal')
+
+    thread = threading.Thread(target=loop, name='database-backup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,79 @@
+from sqlalchemy import func, case, and_, exists, select, or_
+from models import db, Transaction, ArchivedTransaction, MonthlyRollup
+from utils.aggregation_utils import month_range, sum_minor
+from utils.money_utils import from_base_minor
+from utils.notification_utils import current_period
+
+def category_in_use(user_id, category_id):
+    """Apakah kategori dipakai transaksi aktif atau archive.
+
+    Satu query EXISTS yang berhenti di baris pertama lewat index
+    (user_id, category_id, date) dan (category_id, date) archive, tanpa
+    memuat transaksinya.
+    """
+    return db.session.execute(select(or_(
+        exists().where(Transaction.user_id == user_id, Transaction.category_id == category_id),
+        exists().where(ArchivedTransaction.category_id == category_id)
+    ))).scalar()
+
+def category_stats(user_id, now=None):
+    """Statistik pemakaian semua kategori user: {category_id: stats}.
+
+    Transaksi aktif dihitung dalam satu GROUP BY category_id (jumlah, total,
+    total bulan ini, tanggal terakhir). Transaksi archive ditambahkan dari
+    MonthlyRollup; tanggal terakhirnya hanya dicari untuk kategori yang tidak
+    punya transaksi aktif.
+    """
+    period = current_period(now)
+    start, end = month_range(period)
+    in_month = and_(Transaction.date >= start, Transaction.date < end)
+
+    stats = {}
+    rows = db.session.query(
+        Transaction.category_id,
+        func.count(Transaction.id),
+        sum_minor(Transaction.base_amount_minor),
+        sum_minor(case((in_month, Transaction.base_amount_minor), else_=0)),
+        func.max(Transaction.date)
+    ).filter(Transaction.user_id == user_id).group_by(Transaction.category_id).all()
+    for category_id, count, total_minor, month_minor, last_used in rows:
+        stats[category_id] = {
+            'count': count, 'total_minor': total_minor or 0,
+            'month_minor': month_minor or 0, 'last_used': last_used
+        }
+
+    rollups = db.session.query(
+        MonthlyRollup.category_id,
+        func.sum(MonthlyRollup.transaction_count),
+        sum_minor(MonthlyRollup.total_minor),
+        sum_minor(case((MonthlyRollup.period == period, MonthlyRollup.total_minor), else_=0))
+    ).filter(MonthlyRollup.user_id == user_id).group_by(MonthlyRollup.category_id).all()
+    archive_only = []
+    for category_id, count, total_minor, month_minor in rollups:
+        item = stats.setdefault(category_id, {'count': 0, 'total_minor': 0, 'month_minor': 0, 'last_used': None})
+        item['count'] += int(count or 0)
+        item['total_minor'] += total_minor or 0
+        item['month_minor'] += month_minor or 0
+        if item['last_used'] is None:
+            archive_only.append(category_id)
+
+    if archive_only:
+        for category_id, last_used in db.session.query(
+            ArchivedTransaction.category_id, func.max(ArchivedTransaction.date)
+        ).filter(
+            ArchivedTransaction.user_id == user_id,
+            ArchivedTransaction.category_id.in_(archive_only)
+        ).group_by(ArchivedTransaction.category_id):
+            stats[category_id]['last_used'] = last_used
+
+    return stats
+
+def stats_dict(stats):
+    """Bentuk response untuk satu entri category_stats (kategori tanpa transaksi: None)"""
+    stats = stats or {'count': 0, 'total_minor': 0, 'month_minor': 0, 'last_used': None}
+    return {
+        'transaction_count': stats['count'],
+        'total': from_base_minor(stats['total_minor']),
+        'current_month_total': from_base_minor(stats['month_minor']),
+        'last_used': stats['last_used'].isoformat() if stats['last_used'] else None
+    }
@@ -2,6 +2,10 @@ import requests
 import json
 from datetime import datetime, timedelta
 import os
+import logging
+from utils.metrics_utils import track_time
+
+logger = logging.getLogger(__name__)
 
 class CurrencyConverter:
     """Utility class untuk handle currency conversion"""
@@ -16,19 +20,21 @@ class CurrencyConverter:
                 return 1.0
                 
             url = f"{CurrencyConverter.BASE_URL}/latest?from={from_currency}&to={to_currency}"
-            response = requests.get(url, timeout=10)
+            with track_time('currency'):
+                response = requests.get(url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 rate = data['rates'].get(to_currency, 1.0)
-                print(f"Exchange rate {from_currency} to {to_currency}: {rate}")
+                logger.debug('Exchange rate %s ke %s: %s', from_currency, to_currency, rate,
+                             extra={'sampled': True})
                 return rate
             else:
-                print(f"API Error: {response.status_code}")
+                logger.warning('API kurs error: %s', response.status_code)
                 return CurrencyConverter.get_fallback_rate(from_currency, to_currency)
                 
         except Exception as e:
-            print(f"Error getting exchange rate: {str(e)}")
+            logger.warning('Gagal mengambil exchange rate %s ke %s: %s', from_currency, to_currency, e)
             return CurrencyConverter.get_fallback_rate(from_currency, to_currency)
     
     @staticmethod
@@ -82,7 +88,8 @@ class CurrencyConverter:
         
         rate = CurrencyConverter.get_exchange_rate(from_currency, to_currency)
         converted = amount * rate
-        print(f"Converted {amount} {from_currency} to {converted} {to_currency} (rate: {rate})")
+        logger.debug('Konversi %s %s ke %s %s (rate: %s)', amount, from_currency, converted, to_currency, rate,
+                     extra={'sampled': True})
         return converted
 
 # Cache sederhana untuk exchange rates
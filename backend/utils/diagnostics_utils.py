@@ -0,0 +1,122 @@
+import logging
+import time
+from collections import Counter
+from functools import wraps
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+class QueryBudgetExceeded(AssertionError):
+    """Request menjalankan lebih banyak query SQL dari budget-nya"""
+
+def query_budget(limit):
+    """Decorator untuk menetapkan budget query per view (menimpa QUERY_BUDGET)"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            state = _request_state()
+            if state is not None:
+                state['budget'] = limit
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _request_state():
+    if not has_request_context():
+        return None
+    return g.get('_query_diagnostics')
+
+def _format_params(parameters):
+    text = repr(parameters)
+    return text if len(text) <= 500 else text[:500] + '...'
+
+def _explain(conn, statement, parameters):
+    """Plan query lewat cursor DBAPI langsung agar tidak memicu event lagi"""
+    dialect = conn.dialect.name
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect == 'sqlite' else 'EXPLAIN '
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    if dialect == 'sqlite':
+        return [row[-1] for row in rows]
+    return [' '.join(str(value) for value in row) for row in rows]
+
+def init_query_diagnostics(app, engines):
+    """Aktifkan slow-query log, deteksi N+1 dan budget query untuk ``engines`` app.
+
+    Hanya untuk development/staging (QUERY_DIAGNOSTICS=true): setiap query
+    yang lebih lambat dari SLOW_QUERY_MS dicatat beserta parameter dan plan-nya,
+    statement identik yang berulang lebih dari N_PLUS_ONE_THRESHOLD kali dalam
+    satu request ditandai sebagai kemungkinan N+1, dan request yang melewati
+    QUERY_BUDGET dicatat atau (QUERY_BUDGET_RAISE=true) menghasilkan
+    QueryBudgetExceeded sehingga test gagal.
+
+    ``engines`` berisi database utama dan semua shard.
+    """
+    slow_seconds = app.config['SLOW_QUERY_MS'] / 1000.0
+
+    for engine in engines:
+        @event.listens_for(engine, 'before_cursor_execute')
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('_diagnostics_start', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get('_diagnostics_start')
+            if not starts:
+                return
+            elapsed = time.perf_counter() - starts.pop()
+
+            state = _request_state()
+            if state is not None:
+                state['count'] += 1
+                state['statements'][statement] += 1
+
+            if elapsed >= slow_seconds:
+                plan = None
+                if not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+                    try:
+                        plan = _explain(conn, statement, parameters)
+                    except Exception as e:
+                        plan = [f'EXPLAIN gagal: {e}']
+                logger.warning(
+                    'Slow query %.1f ms%s\n%s\nparams=%s\nplan=%s',
+                    elapsed * 1000,
+                    f' ({request.method} {request.path})' if has_request_context() else '',
+                    statement, _format_params(parameters), plan
+                )
+
+    @app.before_request
+    def start_query_diagnostics():
+        g._query_diagnostics = {
+            'count': 0,
+            'statements': Counter(),
+            'budget': app.config['QUERY_BUDGET']
+        }
+
+    @app.after_request
+    def check_query_diagnostics(response):
+        state = g.get('_query_diagnostics')
+        if state is None:
+            return response
+
+        threshold = app.config['N_PLUS_ONE_THRESHOLD']
+        for statement, repeats in state['statements'].items():
+            if repeats > threshold:
+                logger.warning(
+                    'Kemungkinan N+1: statement yang sama dijalankan %d kali di %s %s\n%s',
+                    repeats, request.method, request.path, statement
+                )
+
+        budget = state['budget']
+        if budget and state['count'] > budget:
+            message = (f'{request.method} {request.path} menjalankan {state["count"]} query '
+                       f'(budget {budget})')
+            if app.config['QUERY_BUDGET_RAISE']:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,80 @@
+import json
+import queue
+import threading
+
+class Subscription:
+    """Satu koneksi stream milik user, dengan queue event berukuran tetap"""
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, message):
+        # Client yang lambat tidak boleh menahan publisher: buang event tertua
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        """Event berikutnya, atau None jika tidak ada sampai timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventBroker:
+    """Pub/sub in-process per user untuk Server-Sent Events.
+
+    Tidak butuh broker eksternal; konsekuensinya event hanya sampai ke koneksi
+    yang dilayani proses yang sama dengan request yang mem-publish.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id, maxsize=32):
+        subscription = Subscription(user_id, maxsize)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscriptions
+
+    def connection_count(self):
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, user_id, event, data):
+        """Kirim event ke semua koneksi user; kembalikan jumlah penerima"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        if not subscriptions:
+            return 0
+        message = format_sse(event, data)
+        for subscription in subscriptions:
+            subscription.push(message)
+        return len(subscriptions)
+
+def format_sse(event, data):
+    """Serialisasi satu event dalam format text/event-stream"""
+    return f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+
+broker = EventBroker()
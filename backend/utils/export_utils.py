@@ -1,4 +1,5 @@
 import io
+import heapq
 from datetime import datetime
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -8,22 +9,121 @@ import openpyxl
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
 from openpyxl.utils import get_column_letter
-from models import Transaction, Category
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from models import db, User, Transaction, ArchivedTransaction, Category
 from flask_jwt_extended import get_jwt_identity
+from utils.aggregation_utils import bucket_expression, sum_minor
+from utils.metrics_utils import track_time
+from utils.money_utils import from_base_minor, from_minor
 
+# Jumlah baris per batch saat membaca transaksi untuk export
+EXPORT_BATCH_SIZE = 1000
+
+def stream_transactions(query, model=Transaction):
+    """Iterasi transaksi export per batch beserta kategorinya.
+
+    yield_per memakai server-side cursor di PostgreSQL sehingga export besar
+    tidak memuat seluruh hasil query ke memori sekaligus.
+    """
+    return query.options(selectinload(model.category)).order_by(
+        model.date.desc()
+    ).yield_per(EXPORT_BATCH_SIZE)
+
+def _date_filtered(model, user_id, start_date=None, end_date=None):
+    query = model.query.filter(model.user_id == user_id)
+    if start_date:
+        query = query.filter(model.date >= start_date)
+    if end_date:
+        query = query.filter(model.date <= end_date)
+    return query
+
+def _include_archive(user_id, start_date=None):
+    """Archive hanya perlu dibaca jika rentang export mundur sampai sebelum transaksi archive terbaru"""
+    newest_archived = db.session.query(func.max(ArchivedTransaction.date)).filter(
+        ArchivedTransaction.user_id == user_id
+    ).scalar()
+    return newest_archived is not None and not (start_date and start_date > newest_archived)
+
+def export_transactions(user_id, start_date=None, end_date=None):
+    """Transaksi export dari tabel aktif dan archive, urut tanggal terbaru.
+
+    Archive hanya dibaca jika rentang export mundur sampai sebelum transaksi
+    archive terbaru (satu lookup index), lalu kedua stream di-merge per tanggal.
+    """
+    current = stream_transactions(_date_filtered(Transaction, user_id, start_date, end_date))
+    if not _include_archive(user_id, start_date):
+        return current
+    
+    archived = stream_transactions(
+        _date_filtered(ArchivedTransaction, user_id, start_date, end_date), ArchivedTransaction
+    )
+    return heapq.merge(current, archived, key=lambda transaction: transaction.date, reverse=True)
+
+def _add_group(groups, key, total_minor, count, **labels):
+    """Jumlahkan satu baris GROUP BY ke ``groups[key]`` (tabel aktif + archive)"""
+    group = groups.setdefault(key, {**labels, 'total_minor': 0, 'transaction_count': 0})
+    group['total_minor'] += total_minor or 0
+    group['transaction_count'] += count or 0
+    return group
+
+def export_summary(user_id, start_date=None, end_date=None):
+    """Ringkasan export per kategori, mata uang dan bulan, dihitung dengan GROUP BY di database.
+
+    Total memakai base_amount_minor (sudah dikonversi ke base currency
+    dengan kurs transaksi), dengan filter tanggal yang sama seperti
+    export_transactions dan termasuk transaksi archive. Total per mata uang
+    juga berisi jumlah dalam mata uang aslinya (``amount_minor``).
+    """
+    dialect = db.session.get_bind().dialect.name
+    models = [Transaction] + ([ArchivedTransaction] if _include_archive(user_id, start_date) else [])
+    categories, currencies, months = {}, {}, {}
+
+    for model in models:
+        base = _date_filtered(model, user_id, start_date, end_date).with_entities(
+            sum_minor(model.base_amount_minor), func.count(model.id)
+        )
+        rows = base.join(Category, Category.id == model.category_id).add_columns(
+            Category.id, Category.name
+        ).group_by(Category.id, Category.name).all()
+        for total_minor, count, category_id, name in rows:
+            _add_group(categories, category_id, total_minor, count, name=name)
+
+        rows = base.add_columns(model.currency, sum_minor(model.amount_minor)).group_by(model.currency).all()
+        for total_minor, count, currency, amount_minor in rows:
+            group = _add_group(currencies, currency, total_minor, count, currency=currency, amount_minor=0)
+            group['amount_minor'] += amount_minor or 0
+
+        month = bucket_expression('month', dialect, model.date)
+        for total_minor, count, period in base.add_columns(month).group_by(month).all():
+            _add_group(months, period, total_minor, count, month=period)
+
+    total_minor = sum(group['total_minor'] for group in categories.values())
+    for group in categories.values():
+        group['percentage'] = round(group['total_minor'] / total_minor * 100, 2) if total_minor > 0 else 0
+    for group in currencies.values():
+        group['amount'] = from_minor(group.pop('amount_minor'), group['currency'])
+
+    return {
+        'categories': sorted(categories.values(), key=lambda group: -group['total_minor']),
+        'currencies': sorted(currencies.values(), key=lambda group: -group['total_minor']),
+        'months': sorted(months.values(), key=lambda group: group['month']),
+        'total_minor': total_minor,
+        'transaction_count': sum(group['transaction_count'] for group in categories.values())
+    }
+
+def base_currency(user_id):
+    user = db.session.get(User, user_id)
+    return user.base_currency if user and user.base_currency else 'IDR'
+
+def format_amount(value):
+    """Angka ribuan; desimal hanya ditampilkan jika ada (mis. USD 12.50)"""
+    return f"{value:,.0f}" if float(value).is_integer() else f"{value:,.2f}"
+
+@track_time('export')
 def generate_pdf_report(start_date=None, end_date=None, user_id=None):
     """Generate PDF report untuk transaksi user"""
     try:
-        # Query transactions dengan filter tanggal
-        query = Transaction.query.filter_by(user_id=user_id)
-        
-        if start_date:
-            query = query.filter(Transaction.date >= start_date)
-        if end_date:
-            query = query.filter(Transaction.date <= end_date)
-            
-        transactions = query.order_by(Transaction.date.desc()).all()
-        
         # Buat buffer untuk PDF
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter)
@@ -45,24 +145,60 @@ def generate_pdf_report(start_date=None, end_date=None, user_id=None):
         elements.append(period)
         elements.append(Spacer(1, 20))
         
-        # Data transaksi
-        if transactions:
-            # Header table
-            data = [['Tanggal', 'Kategori', 'Deskripsi', 'Jumlah (Rp)']]
+        summary = export_summary(user_id, start_date, end_date)
+        currency = base_currency(user_id)
+        
+        if summary['transaction_count']:
+            # Ringkasan dari GROUP BY (total dalam base currency)
+            total = from_base_minor(summary['total_minor'])
+            summary_text = f"Total Transaksi: {summary['transaction_count']} | Total Pengeluaran: {currency} {format_amount(total)}"
+            elements.append(Paragraph(summary_text, styles['Heading2']))
+            elements.append(Spacer(1, 12))
+            
+            summary_tables = [
+                ('Per Kategori', ['Kategori', 'Transaksi', f'Total ({currency})', '%'], [
+                    [group['name'], group['transaction_count'], format_amount(from_base_minor(group['total_minor'])),
+                     f"{group['percentage']:.1f}"]
+                    for group in summary['categories']
+                ], [180, 80, 120, 60]),
+                ('Per Mata Uang', ['Mata Uang', 'Transaksi', 'Total Asli', f'Total ({currency})'], [
+                    [group['currency'] or '-', group['transaction_count'], format_amount(group['amount']),
+                     format_amount(from_base_minor(group['total_minor']))]
+                    for group in summary['currencies']
+                ], [100, 80, 140, 120]),
+                ('Per Bulan', ['Bulan', 'Transaksi', f'Total ({currency})'], [
+                    [group['month'], group['transaction_count'], format_amount(from_base_minor(group['total_minor']))]
+                    for group in summary['months']
+                ], [120, 80, 140])
+            ]
+            for heading, header, rows, widths in summary_tables:
+                elements.append(Paragraph(heading, styles['Heading3']))
+                table = Table([header] + rows, colWidths=widths)
+                table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                ]))
+                elements.append(table)
+                elements.append(Spacer(1, 12))
+            
+            elements.append(Paragraph('Detail Transaksi', styles['Heading3']))
             
-            # Data transaksi
-            total_amount = 0
-            for transaction in transactions:
+            # Header table; jumlah dalam base currency agar bisa dijumlahkan
+            data = [['Tanggal', 'Kategori', 'Deskripsi', f'Jumlah ({currency})']]
+            for transaction in export_transactions(user_id, start_date, end_date):
                 date_str = transaction.date.strftime('%d/%m/%Y')
                 category_name = transaction.category.name
                 description = transaction.description
-                amount = f"{transaction.amount:,.0f}"
-                total_amount += transaction.amount
+                amount = format_amount(from_base_minor(transaction.base_amount_minor))
                 
                 data.append([date_str, category_name, description, amount])
             
             # Total row
-            data.append(['', '', 'TOTAL', f"{total_amount:,.0f}"])
+            data.append(['', '', 'TOTAL', format_amount(total)])
             
             # Buat table
             table = Table(data, colWidths=[80, 100, 200, 100])
@@ -81,12 +217,6 @@ def generate_pdf_report(start_date=None, end_date=None, user_id=None):
             ]))
             
             elements.append(table)
-            elements.append(Spacer(1, 20))
-            
-            # Summary
-            summary_text = f"Total Transaksi: {len(transactions)} | Total Pengeluaran: Rp {total_amount:,.0f}"
-            summary = Paragraph(summary_text, styles['Heading2'])
-            elements.append(summary)
         else:
             # Tidak ada data
             no_data = Paragraph("Tidak ada data transaksi untuk periode yang dipilih.", styles['BodyText'])
@@ -101,67 +231,90 @@ def generate_pdf_report(start_date=None, end_date=None, user_id=None):
     except Exception as e:
         raise Exception(f"Error generating PDF: {str(e)}")
 
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+
+def _style_header(row):
+    for cell in row:
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = HEADER_FILL
+        cell.alignment = Alignment(horizontal="center")
+
+def _autofit_columns(ws):
+    for col in ws.columns:
+        max_length = max((len(str(cell.value)) for cell in col if cell.value is not None), default=0)
+        ws.column_dimensions[col[0].column_letter].width = max_length + 2
+
+def _append_summary_sheet(wb, summary, currency):
+    """Sheet Ringkasan: tabel per kategori, per mata uang dan per bulan"""
+    ws = wb.create_sheet("Ringkasan")
+    ws.append(['Total Transaksi', summary['transaction_count']])
+    ws.append([f'Total Pengeluaran ({currency})', from_base_minor(summary['total_minor'])])
+    for row in ws.iter_rows():
+        row[0].font = Font(bold=True)
+    
+    sections = [
+        ('Per Kategori', ['Kategori', 'Transaksi', f'Total ({currency})', 'Persentase (%)'], [
+            [group['name'], group['transaction_count'], from_base_minor(group['total_minor']), group['percentage']]
+            for group in summary['categories']
+        ]),
+        ('Per Mata Uang', ['Mata Uang', 'Transaksi', 'Total Asli', f'Total ({currency})'], [
+            [group['currency'], group['transaction_count'], group['amount'], from_base_minor(group['total_minor'])]
+            for group in summary['currencies']
+        ]),
+        ('Per Bulan', ['Bulan', 'Transaksi', f'Total ({currency})'], [
+            [group['month'], group['transaction_count'], from_base_minor(group['total_minor'])]
+            for group in summary['months']
+        ])
+    ]
+    for heading, header, rows in sections:
+        ws.append([])
+        ws.append([heading])
+        ws[ws.max_row][0].font = Font(bold=True, size=12)
+        ws.append(header)
+        _style_header(ws[ws.max_row])
+        for row in rows:
+            ws.append(row)
+    _autofit_columns(ws)
+
+@track_time('export')
 def generate_excel_report(start_date=None, end_date=None, user_id=None):
-    """Generate Excel report untuk transaksi user"""
+    """Generate Excel report untuk transaksi user, dengan sheet Ringkasan"""
     try:
-        # Query transactions dengan filter tanggal
-        query = Transaction.query.filter_by(user_id=user_id)
-        
-        if start_date:
-            query = query.filter(Transaction.date >= start_date)
-        if end_date:
-            query = query.filter(Transaction.date <= end_date)
-            
-        transactions = query.order_by(Transaction.date.desc()).all()
+        summary = export_summary(user_id, start_date, end_date)
+        currency = base_currency(user_id)
         
         # Buat workbook
         wb = Workbook()
         ws = wb.active
         ws.title = "Laporan Pengeluaran"
         
-        # Header
-        headers = ['Tanggal', 'Kategori', 'Deskripsi', 'Jumlah (Rp)']
+        # Header; jumlah asli dan hasil konversi ke base currency
+        headers = ['Tanggal', 'Kategori', 'Deskripsi', 'Mata Uang', 'Jumlah', f'Jumlah ({currency})']
         ws.append(headers)
-        
-        # Style header
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        for cell in ws[1]:
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center")
+        _style_header(ws[1])
         
         # Data transaksi
-        total_amount = 0
-        for transaction in transactions:
+        for transaction in export_transactions(user_id, start_date, end_date):
             date_str = transaction.date.strftime('%d/%m/%Y')
             category_name = transaction.category.name
             description = transaction.description
-            amount = transaction.amount
-            total_amount += amount
             
-            ws.append([date_str, category_name, description, amount])
+            ws.append([
+                date_str, category_name, description, transaction.currency,
+                transaction.amount, from_base_minor(transaction.base_amount_minor)
+            ])
         
-        # Total row
-        if transactions:
-            ws.append(['', '', 'TOTAL', total_amount])
+        # Total row dari GROUP BY
+        if summary['transaction_count']:
+            ws.append(['', '', 'TOTAL', '', '', from_base_minor(summary['total_minor'])])
             
             # Style total row
             total_row = ws[ws.max_row]
             for cell in total_row:
                 cell.font = Font(bold=True)
         
-        # Auto adjust column widths
-        for col in ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            ws.column_dimensions[column].width = adjusted_width
+        _autofit_columns(ws)
+        _append_summary_sheet(wb, summary, currency)
         
         # Save ke buffer
         buffer = io.BytesIO()
@@ -171,4 +324,4 @@ def generate_excel_report(start_date=None, end_date=None, user_id=None):
         return buffer, f"laporan_pengeluaran_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         
     except Exception as e:
-        raise Exception(f"Error generating Excel: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Error generating Excel: {str(e)}")
@@ -0,0 +1,150 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import IntegrityError
+from models import db, IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+# Jeda polling saat menunggu request lain dengan key yang sama selesai
+WAIT_INTERVAL_SECONDS = 0.05
+
+def request_hash():
+    """SHA-256 dari method, path dan body request"""
+    digest = hashlib.sha256()
+    digest.update(request.method.encode())
+    digest.update(b'\0')
+    digest.update(request.path.encode())
+    digest.update(b'\0')
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+def _find(user_id, key):
+    table = IdempotencyKey.__table__
+    return db.session.execute(
+        select(table).where(table.c.user_id == user_id, table.c.key == key)
+    ).mappings().first()
+
+def _delete(record_id):
+    table = IdempotencyKey.__table__
+    db.session.execute(delete(table).where(table.c.id == record_id))
+    db.session.commit()
+
+def _is_stale(record, now, lock_seconds):
+    """Key kedaluwarsa, atau masih terkunci oleh request yang tidak pernah selesai"""
+    if record['expires_at'] <= now:
+        return True
+    return record['response_status'] is None and record['created_at'] <= now - timedelta(seconds=lock_seconds)
+
+def reserve_key(user_id, key, fingerprint):
+    """Kunci ``key`` untuk request ini, atau kembalikan baris yang sudah ada.
+
+    INSERT baris kosong (response_status NULL) dan commit; unique constraint
+    (user_id, key) memastikan hanya satu request yang berhasil. Request lain
+    menunggu sampai response tersimpan, paling lama IDEMPOTENCY_WAIT_SECONDS.
+    Kembalikan (id baris milik request ini, None) atau (None, baris lain).
+    """
+    config = current_app.config
+    deadline = time.monotonic() + config['IDEMPOTENCY_WAIT_SECONDS']
+    while True:
+        now = datetime.utcnow()
+        record = IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            request_hash=fingerprint,
+            created_at=now,
+            expires_at=now + timedelta(hours=config['IDEMPOTENCY_TTL_HOURS'])
+        )
+        try:
+            db.session.add(record)
+            db.session.commit()
+            return record.id, None
+        except IntegrityError:
+            db.session.rollback()
+
+        existing = _find(user_id, key)
+        if existing is None:
+            continue
+        if _is_stale(existing, now, config['IDEMPOTENCY_LOCK_SECONDS']):
+            _delete(existing['id'])
+            continue
+        if (existing['request_hash'] != fingerprint or existing['response_status'] is not None
+                or time.monotonic() >= deadline):
+            return None, existing
+        # Akhiri transaksi baca agar polling berikutnya melihat commit request lain
+        db.session.rollback()
+        time.sleep(WAIT_INTERVAL_SECONDS)
+
+def store_response(record_id, response):
+    table = IdempotencyKey.__table__
+    db.session.execute(
+        update(table).where(table.c.id == record_id).values(
+            response_status=response.status_code,
+            response_body=response.get_data(as_text=True),
+            response_mimetype=response.mimetype
+        )
+    )
+    db.session.commit()
+
+def replay_response(record):
+    response = current_app.response_class(
+        record['response_body'], status=record['response_status'], mimetype=record['response_mimetype']
+    )
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(view):
+    """Decorator endpoint tulis: header Idempotency-Key membuat retry aman.
+
+    Request pertama dengan sebuah key menjalankan handler dan menyimpan
+    response-nya (kecuali 5xx, yang boleh dicoba ulang). Request berikutnya
+    dengan key dan body yang sama mendapat response tersimpan tanpa
+    menjalankan handler lagi; key yang sama dengan body berbeda ditolak 422.
+    Request paralel dengan key yang sama menunggu request pertama selesai,
+    atau mendapat 409 jika belum selesai. Pasang setelah ``jwt_required``.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'{IDEMPOTENCY_HEADER} harus 1-{MAX_KEY_LENGTH} karakter'}), 400
+
+        user_id = get_jwt_identity()
+        fingerprint = request_hash()
+        record_id, existing = reserve_key(user_id, key, fingerprint)
+
+        if existing is not None:
+            if existing['request_hash'] != fingerprint:
+                return jsonify({'error': f'{IDEMPOTENCY_HEADER} sudah dipakai untuk request lain'}), 422
+            if existing['response_status'] is None:
+                return jsonify({'error': 'Request dengan key ini masih diproses'}), 409, {'Retry-After': '1'}
+            return replay_response(existing)
+
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            db.session.rollback()
+            _delete(record_id)
+            raise
+
+        if response.status_code >= 500:
+            db.session.rollback()
+            _delete(record_id)
+        else:
+            store_response(record_id, response)
+        return response
+
+    return wrapper
+
+def purge_expired_keys(engine, now=None):
+    """Hapus key yang sudah kedaluwarsa di ``engine``; kembalikan jumlah baris"""
+    table = IdempotencyKey.__table__
+    with engine.begin() as conn:
+        return conn.execute(delete(table).where(table.c.expires_at <= (now or datetime.utcnow()))).rowcount
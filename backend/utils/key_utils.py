@@ -0,0 +1,50 @@
+import os
+import time
+import uuid
+from sqlalchemy import LargeBinary
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+class UUIDKey(TypeDecorator):
+    """Primary/foreign key UUID yang disimpan 16 byte.
+
+    PostgreSQL memakai tipe ``uuid`` native, database lain BLOB 16 byte
+    (bukan VARCHAR 36 karakter). Di Python nilainya tetap string UUID
+    kanonik, sama dengan id di API, sehingga kode dan response tidak berubah.
+    Urutan byte sama dengan urutan string hex-nya.
+    """
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            key = value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        except ValueError:
+            # Id dari request yang bukan UUID tidak cocok dengan baris mana pun
+            return None
+        return str(key) if dialect.name == 'postgresql' else key.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, (bytes, memoryview)):
+            return str(uuid.UUID(bytes=bytes(value)))
+        return str(value)
+
+def new_uuid():
+    """UUID versi 7 (RFC 9562): 48 bit timestamp milidetik lalu 74 bit acak.
+
+    Key baru berurutan waktu, jadi insert masuk ke ujung kanan B-tree primary
+    key dan index, bukan tersebar acak seperti uuid4.
+    """
+    value = (time.time_ns() // 1_000_000 & 0xFFFFFFFFFFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | 0x7 << 76
+    value = value & ~(0x3 << 62) | 0x2 << 62
+    return str(uuid.UUID(int=value))
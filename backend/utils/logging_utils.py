@@ -0,0 +1,136 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from flask import g, request, has_request_context
+
+# Atribut bawaan LogRecord; selain ini dianggap field tambahan dari ``extra=``
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+_handler = None
+
+class JsonFormatter(logging.Formatter):
+    """Format log sebagai satu baris JSON per record"""
+
+    def format(self, record):
+        payload = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and key != 'sampled':
+                payload[key] = value
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc_info'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+class RequestContextFilter(logging.Filter):
+    """Tambahkan request_id, method dan path ke record yang dibuat di dalam request.
+
+    Dijalankan di thread request (sebelum record masuk queue), karena
+    ``flask.g`` tidak tersedia di thread listener.
+    """
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.method = request.method
+            record.path = request.path
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Loloskan hanya sebagian record yang ditandai ``extra={'sampled': True}``"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if getattr(record, 'sampled', False) and record.levelno < logging.WARNING:
+            return self.rate >= 1 or random.random() < self.rate
+        return True
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler yang membuang record saat queue penuh, bukan memblokir request"""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Format pesan dan traceback di thread request, tapi biarkan JSON
+        # dibentuk oleh formatter sink di thread listener
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+def stop_logging():
+    """Hentikan listener dan kosongkan sisa queue ke sink"""
+    global _listener, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def configure_logging(level='INFO', sample_rate=1.0, queue_size=10000, sink=None):
+    """Pasang logging JSON non-blocking di root logger.
+
+    Record dari thread request hanya dimasukkan ke queue berukuran
+    ``queue_size``; penulisan ke sink (default stdout) dilakukan oleh
+    QueueListener di thread terpisah, sehingga sink yang lambat tidak
+    menahan request. Aman dipanggil ulang: konfigurasi lama diganti.
+    """
+    global _listener, _handler
+    stop_logging()
+
+    if sink is None:
+        sink = logging.StreamHandler(sys.stdout)
+    sink.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    _handler = DroppingQueueHandler(log_queue)
+    _handler.addFilter(RequestContextFilter())
+    _handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_handler)
+
+    _listener = QueueListener(log_queue, sink, respect_handler_level=True)
+    _listener.start()
+
+def init_request_logging(app):
+    """Beri setiap request id (dari header X-Request-ID atau baru) untuk log dan response"""
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+    @app.after_request
+    def add_request_id_header(response):
+        if g.get('request_id'):
+            response.headers['X-Request-ID'] = g.request_id
+        return response
+
+atexit.register(stop_logging)
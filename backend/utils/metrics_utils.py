@@ -0,0 +1,194 @@
+import threading
+import time
+from contextlib import ContextDecorator
+from flask import g, request, has_request_context, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bucket histogram (detik) untuk durasi; bucket terpisah untuk jumlah query SQL
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+class Histogram:
+    """Histogram kumulatif gaya Prometheus dengan label"""
+
+    def __init__(self, name, description, buckets=DURATION_BUCKETS, label_names=()):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key)]
+                for bound, count in zip(self.buckets, series['counts']):
+                    lines.append(f'{self.name}_bucket{_labels(labels + [_le(bound)])} {count}')
+                lines.append(f'{self.name}_bucket{_labels(labels + [_le("+Inf")])} {series["count"]}')
+                lines.append(f'{self.name}_sum{_labels(labels)} {series["sum"]}')
+                lines.append(f'{self.name}_count{_labels(labels)} {series["count"]}')
+        return lines
+
+class Counter:
+    """Counter monotonic gaya Prometheus dengan label"""
+
+    def __init__(self, name, description, label_names=()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = [f'{name}="{_escape(v)}"' for name, v in zip(self.label_names, key)]
+                lines.append(f'{self.name}{_labels(labels)} {value}')
+        return lines
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _le(bound):
+    return 'le="%s"' % bound
+
+def _labels(parts):
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Durasi request HTTP per route',
+    label_names=('method', 'route', 'status')
+)
+REQUEST_SQL_QUERIES = Histogram(
+    'http_request_sql_queries', 'Jumlah statement SQL per request',
+    buckets=COUNT_BUCKETS, label_names=('method', 'route')
+)
+REQUEST_SQL_DURATION = Histogram(
+    'http_request_sql_duration_seconds', 'Total waktu SQL per request',
+    label_names=('method', 'route')
+)
+SEGMENT_DURATION = Histogram(
+    'app_segment_duration_seconds', 'Durasi bagian kode tertentu (currency, export, ...)',
+    label_names=('segment',)
+)
+
+METRICS = [REQUEST_DURATION, REQUEST_SQL_QUERIES, REQUEST_SQL_DURATION, SEGMENT_DURATION]
+
+def register_metric(metric):
+    """Tambahkan metric lain agar ikut di-render oleh /api/metrics"""
+    if metric not in METRICS:
+        METRICS.append(metric)
+    return metric
+
+def _request_stats():
+    """Statistik milik request aktif, atau None di luar request"""
+    if not has_request_context():
+        return None
+    return g.get('_request_stats')
+
+class track_time(ContextDecorator):
+    """Ukur durasi sebuah segmen kode; bisa dipakai sebagai ``with`` atau decorator.
+
+    Durasi dicatat ke histogram ``app_segment_duration_seconds`` dan, jika
+    sedang di dalam request, ke header Server-Timing request tersebut.
+    """
+
+    def __init__(self, segment):
+        self.segment = segment
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._started
+        SEGMENT_DURATION.observe(elapsed, segment=self.segment)
+        stats = _request_stats()
+        if stats is not None:
+            stats['segments'][self.segment] = stats['segments'].get(self.segment, 0.0) + elapsed
+        return False
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('_query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _request_stats()
+    if stats is not None:
+        stats['sql_count'] += 1
+        stats['sql_time'] += elapsed
+
+def _server_timing(stats, total):
+    parts = [
+        f'app;dur={total * 1000:.2f}',
+        f'db;dur={stats["sql_time"] * 1000:.2f};desc="{stats["sql_count"]} queries"'
+    ]
+    for segment, elapsed in stats['segments'].items():
+        parts.append(f'{segment};dur={elapsed * 1000:.2f}')
+    return ', '.join(parts)
+
+def render_metrics():
+    """Semua metric dalam format teks Prometheus"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+def init_metrics(app):
+    """Pasang middleware timing per request dan endpoint /api/metrics"""
+
+    @app.before_request
+    def start_request_timer():
+        g._request_stats = {
+            'started': time.perf_counter(),
+            'sql_count': 0,
+            'sql_time': 0.0,
+            'segments': {}
+        }
+
+    @app.after_request
+    def record_request_metrics(response):
+        stats = g.get('_request_stats')
+        if stats is None:
+            return response
+
+        total = time.perf_counter() - stats['started']
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+
+        REQUEST_DURATION.observe(total, method=request.method, route=route, status=response.status_code)
+        REQUEST_SQL_QUERIES.observe(stats['sql_count'], method=request.method, route=route)
+        REQUEST_SQL_DURATION.observe(stats['sql_time'], method=request.method, route=route)
+
+        if app.config.get('SERVER_TIMING_ENABLED', True):
+            response.headers['Server-Timing'] = _server_timing(stats, total)
+        return response
+
+    @app.route('/api/metrics')
+    def metrics():
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
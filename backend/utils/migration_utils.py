@@ -0,0 +1,330 @@
+import logging
+import uuid
+from sqlalchemy import inspect, select, insert, update, func, bindparam, Uuid
+from models import db, User, Category, Transaction, BudgetNotification, SyncState
+from utils.key_utils import UUIDKey, new_uuid
+from utils.search_utils import drop_search_index
+from utils.money_utils import money_values, to_base_minor
+
+logger = logging.getLogger(__name__)
+
+def backfill_money_columns(conn, batch_size=10000):
+    """Isi kolom integer uang dari kolom float lama (database yang sudah ada).
+
+    Dibaca per batch dengan keyset pada primary key agar memori tetap kecil di
+    tabel besar. Pembulatan sama persis dengan money_values().
+    """
+    transactions = Transaction.__table__
+    statement = update(transactions).where(
+        transactions.c.id == bindparam('row_id')
+    ).values(
+        amount_minor=bindparam('new_amount_minor'),
+        rate_scaled=bindparam('new_rate_scaled'),
+        base_amount_minor=bindparam('new_base_amount_minor'),
+        **_keep_onupdate(transactions)
+    )
+
+    last_id = None
+    while True:
+        query = select(
+            transactions.c.id, transactions.c.amount,
+            transactions.c.currency, transactions.c.exchange_rate
+        ).order_by(transactions.c.id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(transactions.c.id > last_id)
+        rows = conn.execute(query).all()
+        if not rows:
+            break
+        updates = []
+        for row_id, amount, currency, exchange_rate in rows:
+            values = money_values(amount or 0, currency or 'IDR', exchange_rate or 1)
+            updates.append({
+                'row_id': row_id,
+                'new_amount_minor': values['amount_minor'],
+                'new_rate_scaled': values['rate_scaled'],
+                'new_base_amount_minor': values['base_amount_minor']
+            })
+        conn.execute(statement, updates)
+        last_id = rows[-1][0]
+
+def backfill_budget_minor(conn):
+    """Isi budget_limit_minor dari kolom float budget_limit"""
+    users = User.__table__
+    budgets = conn.execute(select(users.c.id, users.c.budget_limit)).all()
+    if budgets:
+        conn.execute(
+            update(users).where(users.c.id == bindparam('row_id')).values(
+                budget_limit_minor=bindparam('new_budget_limit_minor')
+            ),
+            [{'row_id': user_id, 'new_budget_limit_minor': to_base_minor(budget_limit or 0)}
+             for user_id, budget_limit in budgets]
+        )
+
+def backfill_unread_counts(conn):
+    """Hitung ulang counter unread_notifications dari tabel budget_notification"""
+    users = User.__table__
+    notifications = BudgetNotification.__table__
+    unread = select(func.count()).select_from(notifications).where(
+        notifications.c.user_id == users.c.id,
+        notifications.c.is_read == False
+    ).scalar_subquery()
+    conn.execute(update(users).values(unread_notifications=unread))
+
+def _keep_onupdate(table):
+    """Nilai UPDATE yang mempertahankan kolom ber-onupdate (mis. updated_at) saat migrasi"""
+    return {column.name: column for column in table.columns if column.onupdate is not None}
+
+def backfill_change_seq(conn, batch_size=10000):
+    """Beri change_seq berurutan per user untuk kategori/transaksi yang belum punya (0).
+
+    Dipakai migrasi dan seeder yang menulis lewat INSERT core (tanpa event
+    ORM). Setiap baris mendapat nomor unik agar snapshot sync penuh bisa
+    dipaginasi; counter di sync_state ikut dinaikkan.
+    """
+    states = SyncState.__table__
+    seqs = dict(conn.execute(select(states.c.user_id, states.c.change_seq)).all())
+    existing = set(seqs)
+
+    for model in (Category, Transaction):
+        table = model.__table__
+        statement = update(table).where(table.c.id == bindparam('row_id')).values(
+            change_seq=bindparam('new_change_seq'), **_keep_onupdate(table)
+        )
+        last_id = None
+        while True:
+            query = select(table.c.id, table.c.user_id).where(table.c.change_seq == 0).order_by(table.c.id).limit(batch_size)
+            if last_id is not None:
+                query = query.where(table.c.id > last_id)
+            rows = conn.execute(query).all()
+            if not rows:
+                break
+            updates = []
+            for row_id, user_id in rows:
+                seqs[user_id] = seqs.get(user_id, 0) + 1
+                updates.append({'row_id': row_id, 'new_change_seq': seqs[user_id]})
+            conn.execute(statement, updates)
+            last_id = rows[-1][0]
+
+    updated = [{'row_user_id': user_id, 'new_change_seq': seq} for user_id, seq in seqs.items() if user_id in existing]
+    if updated:
+        conn.execute(
+            update(states).where(states.c.user_id == bindparam('row_user_id')).values(
+                change_seq=bindparam('new_change_seq')
+            ),
+            updated
+        )
+    created = [
+        {'id': new_uuid(), 'user_id': user_id, 'change_seq': seq, 'compacted_seq': 0}
+        for user_id, seq in seqs.items() if user_id not in existing
+    ]
+    if created:
+        conn.execute(insert(states), created)
+
+# Kolom yang ditambahkan setelah tabel pertama kali dibuat, berurutan:
+# (model, kolom, default SQL untuk baris lama, backfill setelah kolom dibuat).
+# Tipe kolom diambil dari model sehingga DDL sesuai dialect database.
+ADDED_COLUMNS = [
+    (User, 'budget_limit', '0', None),
+    (User, 'base_currency', "'IDR'", None),
+    (Transaction, 'currency', "'IDR'", None),
+    (Transaction, 'exchange_rate', '1', None),
+    (Transaction, 'amount_minor', '0', backfill_money_columns),
+    (Transaction, 'rate_scaled', '0', backfill_money_columns),
+    (Transaction, 'base_amount_minor', '0', backfill_money_columns),
+    (User, 'budget_limit_minor', '0', backfill_budget_minor),
+    (BudgetNotification, 'period', None, None),
+    (BudgetNotification, 'threshold', None, None),
+    (User, 'unread_notifications', '0', backfill_unread_counts),
+    (Category, 'change_seq', '0', backfill_change_seq),
+    (Transaction, 'change_seq', '0', backfill_change_seq)
+]
+
+def add_column(conn, column, default=None):
+    """ALTER TABLE ... ADD COLUMN untuk kolom model, dengan quoting dan tipe dialect"""
+    preparer = conn.dialect.identifier_preparer
+    ddl = (
+        f'ALTER TABLE {preparer.format_table(column.table)} '
+        f'ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=conn.dialect)}'
+    )
+    if default is not None:
+        ddl += f' DEFAULT {default}'
+        if not column.nullable:
+            ddl += ' NOT NULL'
+    conn.exec_driver_sql(ddl)
+
+# Index yang sudah diganti index lain di model: (tabel, nama index)
+OBSOLETE_INDEXES = [
+    ('transaction', 'ix_transaction_user_amount')
+]
+
+def drop_obsolete_indexes(conn, metadata):
+    """Hapus index dari OBSOLETE_INDEXES yang masih ada di tabel lama"""
+    inspector = inspect(conn)
+    preparer = conn.dialect.identifier_preparer
+    dropped = []
+    for table_name, name in OBSOLETE_INDEXES:
+        if table_name not in metadata.tables or not inspector.has_table(table_name):
+            continue
+        if name in {index['name'] for index in inspector.get_indexes(table_name)}:
+            conn.exec_driver_sql(f'DROP INDEX {preparer.quote(name)}')
+            dropped.append(name)
+    return dropped
+
+def create_missing_indexes(conn, metadata):
+    """Buat index (dan unique constraint bernama) model yang belum ada di tabel lama.
+
+    create_all() hanya membuat index untuk tabel baru; tabel yang sudah ada
+    dilengkapi di sini. Unique constraint dibuat sebagai unique index karena
+    SQLite tidak mendukung ALTER TABLE ... ADD CONSTRAINT.
+    """
+    inspector = inspect(conn)
+    created = []
+    for table in metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        existing.update(constraint['name'] for constraint in inspector.get_unique_constraints(table.name))
+
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+
+        for constraint in table.constraints:
+            if isinstance(constraint, db.UniqueConstraint) and constraint.name and constraint.name not in existing:
+                # Bukan Index(...): objek Index baru akan menempel ke tabel model
+                preparer = conn.dialect.identifier_preparer
+                columns = ', '.join(preparer.format_column(column) for column in constraint.columns)
+                conn.exec_driver_sql(
+                    f'CREATE UNIQUE INDEX {preparer.quote(constraint.name)} '
+                    f'ON {preparer.format_table(table)} ({columns})'
+                )
+                created.append(constraint.name)
+    return created
+
+def _uuid_blob(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+def legacy_key_columns(conn, metadata):
+    """Kolom UUIDKey di tabel yang sudah ada yang masih menyimpan UUID sebagai teks (VARCHAR 36)"""
+    inspector = inspect(conn)
+    legacy = []
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        keys = [column for column in table.columns if isinstance(column.type, UUIDKey)]
+        if conn.dialect.name == 'postgresql':
+            types = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+            legacy.extend(column for column in keys if not isinstance(types[column.name], Uuid))
+        else:
+            # Konversi berjalan dalam satu transaksi, jadi satu baris mewakili seluruh kolom
+            for column in keys:
+                kind = conn.execute(select(func.typeof(column)).select_from(table).limit(1)).scalar()
+                if kind == 'text':
+                    legacy.append(column)
+    return legacy
+
+def convert_key_columns(conn, columns):
+    """Ubah kolom key UUID teks menjadi 16 byte, semuanya dalam transaksi ``conn``.
+
+    SQLite: UPDATE di tempat dengan fungsi Python (kolom SQLite menerima BLOB
+    apa pun tipe deklarasinya); index FTS dihapus dulu dan dibangun ulang oleh
+    install_search_index. PostgreSQL: ALTER COLUMN ... TYPE uuid, dengan
+    foreign key yang terkait dilepas lalu dipasang lagi.
+    """
+    tables = {}
+    for column in columns:
+        tables.setdefault(column.table, []).append(column)
+
+    if conn.dialect.name != 'postgresql':
+        conn.connection.dbapi_connection.create_function('uuid_blob', 1, _uuid_blob, deterministic=True)
+        drop_search_index(conn)
+        for table, table_columns in tables.items():
+            values = {column.name: func.uuid_blob(column) for column in table_columns}
+            conn.execute(update(table).values(**_keep_onupdate(table), **values))
+        return
+
+    preparer = conn.dialect.identifier_preparer
+    inspector = inspect(conn)
+    converted = {(column.table.name, column.name) for column in columns}
+    foreign_keys = []
+    for table_name in inspector.get_table_names():
+        for foreign_key in inspector.get_foreign_keys(table_name):
+            local = any((table_name, name) in converted for name in foreign_key['constrained_columns'])
+            remote = any((foreign_key['referred_table'], name) in converted for name in foreign_key['referred_columns'])
+            if local or remote:
+                foreign_keys.append((table_name, foreign_key))
+                conn.exec_driver_sql(
+                    f'ALTER TABLE {preparer.quote(table_name)} DROP CONSTRAINT {preparer.quote(foreign_key["name"])}'
+                )
+
+    for table, table_columns in tables.items():
+        alters = ', '.join(
+            f'ALTER COLUMN {preparer.format_column(column)} TYPE uuid USING {preparer.format_column(column)}::uuid'
+            for column in table_columns
+        )
+        conn.exec_driver_sql(f'ALTER TABLE {preparer.format_table(table)} {alters}')
+
+    for table_name, foreign_key in foreign_keys:
+        local = ', '.join(preparer.quote(name) for name in foreign_key['constrained_columns'])
+        remote = ', '.join(preparer.quote(name) for name in foreign_key['referred_columns'])
+        conn.exec_driver_sql(
+            f'ALTER TABLE {preparer.quote(table_name)} ADD CONSTRAINT {preparer.quote(foreign_key["name"])} '
+            f'FOREIGN KEY ({local}) REFERENCES {preparer.quote(foreign_key["referred_table"])} ({remote})'
+        )
+
+def migrate_schema(engine, metadata=None):
+    """Samakan skema database dengan model, untuk SQLite maupun PostgreSQL.
+
+    Tabel yang belum ada dibuat lewat create_all(); tabel lama dilengkapi
+    kolom dari ADDED_COLUMNS (beserta backfill-nya) dan index yang belum ada;
+    index di OBSOLETE_INDEXES dihapus.
+    Semua lewat SQLAlchemy inspector, jadi memakai database dari
+    ``engine`` (DATABASE_URL), bukan file di working directory.
+
+    ``metadata`` boleh hanya berisi sebagian tabel (mis. database shard);
+    kolom untuk tabel di luar metadata dilewati.
+
+    Database lama dengan key UUID teks dikonversi ke 16 byte lebih dulu,
+    sebelum tabel baru (foreign key bertipe uuid) dibuat.
+    """
+    metadata = metadata or db.metadata
+    with engine.begin() as conn:
+        legacy = legacy_key_columns(conn, metadata)
+        if legacy:
+            logger.info("Auto-migration: Mengubah %d kolom key UUID ke 16 byte...", len(legacy))
+            convert_key_columns(conn, legacy)
+    metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        columns = {}
+        added = []
+        backfills = []
+        for model, name, default, backfill in ADDED_COLUMNS:
+            table = metadata.tables.get(model.__table__.name)
+            if table is None:
+                continue
+            if table.name not in columns:
+                columns[table.name] = {column['name'] for column in inspector.get_columns(table.name)}
+            if name in columns[table.name]:
+                continue
+
+            logger.info("Auto-migration: Menambah kolom %s.%s...", table.name, name)
+            add_column(conn, table.c[name], default)
+            columns[table.name].add(name)
+            added.append(name)
+            if backfill and backfill not in backfills:
+                backfills.append(backfill)
+
+        for backfill in backfills:
+            logger.info("Auto-migration: %s...", backfill.__name__)
+            backfill(conn)
+
+        created = create_missing_indexes(conn, metadata)
+        for name in created:
+            logger.info("Auto-migration: Membuat index %s", name)
+        dropped = drop_obsolete_indexes(conn, metadata)
+        for name in dropped:
+            logger.info("Auto-migration: Menghapus index lama %s", name)
+
+    if added or created or dropped:
+        logger.info("Auto-migration completed")
@@ -0,0 +1,77 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+
+# Jumlah digit minor unit per mata uang (ISO 4217); selain yang tercantum = 2
+CURRENCY_EXPONENTS = {'JPY': 0}
+DEFAULT_EXPONENT = 2
+
+# Kurs disimpan sebagai integer kurs * 10^8 (0.000067 -> 6700)
+RATE_SCALE = 10 ** 8
+
+# Nilai dalam base currency (hasil konversi, total, budget) selalu disimpan
+# dalam 1/100 unit, apa pun base currency-nya, agar semua agregat bisa
+# dijumlahkan langsung sebagai integer
+BASE_EXPONENT = 2
+BASE_SCALE = 10 ** BASE_EXPONENT
+
+def currency_exponent(currency):
+    return CURRENCY_EXPONENTS.get(currency, DEFAULT_EXPONENT)
+
+def _to_decimal(value):
+    # Lewat str() agar 0.1 dibaca sebagai 0.1, bukan representasi binernya
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+def _quantize(value):
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_EVEN))
+
+def _divide_round(numerator, denominator):
+    """Pembagian integer dengan pembulatan half-even, tanpa float"""
+    quotient, remainder = divmod(numerator, denominator)
+    doubled = remainder * 2
+    if doubled > denominator or (doubled == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+def to_minor(amount, currency):
+    """Amount (angka/string) ke integer minor unit mata uangnya"""
+    return _quantize(_to_decimal(amount).scaleb(currency_exponent(currency)))
+
+def from_minor(amount_minor, currency):
+    return float(Decimal(amount_minor).scaleb(-currency_exponent(currency)))
+
+def to_rate_scaled(rate):
+    return _quantize(_to_decimal(rate) * RATE_SCALE)
+
+def from_rate_scaled(rate_scaled):
+    return float(Decimal(rate_scaled) / RATE_SCALE)
+
+def to_base_minor(amount):
+    """Amount dalam base currency ke integer 1/100 unit"""
+    return _quantize(_to_decimal(amount).scaleb(BASE_EXPONENT))
+
+def from_base_minor(amount_minor):
+    """Integer 1/100 unit base currency (mis. hasil SUM) ke float untuk JSON"""
+    return float(Decimal(int(amount_minor or 0)).scaleb(-BASE_EXPONENT))
+
+def convert_minor(amount_minor, currency, rate_scaled):
+    """Konversi minor unit transaksi ke 1/100 unit base currency secara exact"""
+    return _divide_round(
+        amount_minor * rate_scaled * BASE_SCALE,
+        RATE_SCALE * 10 ** currency_exponent(currency)
+    )
+
+def money_values(amount, currency, exchange_rate):
+    """Semua kolom uang transaksi dari amount dan kurs.
+
+    Kolom integer adalah sumber kebenaran; ``amount`` dan ``exchange_rate``
+    (float) tetap diisi dari nilai integer tersebut untuk kompatibilitas
+    (filter/sort lama, index, dan database yang sudah ada).
+    """
+    amount_minor = to_minor(amount, currency)
+    rate_scaled = to_rate_scaled(exchange_rate)
+    return {
+        'amount': from_minor(amount_minor, currency),
+        'amount_minor': amount_minor,
+        'exchange_rate': from_rate_scaled(rate_scaled),
+        'rate_scaled': rate_scaled,
+        'base_amount_minor': convert_minor(amount_minor, currency, rate_scaled)
+    }
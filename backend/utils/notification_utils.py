@@ -0,0 +1,162 @@
+from datetime import datetime
+from sqlalchemy import func, case
+from sqlalchemy.exc import IntegrityError
+from models import db, User, BudgetNotification
+from utils.money_utils import from_base_minor
+
+# Threshold persen budget bulanan, dari yang tertinggi
+BUDGET_THRESHOLDS = [
+    (100, 'danger', '⚠️ Budget terlampaui! Pengeluaran {percentage:.1f}% dari budget bulanan ({spending} / {limit})'),
+    (90, 'warning', '💰 Budget hampir habis! Pengeluaran {percentage:.1f}% dari budget bulanan ({spending} / {limit})'),
+    (80, 'info', '📊 Pengeluaran {percentage:.1f}% dari budget bulanan ({spending} / {limit})')
+]
+
+def currency_formatter(amount):
+    """Format amount ke string currency"""
+    return f"Rp {amount:,.0f}" if amount else "Rp 0"
+
+def threshold_for(percentage):
+    """Threshold tertinggi yang sudah dilewati, atau None"""
+    for threshold, notification_type, template in BUDGET_THRESHOLDS:
+        if percentage >= threshold:
+            return threshold, notification_type, template
+    return None
+
+def budget_message(template, percentage, spending, limit):
+    return template.format(
+        percentage=percentage,
+        spending=currency_formatter(spending),
+        limit=currency_formatter(limit)
+    )
+
+def record_threshold_crossing(user_id, period, percentage, spending, limit):
+    """Simpan notifikasi saat user melewati threshold baru di bulan ``period``.
+
+    Setiap threshold hanya tercatat sekali per (user, bulan): notifikasi dibuat
+    hanya jika threshold yang dilewati lebih tinggi dari yang sudah tercatat,
+    dan unique constraint (user_id, period, threshold) menangani request
+    paralel. Counter unread di User ikut dinaikkan dalam transaksi yang sama.
+    Kembalikan notifikasi baru atau None; caller yang melakukan commit.
+    """
+    crossed = threshold_for(percentage)
+    if not crossed:
+        return None
+    threshold, notification_type, template = crossed
+
+    recorded = db.session.query(func.max(BudgetNotification.threshold)).filter(
+        BudgetNotification.user_id == user_id,
+        BudgetNotification.period == period
+    ).scalar()
+    if recorded is not None and recorded >= threshold:
+        return None
+
+    notification = BudgetNotification(
+        user_id=user_id,
+        message=budget_message(template, percentage, spending, limit),
+        type=notification_type,
+        period=period,
+        threshold=threshold
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(notification)
+    except IntegrityError:
+        # Request lain sudah mencatat threshold ini lebih dulu
+        return None
+
+    db.session.query(User).filter(User.id == user_id).update(
+        {User.unread_notifications: User.unread_notifications + 1},
+        synchronize_session=False
+    )
+    return notification
+
+def mark_notifications_read(user_id, notification_ids=None):
+    """Tandai notifikasi (semua jika ``notification_ids`` None) sebagai sudah dibaca.
+
+    Satu UPDATE untuk notifikasi dan satu untuk counter unread; kembalikan
+    jumlah notifikasi yang berubah. Caller yang melakukan commit.
+    """
+    query = BudgetNotification.query.filter(
+        BudgetNotification.user_id == user_id,
+        BudgetNotification.is_read == False
+    )
+    if notification_ids is not None:
+        query = query.filter(BudgetNotification.id.in_(notification_ids))
+
+    updated = query.update({BudgetNotification.is_read: True}, synchronize_session=False)
+    if updated:
+        db.session.query(User).filter(User.id == user_id).update(
+            {User.unread_notifications: case(
+                (User.unread_notifications > updated, User.unread_notifications - updated), else_=0
+            )},
+            synchronize_session=False
+        )
+    return updated
+
+def unread_count(user_id):
+    """Jumlah notifikasi unread dari counter di User (lookup primary key)"""
+    return db.session.query(User.unread_notifications).filter(User.id == user_id).scalar() or 0
+
+def budget_status(budget_limit_minor, total_minor):
+    """Status budget bulan ini (bentuk response budget-check) dari total integer pengeluaran.
+
+    Kembalikan None jika budget belum diatur. Perbandingan dilakukan dalam
+    integer 1/100 base currency.
+    """
+    if budget_limit_minor <= 0:
+        return None
+    percentage = total_minor * 100 / budget_limit_minor
+    spending = from_base_minor(total_minor)
+    limit = from_base_minor(budget_limit_minor)
+    
+    notifications = []
+    crossed = threshold_for(percentage)
+    if crossed:
+        _, notification_type, template = crossed
+        notifications.append({
+            'type': notification_type,
+            'message': budget_message(template, percentage, spending, limit),
+            'percentage': percentage
+        })
+    
+    return {
+        'budget_limit': limit,
+        'current_spending': spending,
+        'percentage': percentage,
+        'notifications': notifications
+    }
+
+def category_budget_status(category_id, name, limit_minor, total_minor):
+    """Status budget satu kategori; notifikasinya diawali nama kategori"""
+    status = budget_status(limit_minor, total_minor)
+    for notification in status['notifications']:
+        notification['category_id'] = category_id
+        notification['message'] = f"{name}: {notification['message']}"
+    status.update({'category_id': category_id, 'category_name': name})
+    return status
+
+def combined_budget_status(budget_limit_minor, total_minor, budgets, spent_by_category):
+    """Status budget bulanan ditambah status ``budgets`` (category_id, nama, limit_minor).
+
+    ``spent_by_category`` adalah {category_id: total_minor} bulan ini, dari
+    satu query GROUP BY. Notifikasi kategori juga ditambahkan ke
+    ``notifications`` utama. Kembalikan None jika tidak ada budget sama sekali.
+    """
+    if budget_limit_minor <= 0 and not budgets:
+        return None
+    # Tanpa budget bulanan total tidak dihitung (hanya kategori yang dievaluasi)
+    status = budget_status(budget_limit_minor, total_minor) or {
+        'budget_limit': 0,
+        'current_spending': 0,
+        'percentage': 0,
+        'notifications': []
+    }
+    status['categories'] = []
+    for category_id, name, limit_minor in budgets:
+        category_status = category_budget_status(category_id, name, limit_minor, spent_by_category.get(category_id, 0))
+        status['categories'].append(category_status)
+        status['notifications'].extend(category_status['notifications'])
+    return status
+
+def current_period(now=None):
+    return (now or datetime.now()).strftime('%Y-%m')
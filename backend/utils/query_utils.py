@@ -0,0 +1,161 @@
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import func
+from sqlalchemy.orm import load_only, selectinload
+from models import Transaction, TRANSACTION_FIELDS
+from utils.money_utils import from_base_minor, to_base_minor
+from utils.aggregation_utils import month_range, sum_minor
+
+# Sort dan filter jumlah memakai hasil konversi ke base currency agar
+# transaksi berbeda mata uang bisa dibandingkan, sama seperti total_amount
+SORT_COLUMNS = {
+    'date': Transaction.date,
+    'amount': Transaction.base_amount_minor
+}
+MAX_PER_PAGE = 500
+
+class TransactionQueryBuilder:
+    """Bangun query list transaksi dari parameter request.
+
+    Semua filter ditulis sebagai predikat langsung pada kolom (rentang, IN,
+    kesamaan) tanpa fungsi seperti extract(), sehingga bisa memakai index
+    (user_id, date), (user_id, category_id, date), (user_id, currency, date)
+    dan (user_id, base_amount_minor). Input tidak valid menghasilkan ValueError dengan
+    pesan yang bisa langsung dikirim ke client.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.query = Transaction.query.filter(Transaction.user_id == user_id)
+        self.sort = 'date'
+        self.order = 'desc'
+
+    @staticmethod
+    def _split(value):
+        return [item.strip() for item in value.split(',') if item.strip()] if value else []
+
+    @staticmethod
+    def _parse_date(value, name):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError(f'Format {name} tidak valid. Gunakan format YYYY-MM-DD')
+
+    @staticmethod
+    def _parse_amount(value, name):
+        try:
+            amount = float(value)
+        except ValueError:
+            raise ValueError(f'Parameter {name} harus berupa angka')
+        # float() menerima nan/inf yang tidak bisa dikonversi ke minor unit
+        if not math.isfinite(amount):
+            raise ValueError(f'Parameter {name} harus berupa angka')
+        return amount
+
+    def filter_categories(self, category_ids):
+        if len(category_ids) == 1:
+            self.query = self.query.filter(Transaction.category_id == category_ids[0])
+        elif category_ids:
+            self.query = self.query.filter(Transaction.category_id.in_(category_ids))
+        return self
+
+    def filter_currencies(self, currencies):
+        currencies = [c.upper() for c in currencies]
+        if len(currencies) == 1:
+            self.query = self.query.filter(Transaction.currency == currencies[0])
+        elif currencies:
+            self.query = self.query.filter(Transaction.currency.in_(currencies))
+        return self
+
+    def filter_date_range(self, start=None, end=None):
+        """Filter rentang [start, end); None berarti tidak dibatasi"""
+        if start:
+            self.query = self.query.filter(Transaction.date >= start)
+        if end:
+            self.query = self.query.filter(Transaction.date < end)
+        return self
+
+    def filter_amount(self, min_amount=None, max_amount=None):
+        """Filter jumlah dalam base currency (base_amount_minor), bukan mata uang transaksi"""
+        if min_amount is not None:
+            self.query = self.query.filter(Transaction.base_amount_minor >= to_base_minor(min_amount))
+        if max_amount is not None:
+            self.query = self.query.filter(Transaction.base_amount_minor <= to_base_minor(max_amount))
+        return self
+
+    def sort_by(self, sort='date', order='desc'):
+        if sort not in SORT_COLUMNS:
+            raise ValueError('Parameter sort harus date atau amount')
+        if order not in ('asc', 'desc'):
+            raise ValueError('Parameter order harus asc atau desc')
+        self.sort = sort
+        self.order = order
+        return self
+
+    def apply_args(self, args):
+        """Terapkan semua filter yang didukung dari request.args"""
+        category_ids = self._split(args.get('category_ids')) + self._split(args.get('category_id'))
+        self.filter_categories(list(dict.fromkeys(category_ids)))
+        self.filter_currencies(self._split(args.get('currency')))
+
+        if args.get('month'):
+            try:
+                self.filter_date_range(*month_range(args['month']))
+            except ValueError:
+                raise ValueError('Format month tidak valid. Gunakan format YYYY-MM')
+
+        start = self._parse_date(args['start_date'], 'start_date') if args.get('start_date') else None
+        end = self._parse_date(args['end_date'], 'end_date') if args.get('end_date') else None
+        # end_date inklusif: ambil semua transaksi sampai akhir hari tersebut
+        self.filter_date_range(start, end + timedelta(days=1) if end else None)
+
+        min_amount = self._parse_amount(args['min_amount'], 'min_amount') if args.get('min_amount') else None
+        max_amount = self._parse_amount(args['max_amount'], 'max_amount') if args.get('max_amount') else None
+        self.filter_amount(min_amount, max_amount)
+
+        self.sort_by(args.get('sort', 'date'), args.get('order', 'desc'))
+        return self
+
+    def ordered(self):
+        """Query dengan urutan yang diminta; id sebagai tie-breaker yang stabil"""
+        column = SORT_COLUMNS[self.sort]
+        if self.order == 'desc':
+            return self.query.order_by(column.desc(), Transaction.id.desc())
+        return self.query.order_by(column.asc(), Transaction.id.asc())
+
+    def totals(self):
+        """Jumlah baris dan total (base currency) dalam satu aggregate tanpa ORDER BY"""
+        count, total_minor = self.query.with_entities(
+            func.count(Transaction.id),
+            sum_minor(Transaction.base_amount_minor)
+        ).order_by(None).one()
+        return count, from_base_minor(total_minor)
+
+def parse_pagination(args, default_per_page=None):
+    """Ambil (page, per_page) dari request.args; per_page None berarti tanpa paginasi"""
+    per_page = args.get('per_page', default_per_page, type=int)
+    if per_page is None:
+        return 1, None
+    page = max(args.get('page', 1, type=int), 1)
+    return page, min(max(per_page, 1), MAX_PER_PAGE)
+
+def parse_fields(value):
+    """Daftar key dari ``?fields=a,b`` (urutan dipertahankan), atau None untuk semua key"""
+    if not value:
+        return None
+    fields = list(dict.fromkeys(item.strip() for item in value.split(',') if item.strip()))
+    unknown = [field for field in fields if field not in TRANSACTION_FIELDS]
+    if unknown:
+        raise ValueError(f"Field tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(TRANSACTION_FIELDS)}")
+    return fields or None
+
+def transaction_load_options(fields=None):
+    """Opsi loader untuk list transaksi: hanya kolom dari ``fields`` dan kategori jika dipakai"""
+    if fields is None:
+        # Kategori dimuat sekaligus, bukan satu query per transaksi di to_dict()
+        return [selectinload(Transaction.category)]
+    columns = {column for field in fields for column in TRANSACTION_FIELDS[field][0]}
+    options = [load_only(*[getattr(Transaction, column) for column in sorted(columns)])]
+    if {'category_name', 'category_color'} & set(fields):
+        options.append(selectinload(Transaction.category))
+    return options
@@ -0,0 +1,171 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from utils.metrics_utils import Counter, Histogram, register_metric
+
+RATE_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600}
+# Bucket yang sudah terisi penuh dibuang jika jumlah bucket melewati batas ini
+MAX_BUCKETS = 10000
+QUEUE_DEPTH_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+REJECTED_REQUESTS = register_metric(Counter(
+    'http_requests_rejected_total', 'Request yang ditolak 429 per kelas route dan alasan (rate_limit/concurrency)',
+    label_names=('route_class', 'reason')
+))
+ADMISSION_QUEUE_DEPTH = register_metric(Histogram(
+    'admission_queue_depth', 'Jumlah request yang sedang menunggu slot route berat saat request datang',
+    buckets=QUEUE_DEPTH_BUCKETS, label_names=('route_class',)
+))
+ADMISSION_WAIT = register_metric(Histogram(
+    'admission_wait_seconds', 'Lama menunggu slot route berat',
+    label_names=('route_class',)
+))
+
+def parse_rate(value):
+    """``'10/minute'`` -> (kapasitas, token per detik); kosong atau ``0`` berarti tanpa limit (None)"""
+    if not value or value.strip() == '0':
+        return None
+    count, _, period = value.strip().partition('/')
+    if period not in RATE_PERIODS or int(count) <= 0:
+        raise ValueError(f'Format rate limit tidak valid: {value} (contoh: 10/minute)')
+    return int(count), int(count) / RATE_PERIODS[period]
+
+class TokenBucketLimiter:
+    """Token bucket per (kelas route, identitas) di memori proses.
+
+    Bucket berisi ``kapasitas`` token dan terisi ulang terus-menerus; setiap
+    request memakai satu token. Tidak dibagi antar proses/worker, jadi limit
+    efektif adalah limit ini dikali jumlah worker.
+    """
+
+    def __init__(self, rates):
+        self.rates = {route_class: rate for route_class, rate in rates.items() if rate}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, route_class, identity, now=None):
+        """Pakai satu token; kembalikan 0 jika boleh, atau detik sampai token berikutnya tersedia"""
+        rate = self.rates.get(route_class)
+        if rate is None:
+            return 0
+        capacity, refill = rate
+        now = time.monotonic() if now is None else now
+        key = (route_class, identity)
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / refill
+            if len(self._buckets) > MAX_BUCKETS:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now):
+        for key, (tokens, updated) in list(self._buckets.items()):
+            capacity, refill = self.rates[key[0]]
+            if tokens + (now - updated) * refill >= capacity:
+                del self._buckets[key]
+
+class ConcurrencyGate:
+    """Semaphore global untuk route berat dengan antrean terbatas.
+
+    Paling banyak ``limit`` request berjalan bersamaan. Request berikutnya
+    menunggu, tetapi hanya ``queue_size`` yang boleh menunggu dan masing-masing
+    paling lama ``timeout`` detik; selebihnya langsung ditolak.
+    """
+
+    def __init__(self, limit, queue_size, timeout):
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Kembalikan (dapat slot, jumlah yang menunggu termasuk request ini)"""
+        if self._semaphore.acquire(blocking=False):
+            return True, 0
+        with self._lock:
+            if self._waiting >= self.queue_size:
+                return False, self._waiting
+            self._waiting += 1
+            depth = self._waiting
+        try:
+            return self._semaphore.acquire(timeout=self.timeout), depth
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def release(self):
+        self._semaphore.release()
+
+def init_rate_limiting(app):
+    """Buat limiter dan semaphore route berat dari konfigurasi app"""
+    config = app.config
+    app.extensions['rate_limiting'] = {
+        'limiter': TokenBucketLimiter({
+            'auth': parse_rate(config['RATE_LIMIT_AUTH']),
+            'export': parse_rate(config['RATE_LIMIT_EXPORT'])
+        }),
+        'gate': ConcurrencyGate(
+            config['HEAVY_CONCURRENCY'], config['HEAVY_QUEUE_SIZE'], config['HEAVY_QUEUE_TIMEOUT']
+        )
+    }
+
+def _identity():
+    """User dari JWT jika ada, selain itu alamat client (mis. untuk login)"""
+    try:
+        verify_jwt_in_request(optional=True)
+        user_id = get_jwt_identity()
+    except Exception:
+        user_id = None
+    return f'user:{user_id}' if user_id is not None else f'ip:{request.remote_addr}'
+
+def _too_many_requests(message, retry_after):
+    seconds = max(1, math.ceil(retry_after))
+    return jsonify({'error': message.format(seconds=seconds)}), 429, {'Retry-After': str(seconds)}
+
+def rate_limited(route_class, heavy=False):
+    """Decorator: token bucket per user untuk ``route_class``; ``heavy`` juga memakai semaphore global.
+
+    Request yang melewati limit atau tidak mendapat slot dalam
+    HEAVY_QUEUE_TIMEOUT ditolak 429 dengan header Retry-After.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            state = current_app.extensions.get('rate_limiting')
+            if state is None or not current_app.config['RATE_LIMIT_ENABLED']:
+                return view(*args, **kwargs)
+
+            wait = state['limiter'].consume(route_class, _identity())
+            if wait:
+                REJECTED_REQUESTS.inc(route_class=route_class, reason='rate_limit')
+                return _too_many_requests('Terlalu banyak request, coba lagi dalam {seconds} detik', wait)
+            if not heavy:
+                return view(*args, **kwargs)
+
+            gate = state['gate']
+            started = time.perf_counter()
+            admitted, depth = gate.acquire()
+            ADMISSION_QUEUE_DEPTH.observe(depth, route_class=route_class)
+            ADMISSION_WAIT.observe(time.perf_counter() - started, route_class=route_class)
+            if not admitted:
+                REJECTED_REQUESTS.inc(route_class=route_class, reason='concurrency')
+                return _too_many_requests('Server sedang sibuk, coba lagi dalam {seconds} detik', gate.timeout)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                gate.release()
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,107 @@
+import gzip
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from utils.metrics_utils import track_time
+
+# Dependency opsional: tanpa orjson dipakai encoder stdlib, tanpa brotli hanya gzip
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response yang dikompresi; file export (PDF/XLSX) dan stream SSE dilewati
+COMPRESSIBLE_MIMETYPES = {
+    'application/json', 'text/plain', 'text/html', 'text/csv', 'application/javascript'
+}
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider Flask berbasis orjson.
+
+    Output setara provider bawaan: key diurutkan (``sort_keys``), datetime
+    dan dataclass tetap lewat ``default`` bawaan Flask (tanggal format HTTP),
+    indentasi saat debug. Pemanggilan dengan argumen tambahan (``indent``,
+    ``cls`` dll.) diteruskan ke encoder stdlib.
+    """
+
+    def _options(self, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+        with track_time('json'):
+            body = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+def init_json_provider(app):
+    """Pilih JSON provider dari config JSON_PROVIDER (auto, orjson, stdlib)"""
+    name = app.config['JSON_PROVIDER']
+    if name not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f'JSON_PROVIDER tidak dikenal: {name}')
+    if name == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_PROVIDER=orjson tetapi paket orjson tidak terinstall')
+    if name != 'stdlib' and orjson is not None:
+        app.json = OrjsonProvider(app)
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY'])
+    return gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'], mtime=0)
+
+def init_compression(app):
+    """Kompres response sesuai Accept-Encoding (br jika tersedia, lalu gzip).
+
+    Hanya body di atas COMPRESS_MIN_SIZE byte dengan mimetype teks/JSON;
+    response streaming (SSE) dan file (send_file) tidak disentuh. Daftarkan
+    setelah init_metrics agar waktu kompresi ikut tercatat di Server-Timing.
+    """
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if (not config['COMPRESS_ENABLED']
+                or response.direct_passthrough
+                or response.is_streamed
+                or response.status_code < 200
+                or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+
+        encoding = request.accept_encodings.best_match(available_encodings())
+        if encoding is None:
+            return response
+
+        with track_time('compress'):
+            body = compress(data, encoding, config)
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,198 @@
+import re
+import uuid
+from sqlalchemy import select, text, table, column, literal_column, func
+from models import Transaction, Category
+
+FTS_TABLE = 'transaction_fts'
+KEY_TABLE = 'transaction_fts_key'
+
+# Index FTS5 yang mencerminkan Transaction.description dan nama kategori.
+# rowid FTS diambil dari KEY_TABLE (INTEGER PRIMARY KEY per transaction.id),
+# bukan rowid implisit tabel transaction yang bisa berubah oleh VACUUM.
+# user_id (hex dari key 16 byte, jadi satu token) ikut diindex agar MATCH
+# langsung terbatas ke transaksi milik user.
+SCHEMA_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description,
+        category_name,
+        user_id,
+        transaction_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {KEY_TABLE} (
+        fts_rowid INTEGER PRIMARY KEY,
+        transaction_id BLOB NOT NULL UNIQUE
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_ai AFTER INSERT ON "transaction" BEGIN
+        INSERT INTO {KEY_TABLE} (transaction_id) VALUES (new.id);
+        INSERT INTO {FTS_TABLE} (rowid, description, category_name, user_id, transaction_id)
+        VALUES (
+            (SELECT fts_rowid FROM {KEY_TABLE} WHERE transaction_id = new.id),
+            new.description,
+            (SELECT name FROM category WHERE id = new.category_id),
+            hex(new.user_id), new.id
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_ad AFTER DELETE ON "transaction" BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = (SELECT fts_rowid FROM {KEY_TABLE} WHERE transaction_id = old.id);
+        DELETE FROM {KEY_TABLE} WHERE transaction_id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS transaction_fts_au AFTER UPDATE OF description, category_id ON "transaction" BEGIN
+        UPDATE {FTS_TABLE} SET
+            description = new.description,
+            category_name = (SELECT name FROM category WHERE id = new.category_id)
+        WHERE rowid = (SELECT fts_rowid FROM {KEY_TABLE} WHERE transaction_id = new.id);
+    END
+    """,
+    # Filter user_id agar subquery memakai ix_transaction_user_category_date
+    f"""
+    CREATE TRIGGER IF NOT EXISTS category_fts_au AFTER UPDATE OF name ON category BEGIN
+        UPDATE {FTS_TABLE} SET category_name = new.name
+        WHERE rowid IN (
+            SELECT k.fts_rowid FROM "transaction" t JOIN {KEY_TABLE} k ON k.transaction_id = t.id
+            WHERE t.user_id = new.user_id AND t.category_id = new.id
+        );
+    END
+    """
+]
+
+REBUILD_STATEMENTS = [
+    f"DELETE FROM {FTS_TABLE}",
+    f"DELETE FROM {KEY_TABLE}",
+    f'INSERT INTO {KEY_TABLE} (transaction_id) SELECT id FROM "transaction"',
+    f"""
+    INSERT INTO {FTS_TABLE} (rowid, description, category_name, user_id, transaction_id)
+    SELECT k.fts_rowid, t.description, c.name, hex(t.user_id), t.id
+    FROM {KEY_TABLE} k
+    JOIN "transaction" t ON t.id = k.transaction_id
+    LEFT JOIN category c ON c.id = t.category_id
+    """,
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+]
+
+DROP_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS transaction_fts_ai",
+    "DROP TRIGGER IF EXISTS transaction_fts_ad",
+    "DROP TRIGGER IF EXISTS transaction_fts_au",
+    "DROP TRIGGER IF EXISTS category_fts_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"DROP TABLE IF EXISTS {KEY_TABLE}"
+]
+
+fts = table(FTS_TABLE, column('transaction_id'))
+
+# Konfigurasi text search PostgreSQL: tanpa stemming bahasa tertentu, seperti FTS5.
+# Ditulis literal karena parameter bertipe varchar tidak cocok dengan regconfig.
+TS_CONFIG = literal_column("'simple'::regconfig")
+
+def install_search_index(engine):
+    """Buat tabel FTS5 dan trigger sinkronisasi; isi ulang jika index baru dibuat.
+
+    Index versi lama (tanpa KEY_TABLE, rowid FTS = rowid transaction) dihapus
+    dan dibangun ulang.
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    with engine.begin() as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (KEY_TABLE,)
+        ).first()
+        if not exists:
+            drop_search_index(conn)
+
+        for statement in SCHEMA_STATEMENTS:
+            conn.exec_driver_sql(statement)
+
+        if not exists:
+            for statement in REBUILD_STATEMENTS:
+                conn.exec_driver_sql(statement)
+
+    return True
+
+def drop_search_index(conn):
+    """Hapus tabel FTS dan trigger-nya; install_search_index membangunnya lagi"""
+    for statement in DROP_STATEMENTS:
+        conn.exec_driver_sql(statement)
+
+def rebuild_search_index(engine):
+    """Isi ulang index FTS dari tabel transaction (mis. setelah restore database)"""
+    with engine.begin() as conn:
+        for statement in SCHEMA_STATEMENTS + REBUILD_STATEMENTS:
+            conn.exec_driver_sql(statement)
+        return conn.exec_driver_sql(f"SELECT count(*) FROM {FTS_TABLE}").scalar()
+
+def search_terms(q):
+    return re.findall(r'\w+', q, flags=re.UNICODE)
+
+def build_match_expression(user_id, q):
+    """Ubah input bebas user menjadi query FTS5 yang aman (prefix per kata)"""
+    terms = search_terms(q)
+    if not terms:
+        return None
+
+    words = ' AND '.join(f'"{term}"*' for term in terms)
+    user_token = uuid.UUID(str(user_id)).hex
+    return f'user_id : "{user_token}" AND {{description category_name}} : ({words})'
+
+def build_tsquery(q):
+    """Ubah input bebas user menjadi tsquery PostgreSQL (prefix per kata, AND)"""
+    terms = search_terms(q)
+    if not terms:
+        return None
+    return ' & '.join(f"'{term}':*" for term in terms)
+
+def apply_postgres_search(query, q):
+    """Padanan apply_search() untuk PostgreSQL memakai tsvector/tsquery.
+
+    Dokumen dibentuk dari deskripsi (bobot A) dan nama kategori (bobot B),
+    sama seperti kolom FTS5 di SQLite; baris sudah dibatasi ke milik user
+    oleh filter user_id pada ``query``.
+    """
+    tsquery_text = build_tsquery(q)
+    if tsquery_text is None:
+        return None
+
+    category_name = select(Category.name).where(
+        Category.id == Transaction.category_id
+    ).correlate(Transaction).scalar_subquery()
+    document = func.setweight(
+        func.to_tsvector(TS_CONFIG, Transaction.description), literal_column("'A'")
+    ).op('||')(
+        func.setweight(func.to_tsvector(TS_CONFIG, func.coalesce(category_name, '')), literal_column("'B'"))
+    )
+    tsquery = func.to_tsquery(TS_CONFIG, tsquery_text)
+
+    return query.filter(document.op('@@')(tsquery)).order_by(func.ts_rank(document, tsquery).desc())
+
+def apply_search(query, user_id, q):
+    """Batasi query Transaction ke hasil full-text search, diurutkan per relevansi.
+
+    Mengembalikan None jika ``q`` tidak berisi kata yang bisa dicari.
+    """
+    if query.session.get_bind().dialect.name == 'postgresql':
+        return apply_postgres_search(query, q)
+
+    match = build_match_expression(user_id, q)
+    if match is None:
+        return None
+
+    # CTE MATERIALIZED memaksa SQLite memulai dari index FTS, bukan dari
+    # tabel transaction lalu menjalankan MATCH untuk setiap baris
+    hits = select(
+        fts.c.transaction_id.label('hit_id'),
+        literal_column(f'bm25({FTS_TABLE}, 1.0, 0.5, 0.0)').label('score')
+    ).where(
+        text(f'{FTS_TABLE} MATCH :fts_match').bindparams(fts_match=match)
+    ).cte('search_hits').prefix_with('MATERIALIZED')
+
+    return query.join(hits, hits.c.hit_id == Transaction.id).order_by(hits.c.score)
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+DEFAULT_HASH_METHOD = 'pbkdf2:sha256:600000'
+
+# Setting hashing aktif, diisi oleh configure_password_hashing() dari create_app
+_settings = {
+    'method': DEFAULT_HASH_METHOD,
+    'salt_length': 16,
+    'prefix': None
+}
+_executor = None
+
+def configure_password_hashing(method=DEFAULT_HASH_METHOD, salt_length=16, workers=0):
+    """Atur metode, cost, dan worker pool untuk hashing password.
+
+    ``method`` memakai format Werkzeug, contoh ``pbkdf2:sha256:600000`` atau
+    ``scrypt:32768:8:1``. Jika ``workers`` > 0, verifikasi dijalankan di thread
+    pool terpisah sehingga jumlah hashing yang berjalan bersamaan dibatasi.
+    """
+    global _executor
+
+    _settings['method'] = method
+    _settings['salt_length'] = salt_length
+    _settings['prefix'] = _method_prefix(method, salt_length)
+
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+    if workers and workers > 0:
+        _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+
+def _method_prefix(method, salt_length):
+    """Prefix hash yang ditulis Werkzeug untuk method ini (sudah dinormalisasi)"""
+    sample_hash = generate_password_hash('', method=method, salt_length=salt_length)
+    return sample_hash.split('$', 1)[0]
+
+def hash_password(password):
+    """Buat hash password dengan metode yang sedang dikonfigurasi"""
+    return generate_password_hash(
+        password,
+        method=_settings['method'],
+        salt_length=_settings['salt_length']
+    )
+
+def verify_password(password_hash, password):
+    """Verifikasi password, di worker pool jika diaktifkan"""
+    if _executor is None:
+        return check_password_hash(password_hash, password)
+
+    return _executor.submit(check_password_hash, password_hash, password).result()
+
+def needs_rehash(password_hash):
+    """Cek apakah hash dibuat dengan metode/cost yang berbeda dari konfigurasi"""
+    if _settings['prefix'] is None:
+        _settings['prefix'] = _method_prefix(_settings['method'], _settings['salt_length'])
+
+    return password_hash.split('$', 1)[0] != _settings['prefix']
@@ -0,0 +1,256 @@
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from flask import current_app, g, has_app_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import MetaData, select, insert, delete, event
+from sqlalchemy.sql.util import find_tables
+
+# Tabel milik satu user (punya kolom user_id) yang disebar ke shard. Tabel
+# user sendiri tetap di database utama karena login mencari berdasarkan
+# username, sebelum user_id diketahui.
+SHARDED_TABLES = (
+    'category', 'category_budget', 'transaction', 'archived_transaction', 'monthly_rollup',
+    'budget_notification', 'idempotency_key', 'sync_state', 'sync_tombstone'
+)
+
+# Kolom unik selain primary key; baris yang bentrok dilewati saat rebalance
+SHARD_UNIQUE_KEYS = {
+    'category_budget': ('user_id', 'category_id'),
+    'monthly_rollup': ('user_id', 'period', 'category_id'),
+    'budget_notification': ('user_id', 'period', 'threshold'),
+    'idempotency_key': ('user_id', 'key'),
+    'sync_state': ('user_id',)
+}
+
+_shard_user = ContextVar('shard_user', default=None)
+
+class ShardRoutingError(RuntimeError):
+    """Query ke tabel shard tanpa user aktif, atau menulis baris user lain"""
+
+def shard_bind_key(index):
+    return f'shard_{index}'
+
+def jump_hash(key, buckets):
+    """Jump consistent hash (Lamping & Veach): key int 64-bit -> bucket [0, buckets).
+
+    Saat jumlah bucket naik dari n ke n+1 hanya sekitar 1/(n+1) key yang
+    pindah, semuanya ke bucket baru, sehingga rebalance memindahkan data
+    seminimal mungkin.
+    """
+    bucket, j = -1, 0
+    while j < buckets:
+        bucket = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+def shard_index(user_id, shard_count):
+    """Shard milik ``user_id``; stabil antar proses (tidak memakai hash() Python)"""
+    key = int.from_bytes(hashlib.blake2b(str(user_id).encode(), digest_size=8).digest(), 'big')
+    return jump_hash(key, shard_count)
+
+def shard_count(app=None):
+    return (app or current_app).config.get('SHARD_COUNT', 0)
+
+def sharding_enabled(app=None):
+    return shard_count(app) > 0
+
+@contextmanager
+def using_shard(user_id):
+    """Arahkan query tabel shard ke shard milik ``user_id`` di dalam blok ini"""
+    token = _shard_user.set(user_id)
+    try:
+        yield
+    finally:
+        _shard_user.reset(token)
+
+def current_shard_user():
+    return _shard_user.get()
+
+class ShardedSession(Session):
+    """Session Flask-SQLAlchemy yang memilih engine shard untuk tabel milik user.
+
+    Jika SHARD_COUNT > 0, query/penulisan ke SHARDED_TABLES diarahkan ke
+    engine ``shard_<n>`` milik user aktif (lihat using_shard dan
+    init_sharding). Tabel lain, dan semua tabel saat sharding mati, memakai
+    pemilihan bind bawaan Flask-SQLAlchemy.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            count = shard_count()
+            if count and _touches_sharded_table(mapper, clause):
+                user_id = _shard_user.get()
+                if user_id is None:
+                    raise ShardRoutingError('Query ke tabel shard tanpa user aktif (gunakan using_shard)')
+                return self._db.engines[shard_bind_key(shard_index(user_id, count))]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def _touches_sharded_table(mapper, clause):
+    if mapper is not None:
+        return mapper.local_table.name in SHARDED_TABLES
+    if clause is not None:
+        return any(getattr(table, 'name', None) in SHARDED_TABLES for table in find_tables(clause, include_crud=True))
+    return False
+
+@event.listens_for(ShardedSession, 'before_flush')
+def _check_flush_shard(session, flush_context, instances):
+    """Tolak flush baris user lain: get_bind hanya melihat user aktif, bukan isi baris"""
+    if not has_app_context() or not sharding_enabled():
+        return
+    count = shard_count()
+    user_id = _shard_user.get()
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if instance.__table__.name not in SHARDED_TABLES:
+            continue
+        if user_id is None or shard_index(instance.user_id, count) != shard_index(user_id, count):
+            raise ShardRoutingError(
+                f'{type(instance).__name__} milik user {instance.user_id} tidak berada di shard user aktif'
+            )
+
+def execute_sharded(session, statement, rows):
+    """Jalankan INSERT executemany ke tabel shard, dikelompokkan per shard dari ``user_id``"""
+    if not sharding_enabled():
+        session.execute(statement, rows)
+        return
+    count = shard_count()
+    groups = {}
+    for row in rows:
+        groups.setdefault(shard_index(row['user_id'], count), []).append(row)
+    for group in groups.values():
+        with using_shard(group[0]['user_id']):
+            session.execute(statement, group)
+
+def shard_metadata(metadata):
+    """Salinan SHARDED_TABLES untuk database shard, tanpa foreign key ke tabel user.
+
+    Tabel user hanya ada di database utama, jadi constraint ke sana tidak
+    bisa dibuat (PostgreSQL) di shard.
+    """
+    shard = MetaData()
+    for name in SHARDED_TABLES:
+        metadata.tables[name].to_metadata(shard)
+    for table in shard.tables.values():
+        for constraint in list(table.foreign_key_constraints):
+            if any(element.target_fullname.startswith('user.') for element in constraint.elements):
+                table.constraints.discard(constraint)
+                for element in constraint.elements:
+                    element.parent.foreign_keys.discard(element)
+                    table.foreign_keys.discard(element)
+    return shard
+
+def shard_engines(db):
+    """{index: engine} untuk semua shard yang dikonfigurasi"""
+    return {index: db.engines[shard_bind_key(index)] for index in range(shard_count())}
+
+def init_sharding(app):
+    """Pasang penentuan shard per request dari identitas JWT"""
+
+    @app.before_request
+    def bind_request_shard():
+        if not sharding_enabled():
+            return
+        try:
+            verify_jwt_in_request(optional=True, locations=['headers', 'query_string'])
+            user_id = get_jwt_identity()
+        except Exception:
+            # Token tidak valid ditolak oleh jwt_required di endpoint-nya
+            return
+        if user_id is not None:
+            g._shard_token = _shard_user.set(user_id)
+
+    @app.teardown_request
+    def unbind_request_shard(exception=None):
+        token = g.pop('_shard_token', None)
+        if token is not None:
+            _shard_user.reset(token)
+
+def _user_ids(conn, tables):
+    user_ids = set()
+    for table in tables:
+        user_ids.update(conn.execute(select(table.c.user_id).distinct()).scalars())
+    return user_ids
+
+def move_user_rows(source, target, user_id, tables, batch_size=5000):
+    """Pindahkan semua baris ``user_id`` dari engine ``source`` ke ``target``.
+
+    Baris disalin dulu (commit di target), baru dihapus dari source. Baris
+    yang sudah ada di target dilewati, jadi aman dijalankan ulang jika proses
+    sempat terputus di tengah. Kembalikan jumlah baris yang disalin.
+    """
+    from utils.analytics_utils import invalidate_frame
+
+    copied = 0
+    with source.connect() as src, target.begin() as dst:
+        for table in tables:
+            unique_key = SHARD_UNIQUE_KEYS.get(table.name)
+            existing_ids = set(dst.execute(select(table.c.id).where(table.c.user_id == user_id)).scalars())
+            existing_keys = set()
+            if unique_key:
+                existing_keys = set(dst.execute(
+                    select(*[table.c[name] for name in unique_key]).where(table.c.user_id == user_id)
+                ).all())
+
+            result = src.execute(
+                select(table).where(table.c.user_id == user_id).execution_options(yield_per=batch_size)
+            )
+            for partition in result.mappings().partitions():
+                rows = []
+                for row in partition:
+                    if row['id'] in existing_ids:
+                        continue
+                    if unique_key:
+                        key = tuple(row[name] for name in unique_key)
+                        if key in existing_keys:
+                            continue
+                        existing_keys.add(key)
+                    rows.append(dict(row))
+                if rows:
+                    dst.execute(insert(table), rows)
+                    copied += len(rows)
+
+    # Salinan sudah commit di target; baru sekarang dihapus dari source
+    with source.begin() as src:
+        for table in reversed(tables):
+            src.execute(delete(table).where(table.c.user_id == user_id))
+    invalidate_frame(user_id)
+    return copied
+
+def rebalance_shards(db, include_default=False, dry_run=False, log=print):
+    """Pindahkan data setiap user ke shard yang benar sesuai SHARD_COUNT saat ini.
+
+    Dipakai setelah SHARD_COUNT dinaikkan (jump hash: hanya ~1/n user yang
+    pindah, semuanya ke shard baru) dan untuk migrasi awal dari database
+    tunggal (``include_default``: data tabel shard di database utama ikut
+    dipindahkan). Kembalikan {'users': ..., 'rows': ...}.
+    """
+    count = shard_count()
+    if not count:
+        raise ShardRoutingError('SHARD_COUNT belum diatur')
+    engines = shard_engines(db)
+    tables = [db.metadata.tables[name] for name in SHARDED_TABLES]
+
+    sources = [(f'shard_{index}', engine) for index, engine in engines.items()]
+    if include_default:
+        sources.insert(0, ('default', db.engine))
+
+    moved_users = moved_rows = 0
+    for name, source in sources:
+        with source.connect() as conn:
+            user_ids = _user_ids(conn, tables)
+        for user_id in sorted(user_ids):
+            target_index = shard_index(user_id, count)
+            target = engines[target_index]
+            if target is source:
+                continue
+            moved_users += 1
+            if dry_run:
+                log(f'{name} -> shard_{target_index}: user {user_id}')
+                continue
+            rows = move_user_rows(source, target, user_id, tables)
+            moved_rows += rows
+            log(f'{name} -> shard_{target_index}: user {user_id} ({rows} baris)')
+
+    return {'users': moved_users, 'rows': moved_rows}
@@ -0,0 +1,176 @@
+import heapq
+from sqlalchemy import select, update, delete, func, event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
+from models import db, Category, Transaction, SyncState, SyncTombstone
+from utils.key_utils import new_uuid
+from utils.shard_utils import ShardedSession
+
+# Model yang ikut delta sync; nama tabel dipakai sebagai nama entitas di tombstone
+SYNCED_MODELS = (Category, Transaction)
+
+DEFAULT_SYNC_LIMIT = 500
+MAX_SYNC_LIMIT = 2000
+
+def next_change_seq(session, user_id, count=1):
+    """Naikkan counter ``user_id`` sebanyak ``count``; kembalikan nilai terakhir.
+
+    UPDATE ... RETURNING mengunci baris sync_state sampai commit, jadi
+    perubahan satu user mendapat nomor sesuai urutan commit dan client tidak
+    pernah melewatkan nomor yang commit belakangan.
+    """
+    states = SyncState.__table__
+    statement = update(states).where(states.c.user_id == user_id).values(
+        change_seq=states.c.change_seq + count
+    ).returning(states.c.change_seq)
+
+    seq = session.execute(statement).scalar()
+    if seq is None:
+        # Baris pertama user; ON CONFLICT untuk request paralel yang juga membuatnya
+        dialect = session.get_bind(clause=statement).dialect.name
+        upsert = postgresql_insert if dialect == 'postgresql' else sqlite_insert
+        session.execute(upsert(states).values(
+            id=new_uuid(), user_id=user_id, change_seq=0, compacted_seq=0
+        ).on_conflict_do_nothing(index_elements=['user_id']))
+        seq = session.execute(statement).scalar()
+    return seq
+
+@event.listens_for(ShardedSession, 'before_flush')
+def _assign_change_seq(session, flush_context, instances):
+    """Beri change_seq ke kategori/transaksi yang dibuat/diubah dan tombstone ke yang dihapus"""
+    changes = {}
+    for instance in session.new:
+        if isinstance(instance, SYNCED_MODELS):
+            changes.setdefault(instance.user_id, []).append((instance, False))
+    for instance in session.dirty:
+        if isinstance(instance, SYNCED_MODELS) and session.is_modified(instance, include_collections=False):
+            changes.setdefault(instance.user_id, []).append((instance, False))
+    for instance in session.deleted:
+        if isinstance(instance, SYNCED_MODELS):
+            changes.setdefault(instance.user_id, []).append((instance, True))
+
+    for user_id, items in changes.items():
+        first = next_change_seq(session, user_id, len(items)) - len(items) + 1
+        for offset, (instance, deleted) in enumerate(items):
+            if deleted:
+                session.add(SyncTombstone(
+                    user_id=user_id,
+                    entity=instance.__table__.name,
+                    entity_id=instance.id,
+                    change_seq=first + offset
+                ))
+            else:
+                instance.change_seq = first + offset
+
+def parse_sync_token(value):
+    """Token sync -> (change_seq, batas snapshot atau None); kosong berarti snapshot penuh.
+
+    Token biasa berupa angka change_seq. Halaman lanjutan snapshot penuh
+    berbentuk ``<change_seq>:<batas>``; batas adalah change_seq saat snapshot
+    dimulai, sehingga halaman berikutnya tidak dibandingkan lagi dengan
+    compacted_seq.
+    """
+    if not value:
+        return 0, None
+    seq, _, snapshot = value.partition(':')
+    try:
+        seq = int(seq)
+        snapshot = int(snapshot) if snapshot else None
+    except ValueError:
+        raise ValueError('Token sync tidak valid')
+    if seq < 0 or (snapshot is not None and snapshot < seq):
+        raise ValueError('Token sync tidak valid')
+    return seq, snapshot
+
+def sync_changes(user_id, since=0, limit=DEFAULT_SYNC_LIMIT, snapshot=None):
+    """Kategori, transaksi dan tombstone user dengan change_seq > ``since``.
+
+    Maksimal ``limit`` perubahan terurut change_seq; ``has_more`` berarti
+    client harus memanggil lagi dengan ``token``. Jika ``since`` 0 atau lebih
+    lama dari tombstone yang sudah di-compact, hasilnya snapshot penuh
+    (``reset``): client mengganti seluruh data lokalnya, tanpa tombstone.
+    Snapshot dibatasi change_seq saat halaman pertamanya dibaca (``snapshot``
+    untuk halaman lanjutan, yang berisi ``reset`` false); perubahan setelahnya
+    ikut sync berikutnya dari token halaman terakhir.
+    """
+    states = SyncState.__table__
+    state = db.session.execute(
+        select(states.c.change_seq, states.c.compacted_seq).where(states.c.user_id == user_id)
+    ).first()
+    # Counter dibaca lebih dulu: perubahan yang commit setelahnya ikut sync berikutnya
+    current_seq, compacted_seq = state if state else (0, 0)
+
+    reset = snapshot is None and (since == 0 or since < compacted_seq)
+    if reset:
+        since = 0
+        snapshot = current_seq
+    upper = current_seq if snapshot is None else snapshot
+
+    sources = []
+    for model in SYNCED_MODELS:
+        query = model.query.filter(
+            model.user_id == user_id,
+            model.change_seq > since,
+            model.change_seq <= upper
+        ).order_by(model.change_seq).limit(limit + 1)
+        if model is Transaction:
+            query = query.options(selectinload(Transaction.category))
+        rows = query.all()
+        sources.append([(row.change_seq, model.__table__.name, row) for row in rows])
+    if snapshot is None:
+        tombstones = db.session.execute(
+            select(SyncTombstone.change_seq, SyncTombstone.entity, SyncTombstone.entity_id).where(
+                SyncTombstone.user_id == user_id,
+                SyncTombstone.change_seq > since,
+                SyncTombstone.change_seq <= upper
+            ).order_by(SyncTombstone.change_seq).limit(limit + 1)
+        ).all()
+        sources.append([(seq, 'deleted', (entity, entity_id)) for seq, entity, entity_id in tombstones])
+
+    changes = list(heapq.merge(*sources, key=lambda change: change[0]))
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    result = {
+        'categories': [],
+        'transactions': [],
+        'deleted': {'categories': [], 'transactions': []}
+    }
+    keys = {'category': 'categories', 'transaction': 'transactions'}
+    for _, kind, item in changes:
+        if kind == 'deleted':
+            entity, entity_id = item
+            result['deleted'][keys[entity]].append(entity_id)
+        else:
+            result[keys[kind]].append(item.to_dict())
+
+    if has_more:
+        token = f'{changes[-1][0]}:{snapshot}' if snapshot is not None else str(changes[-1][0])
+    else:
+        token = str(max(upper, since))
+    result.update({'token': token, 'reset': reset, 'has_more': has_more})
+    return result
+
+def compact_tombstones(engine, before):
+    """Hapus tombstone yang lebih lama dari ``before`` di ``engine``.
+
+    compacted_seq setiap user dinaikkan ke nomor tombstone tertinggi yang
+    dihapus, sehingga token yang lebih lama dari itu mendapat snapshot penuh
+    dan tidak melewatkan penghapusan. Kembalikan jumlah tombstone yang dihapus.
+    """
+    tombstones = SyncTombstone.__table__
+    states = SyncState.__table__
+    with engine.begin() as conn:
+        compacted = conn.execute(
+            select(tombstones.c.user_id, func.max(tombstones.c.change_seq)).where(
+                tombstones.c.deleted_at < before
+            ).group_by(tombstones.c.user_id)
+        ).all()
+        for user_id, seq in compacted:
+            conn.execute(
+                update(states).where(states.c.user_id == user_id, states.c.compacted_seq < seq).values(
+                    compacted_seq=seq
+                )
+            )
+        return conn.execute(delete(tombstones).where(tombstones.c.deleted_at < before)).rowcount
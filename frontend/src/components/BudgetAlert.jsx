@@ -1,17 +1,38 @@
 import React, { useState, useEffect } from 'react';
-import api from '../utils/api';
+import api, { openEventStream } from '../utils/api';
 import { currencyFormatter } from '../utils/currencyFormatter';
 
-const BudgetAlert = () => {
-  const [budgetStatus, setBudgetStatus] = useState(null);
-  const [userCurrency, setUserCurrency] = useState('IDR'); // NEW
-  const [loading, setLoading] = useState(true);
+const mergeCategoryStatus = (previous, status) => {
+  if (!previous || !previous.categories) return status;
+  const updated = new Map((status.categories || []).map((item) => [item.category_id, item]));
+  const categories = previous.categories.map((item) => updated.get(item.category_id) || item);
+  updated.forEach((item, id) => {
+    if (!previous.categories.some((old) => old.category_id === id)) categories.push(item);
+  });
+  return { ...status, categories };
+};
+
+// initialStatus & baseCurrency diisi Dashboard dari /dashboard agar tidak perlu request sendiri
+const BudgetAlert = ({ initialStatus = null, baseCurrency = null }) => {
+  const [budgetStatus, setBudgetStatus] = useState(initialStatus);
+  const [userCurrency, setUserCurrency] = useState(baseCurrency || 'IDR'); // NEW
+  const [loading, setLoading] = useState(!initialStatus);
   const [showBudgetModal, setShowBudgetModal] = useState(false);
   const [budgetLimit, setBudgetLimit] = useState('');
 
   useEffect(() => {
-    fetchBudgetStatus();
-    fetchUserProfile(); // NEW
+    if (!initialStatus) fetchBudgetStatus();
+    if (!baseCurrency) fetchUserProfile(); // NEW
+
+    // Status budget dikirim server setiap kali transaksi berubah, tanpa polling
+    const stream = openEventStream('/notifications/stream');
+    stream.addEventListener('budget', (event) => {
+      const status = JSON.parse(event.data);
+      // Setelah transaksi berubah server hanya mengirim budget kategori yang tersentuh
+      setBudgetStatus((previous) => mergeCategoryStatus(previous, status));
+      setLoading(false);
+    });
+    return () => stream.close();
   }, []);
 
   const fetchBudgetStatus = async () => {
@@ -61,6 +82,35 @@ const BudgetAlert = () => {
     );
   }
 
+  // Progress bar color based on percentage
+  const getProgressColor = (percent) => {
+    if (percent >= 100) return 'bg-red-500';
+    if (percent >= 90) return 'bg-orange-500';
+    if (percent >= 80) return 'bg-yellow-500';
+    return 'bg-green-500';
+  };
+
+  const categoryBudgets = budgetStatus && budgetStatus.categories && budgetStatus.categories.length > 0 && (
+    <div className="mt-3 space-y-2">
+      {budgetStatus.categories.map((item) => (
+        <div key={item.category_id}>
+          <div className="flex justify-between text-xs text-gray-600 mb-1">
+            <span>{item.category_name}</span>
+            <span>
+              {currencyFormatter(item.current_spending, userCurrency)} / {currencyFormatter(item.budget_limit, userCurrency)}
+            </span>
+          </div>
+          <div className="w-full bg-gray-200 rounded-full h-1.5">
+            <div
+              className={`h-1.5 rounded-full ${getProgressColor(item.percentage)}`}
+              style={{ width: `${Math.min(item.percentage, 100)}%` }}
+            ></div>
+          </div>
+        </div>
+      ))}
+    </div>
+  );
+
   if (!budgetStatus || budgetStatus.budget_limit <= 0) {
     return (
       <div className="bg-blue-50 border border-blue-200 rounded-lg p-4 mb-6">
@@ -88,20 +138,13 @@ const BudgetAlert = () => {
             Atur Budget
           </button>
         </div>
+        {categoryBudgets}
       </div>
     );
   }
 
   const { budget_limit, current_spending, percentage, notifications } = budgetStatus;
 
-  // Progress bar color based on percentage
-  const getProgressColor = (percent) => {
-    if (percent >= 100) return 'bg-red-500';
-    if (percent >= 90) return 'bg-orange-500';
-    if (percent >= 80) return 'bg-yellow-500';
-    return 'bg-green-500';
-  };
-
   const getAlertType = (percent) => {
     if (percent >= 100) return 'danger';
     if (percent >= 90) return 'warning';
@@ -174,6 +217,8 @@ const BudgetAlert = () => {
           ></div>
         </div>
 
+        {categoryBudgets}
+
         {/* Notifications */}
         {notifications.length > 0 && (
           <div className="mt-3 space-y-2">
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import api from '../utils/api';
 import CurrencySelector from './CurrencySelector';
 import { getCurrencySymbol } from '../utils/currencyFormatter';
@@ -16,6 +16,8 @@ const TransactionForm = ({ transaction, onSave, onCancel }) => {
   const [userCurrency, setUserCurrency] = useState('IDR');
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  // Key yang sama dipakai ulang saat submit diulang (mis. timeout) selama isi form tidak berubah
+  const idempotencyKey = useRef(null);
 
   useEffect(() => {
     fetchCategories();
@@ -85,7 +87,12 @@ const TransactionForm = ({ transaction, onSave, onCancel }) => {
         toast.success('Transaksi berhasil diupdate');
       } else {
         // Buat transaksi baru
-        response = await api.post('/transactions', payload);
+        if (!idempotencyKey.current) {
+          idempotencyKey.current = crypto.randomUUID();
+        }
+        response = await api.post('/transactions', payload, {
+          headers: { 'Idempotency-Key': idempotencyKey.current }
+        });
         
         // Show budget notifications if any
         if (response.data.budget_status && response.data.budget_status.notifications) {
@@ -114,6 +121,7 @@ const TransactionForm = ({ transaction, onSave, onCancel }) => {
   };
 
   const handleChange = (e) => {
+    idempotencyKey.current = null;
     setFormData({
       ...formData,
       [e.target.name]: e.target.value
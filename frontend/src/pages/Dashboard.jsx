@@ -9,23 +9,25 @@ const Dashboard = () => {
   const [recentTransactions, setRecentTransactions] = useState([]);
   const [selectedMonth, setSelectedMonth] = useState(new Date().toISOString().slice(0, 7));
   const [userCurrency, setUserCurrency] = useState('IDR');
+  const [budgetStatus, setBudgetStatus] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
   useEffect(() => {
     fetchDashboardData();
-    fetchUserProfile();
   }, [selectedMonth]);
 
   const fetchDashboardData = async () => {
     try {
       setLoading(true);
       
-      const summaryResponse = await api.get(`/transactions/summary?month=${selectedMonth}`);
-      setSummary(summaryResponse.data);
-      
-      const transactionsResponse = await api.get(`/transactions?month=${selectedMonth}`);
-      setRecentTransactions(transactionsResponse.data.transactions.slice(0, 5));
+      // Profil, ringkasan, status budget dan 5 transaksi terbaru dalam satu request
+      const response = await api.get(`/dashboard?month=${selectedMonth}&per_page=5` +
+        '&fields=id,description,category_name,category_color,amount,currency,date,exchange_rate');
+      setSummary(response.data.summary);
+      setRecentTransactions(response.data.recent_transactions.transactions);
+      setUserCurrency(response.data.profile.base_currency || 'IDR');
+      setBudgetStatus(response.data.budget_status);
       
     } catch (err) {
       setError('Gagal memuat data dashboard');
@@ -35,15 +37,6 @@ const Dashboard = () => {
     }
   };
 
-  const fetchUserProfile = async () => {
-    try {
-      const response = await api.get('/profile');
-      setUserCurrency(response.data.user.base_currency || 'IDR');
-    } catch (error) {
-      console.error('Error fetching user profile:', error);
-    }
-  };
-
   if (loading) {
     return (
       <div className="min-h-screen bg-gray-50 pt-16">
@@ -83,7 +76,7 @@ const Dashboard = () => {
           </div>
         </div>
 
-        <BudgetAlert />
+        <BudgetAlert initialStatus={budgetStatus} baseCurrency={userCurrency} />
 
         {error && (
           <div className="bg-red-50 border border-red-200 text-red-700 px-4 py-3 rounded-md mb-6">{error}</div>
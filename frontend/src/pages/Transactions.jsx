@@ -14,23 +14,28 @@ const Transactions = () => {
   const [selectedMonth, setSelectedMonth] = useState(
     new Date().toISOString().slice(0, 7)
   );
+  const [sortOption, setSortOption] = useState('date:desc');
+  const [totalAmount, setTotalAmount] = useState(0);
 
   useEffect(() => {
     fetchTransactions();
     fetchCategories();
-  }, [selectedCategory, selectedMonth]);
+  }, [selectedCategory, selectedMonth, sortOption]);
 
   const fetchTransactions = async () => {
     try {
       setLoading(true);
-      let url = `/transactions?month=${selectedMonth}`;
+      const [sort, order] = sortOption.split(':');
+      const params = { month: selectedMonth, sort, order };
       
       if (selectedCategory) {
-        url += `&category_id=${selectedCategory}`;
+        params.category_id = selectedCategory;
       }
       
-      const response = await api.get(url);
+      // Filter, sorting, dan total dihitung di server
+      const response = await api.get('/transactions', { params });
       setTransactions(response.data.transactions);
+      setTotalAmount(response.data.total_amount);
     } catch (err) {
       setError('Gagal memuat transaksi');
     } finally {
@@ -92,8 +97,6 @@ const Transactions = () => {
     });
   };
 
-  const totalAmount = transactions.reduce((sum, transaction) => sum + transaction.amount, 0);
-
   return (
     <div className="min-h-screen bg-gray-50 pt-16">
       <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-8">
@@ -143,6 +146,23 @@ const Transactions = () => {
                   className="px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent"
                 />
               </div>
+
+              <div>
+                <label htmlFor="sort" className="block text-sm font-medium text-gray-700 mb-1">
+                  Urutkan:
+                </label>
+                <select
+                  id="sort"
+                  value={sortOption}
+                  onChange={(e) => setSortOption(e.target.value)}
+                  className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent"
+                >
+                  <option value="date:desc">Tanggal terbaru</option>
+                  <option value="date:asc">Tanggal terlama</option>
+                  <option value="amount:desc">Jumlah terbesar</option>
+                  <option value="amount:asc">Jumlah terkecil</option>
+                </select>
+              </div>
             </div>
 
             <button
@@ -1,8 +1,10 @@
 import axios from 'axios';
 
+export const API_BASE_URL = 'http://localhost:5000/api';
+
 // Buat instance axios dengan base URL
 const api = axios.create({
-  baseURL: 'http://localhost:5000/api',
+  baseURL: API_BASE_URL,
 });
 
 // Interceptor untuk menambahkan token ke header
@@ -32,4 +34,10 @@ api.interceptors.response.use(
   }
 );
 
+// EventSource tidak bisa mengirim header, jadi token dikirim lewat query string
+export const openEventStream = (path) => {
+  const token = localStorage.getItem('token');
+  return new EventSource(`${API_BASE_URL}${path}?jwt=${encodeURIComponent(token || '')}`);
+};
+
 export default api;
\ No newline at end of file